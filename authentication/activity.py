@@ -0,0 +1,62 @@
+"""
+Incremental feed of new registrations and submissions, read from the
+``ActivityEvent`` log.
+
+A *high-water mark* holds the highest log id already reported, so a poll
+reads only the events written since, straight off the primary key index,
+however large the log is. Feed events have the shape of
+``LiveActivityDashboard.get_recent_activity``: the coarse ``type``, the
+``event`` type, and ``id`` of the user, interview or task.
+
+Log ids are assumed to become visible in order, which holds for SQLite's
+single writer; on a database with concurrent writers a batch that commits
+after a later id has been read would be skipped.
+"""
+
+from django.db.models import Max
+
+from .models import ActivityEvent
+
+# Log rows read per poll; a burst is caught up over several polls
+POLL_LIMIT = 500
+
+# What the live feeds report: new users and new submissions
+FEED_EVENT_TYPES = ('registration', 'interview_created', 'task_created')
+
+
+def feed_event(row):
+    return {
+        'type': row.kind,
+        'event': row.event_type,
+        'id': row.object_id,
+        'user': row.username,
+        'action': row.action,
+        'timestamp': row.created_at.isoformat(),
+        'metadata': row.metadata,
+    }
+
+
+def feed_rows(event_types=FEED_EVENT_TYPES):
+    return ActivityEvent.objects.filter(event_type__in=event_types)
+
+
+def high_water_mark():
+    """The current highest log id; polling from here reports only new events."""
+    return ActivityEvent.objects.aggregate(top=Max('pk'))['top'] or 0
+
+
+def recent_events(since, mark):
+    """Feed events created at or after ``since`` and logged at or below ``mark``, newest first."""
+    rows = feed_rows().filter(created_at__gte=since, pk__lte=mark).order_by('-created_at', '-id')
+    return [feed_event(row) for row in rows]
+
+
+def poll(mark, limit=POLL_LIMIT):
+    """
+    Feed events logged after ``mark``, in log order, and the mark to poll
+    from next.
+    """
+    rows = list(feed_rows().filter(pk__gt=mark).order_by('pk')[:limit])
+    if rows:
+        mark = rows[-1].pk
+    return [feed_event(row) for row in rows], mark
@@ -1,5 +1,12 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -7,7 +14,88 @@ from django.contrib.admin import AdminSite
 from django.shortcuts import render
 from django.urls import path
 from django.http import JsonResponse
-from .models import CustomUser, UserProfile, InterviewExperience, TaskExperience
+from .models import ActivityEvent, CustomUser, UserProfile, InterviewExperience, TaskExperience, DailyActivity
+from .rollup import activity_windows, parse_range, standard_windows
+from .routers import replica_reads
+
+def estimate_rows(model):
+    """
+    Cheap row count estimate: planner statistics on PostgreSQL, otherwise the
+    highest primary key (an index lookup; over-counts after deletes).
+    """
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return int(row[0])
+    return model._default_manager.aggregate(top=Max('pk'))['top'] or 0
+
+
+def is_large(model):
+    return estimate_rows(model) > settings.ADMIN_LARGE_TABLE_ROWS
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist paginator that estimates the size of an unfiltered large table
+    instead of running ``COUNT(*)`` over it. Filtered and searched lists are
+    counted exactly. An over-estimate only means trailing empty pages.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where and is_large(queryset.model):
+            return estimate_rows(queryset.model)
+        return super().count
+
+
+class LargeTableChangeList(ChangeList):
+    def __init__(self, request, model, list_display, list_display_links, list_filter, date_hierarchy, *args):
+        # The year/month links read every distinct date in the table
+        if date_hierarchy and is_large(model):
+            date_hierarchy = None
+        super().__init__(request, model, list_display, list_display_links, list_filter, date_hierarchy, *args)
+
+
+class ScalableAdminMixin:
+    """
+    Changelists whose query count and cost do not grow with the table:
+    estimated page counts, no total count next to the filtered one, and no
+    date hierarchy once a table passes ``ADMIN_LARGE_TABLE_ROWS``. Admins
+    join or annotate whatever their columns display.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
+
+
+def count_subquery(model):
+    """Number of ``model`` rows owned by the outer user, as an annotation."""
+    rows = (
+        model.objects.filter(user=OuterRef('pk')).order_by()
+        .values('user').annotate(count=Count('pk')).values('count')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+class RatingListFilter(admin.SimpleListFilter):
+    """Fixed 1-5 choices; the default filter reads every distinct rating."""
+    title = 'rating'
+    parameter_name = 'rating'
+
+    def lookups(self, request, model_admin):
+        return [(str(value), '⭐' * value) for value in range(1, 6)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(rating=self.value())
+        return queryset
+
 
 # Custom Admin Site with Dashboard
 class RECursionAdminSite(AdminSite):
@@ -18,29 +106,37 @@ class RECursionAdminSite(AdminSite):
     def get_urls(self):
         urls = super().get_urls()
         custom_urls = [
-            path('dashboard-stats/', self.admin_view(self.dashboard_stats), name='dashboard_stats'),
+            path('dashboard-stats/', self.admin_view(replica_reads(self.dashboard_stats)), name='dashboard_stats'),
         ]
         return custom_urls + urls
     
     def dashboard_stats(self, request):
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        now = timezone.now()
-        today = now.date()
-        week_ago = now - timedelta(days=7)
+        try:
+            history = parse_range(request.GET)
+        except ValueError:
+            return JsonResponse({'error': 'start/end must be YYYY-MM-DD dates, start <= end'}, status=400)
+        windows = standard_windows()
+        if history:
+            windows['range'] = history
+        activity = activity_windows(windows)
         
         stats = {
             'total_users': CustomUser.objects.count(),
-            'new_users_today': CustomUser.objects.filter(created_at__date=today).count(),
-            'new_users_week': CustomUser.objects.filter(created_at__gte=week_ago).count(),
+            'new_users_today': activity['today']['registrations'],
+            'new_users_week': activity['week']['registrations'],
+            'new_users_month': activity['month']['registrations'],
+            'logins_today': activity['today']['logins'],
             'total_interviews': InterviewExperience.objects.count(),
-            'interviews_today': InterviewExperience.objects.filter(created_at__date=today).count(),
-            'interviews_week': InterviewExperience.objects.filter(created_at__gte=week_ago).count(),
+            'interviews_today': activity['today']['interview_submissions'],
+            'interviews_week': activity['week']['interview_submissions'],
+            'interviews_month': activity['month']['interview_submissions'],
             'total_tasks': TaskExperience.objects.count(),
-            'tasks_today': TaskExperience.objects.filter(created_at__date=today).count(),
-            'tasks_week': TaskExperience.objects.filter(created_at__gte=week_ago).count(),
+            'tasks_today': activity['today']['task_submissions'],
+            'tasks_week': activity['week']['task_submissions'],
+            'tasks_month': activity['month']['task_submissions'],
         }
+        if history:
+            stats['range'] = dict(activity['range'], start=history[0].isoformat(), end=history[1].isoformat())
         return JsonResponse(stats)
 
 # Use custom admin site
@@ -53,15 +149,22 @@ admin.site.index_title = "🌐 RECursion Dashboard - Monitor All User Activity"
 
 # Enhanced CustomUser admin with activity tracking
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ScalableAdminMixin, UserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'is_active', 'user_activity', 'created_at')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'created_at')
     search_fields = ('username', 'email', 'first_name', 'last_name')
     ordering = ('-created_at',)
     
+    def get_queryset(self, request):
+        # Counted in the page query rather than two COUNTs per row
+        return super().get_queryset(request).annotate(
+            interview_count=count_subquery(InterviewExperience),
+            task_count=count_subquery(TaskExperience),
+        )
+    
     def user_activity(self, obj):
-        interview_count = obj.interview_experiences.count()
-        task_count = obj.task_experiences.count()
+        interview_count = obj.interview_count
+        task_count = obj.task_count
         return format_html(
             '<span style="color: {};">📝 {} interviews | 💼 {} tasks</span>',
             'green' if (interview_count + task_count) > 0 else 'red',
@@ -72,8 +175,9 @@ class CustomUserAdmin(UserAdmin):
 
 # Enhanced UserProfile admin
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'location', 'birth_date', 'profile_completeness')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'user__email', 'location')
     list_filter = ('birth_date',)
     
@@ -96,16 +200,17 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 # Enhanced Interview Experience admin with real-time monitoring
 @admin.register(InterviewExperience)
-class InterviewExperienceAdmin(admin.ModelAdmin):
+class InterviewExperienceAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = ('user_link', 'company_name', 'position', 'status_badge', 'difficulty_badge', 'interview_date', 'rating_stars', 'time_since_created')
-    list_filter = ('status', 'difficulty', 'interview_date', 'created_at', 'rating')
+    list_filter = ('status', 'difficulty', 'interview_date', 'created_at', RatingListFilter)
+    list_select_related = ('user',)
     search_fields = ('user__username', 'user__email', 'company_name', 'position', 'description')
     ordering = ('-created_at',)
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'created_at'
     
     def user_link(self, obj):
-        url = reverse('admin:authentication_customuser_change', args=[obj.user.pk])
+        url = reverse('admin:authentication_customuser_change', args=[obj.user_id])
         return format_html('<a href="{}">{}</a>', url, obj.user.username)
     user_link.short_description = 'User'
     
@@ -156,8 +261,9 @@ class InterviewExperienceAdmin(admin.ModelAdmin):
 
 # Enhanced Task Experience admin with activity monitoring
 @admin.register(TaskExperience) 
-class TaskExperienceAdmin(admin.ModelAdmin):
+class TaskExperienceAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = ('user_link', 'company_name', 'position', 'task_type_badge', 'employment_status', 'duration_info', 'tech_preview', 'time_since_created')
+    list_select_related = ('user',)
     list_filter = ('task_type', 'currently_working', 'start_date', 'created_at')
     search_fields = ('user__username', 'user__email', 'company_name', 'position', 'description', 'technologies_used')
     ordering = ('-created_at',)
@@ -165,7 +271,7 @@ class TaskExperienceAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     
     def user_link(self, obj):
-        url = reverse('admin:authentication_customuser_change', args=[obj.user.pk])
+        url = reverse('admin:authentication_customuser_change', args=[obj.user_id])
         return format_html('<a href="{}">{}</a>', url, obj.user.username)
     user_link.short_description = 'User'
     
@@ -224,3 +330,28 @@ class TaskExperienceAdmin(admin.ModelAdmin):
         else:
             return "Just now"
     time_since_created.short_description = 'Submitted'
+
+
+# Daily activity rollup (maintained by signals, rebuilt by rebuild_activity_rollup)
+@admin.register(DailyActivity)
+class DailyActivityAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('date', 'registrations', 'logins', 'interview_submissions', 'task_submissions', 'updated_at')
+    ordering = ('-date',)
+    readonly_fields = ('updated_at',)
+    date_hierarchy = 'date'
+
+
+# Append-only activity log (written in batches by events.py)
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('created_at', 'event_type', 'username', 'action')
+    list_filter = ('event_type', 'created_at')
+    search_fields = ('username', 'action')
+    ordering = ('-created_at', '-id')
+    date_hierarchy = 'created_at'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,223 @@
+"""
+Async implementations of the read endpoints, served when ``ASYNC_VIEWS`` is
+on (the default under ``recursion_backend/asgi.py``).
+
+Each view answers GET and HEAD with the async ORM (``aget``,
+``aaggregate`` and ``aiterator()``, which fetches in chunks where plain
+``async for`` would load the whole result in one call) and hands every other
+method to its sync counterpart in ``views.py``, so writes, validation and
+their responses are shared. The responses are byte for byte those of the
+sync views: same authentication, permissions, errors, validators and
+caching.
+
+Django 4.2's async ORM still runs each query in a worker thread; what this
+buys under ASGI is that a request only holds a thread while a query runs,
+not for its whole lifetime, so slow clients and streaming responses don't
+tie up the pool.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from . import views
+from .authentication import CachedTokenAuthentication
+from .cache import cache_public_response
+from .conditional import acollection_validators, check_preconditions, instance_validators, set_validators
+from .fastpath import fast_renderer
+from .fieldsets import defer_unselected, fieldset_key, parse_fieldset
+from .filters import INTERVIEW_FILTERS, TASK_FILTERS
+from .models import CustomUser, InterviewExperience, TaskExperience, UserProfile
+from .pagination import INTERVIEW_FEED_ORDERING, TASK_FEED_ORDERING, KeysetPagination
+from .routers import replica_reads
+from .serializers import InterviewExperienceSerializer, TaskExperienceSerializer, UserDetailSerializer, UserProfileSerializer
+
+
+def async_reads(sync_view):
+    """
+    Serve GET and HEAD with the decorated coroutine and any other method
+    with ``sync_view``, an ``@api_view`` whose permissions apply to both.
+    """
+    view_class = sync_view.cls
+    allow = ', '.join(view_class().allowed_methods)
+    delegate = sync_to_async(sync_view)
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await delegate(request, *args, **kwargs)
+            request = Request(request)
+            try:
+                await authenticate(request, view_class)
+                response = await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                response = handle_exception(exc, request, args, kwargs)
+            return finalize(response, request, allow)
+        # Django 4.2's csrf_exempt() would hide that the view is a coroutine
+        wrapped.csrf_exempt = True
+        return wrapped
+    return decorator
+
+
+async def authenticate(request, view_class):
+    """What ``APIView.initial`` does, for the token authentication in use."""
+    result = await CachedTokenAuthentication().aauthenticate(request)
+    request.user, request.auth = result or (AnonymousUser(), None)
+    for permission in (permission_class() for permission_class in view_class.permission_classes):
+        if not permission.has_permission(request, None):
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+
+
+def handle_exception(exc, request, args, kwargs):
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        exc.auth_header = CachedTokenAuthentication().authenticate_header(request)
+    context = {'view': None, 'args': args, 'kwargs': kwargs, 'request': request}
+    response = api_settings.EXCEPTION_HANDLER(exc, context)
+    if response is None:
+        raise exc
+    return response
+
+
+def finalize(response, request, allow):
+    """
+    Render a DRF ``Response`` as ``APIView.finalize_response`` would, into a
+    plain ``HttpResponse`` so Django has nothing left to render in a thread.
+    """
+    if isinstance(response, Response):
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = response.accepted_renderer.media_type
+        response.renderer_context = {'request': request, 'response': response}
+        response.render()
+        rendered, response = response, HttpResponse(response.content, status=response.status_code)
+        for header, value in rendered.items():
+            response[header] = value
+    response['Allow'] = allow
+    return response
+
+
+@async_reads(views.user_profile)
+async def user_profile(request):
+    try:
+        profile = await UserProfile.objects.select_related('user').aget(user=request.user)
+    except UserProfile.DoesNotExist:
+        return Response({
+            'error': 'Profile not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    etag, last_modified = instance_validators(profile, profile.user)
+    response = check_preconditions(request, etag, last_modified)
+    if response is not None:
+        return response
+    serializer = UserProfileSerializer(profile)
+    return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, last_modified)
+
+
+@async_reads(views.interview_experience_list_create)
+async def interview_experience_list_create(request):
+    return await own_experiences(request, InterviewExperience, InterviewExperienceSerializer)
+
+
+@async_reads(views.task_experience_list_create)
+async def task_experience_list_create(request):
+    return await own_experiences(request, TaskExperience, TaskExperienceSerializer)
+
+
+async def own_experiences(request, model, serializer_class):
+    selected = parse_fieldset(request.query_params, serializer_class)
+    experiences = model.objects.select_related('user').filter(user=request.user)
+    etag, last_modified = await acollection_validators(experiences, request.user, fieldset_key(selected))
+    response = check_preconditions(request, etag, last_modified)
+    if response is not None:
+        return response
+    rows = [row async for row in defer_unselected(experiences, selected).aiterator()]
+    serializer = serializer_class(rows, many=True, fields=selected)
+    return set_validators(Response(serializer.data), etag, last_modified)
+
+
+@async_reads(views.interview_experience_detail)
+async def interview_experience_detail(request, pk):
+    try:
+        experience = await InterviewExperience.objects.select_related('user').aget(pk=pk, user=request.user)
+    except InterviewExperience.DoesNotExist:
+        return Response({'error': 'Interview experience not found'}, status=status.HTTP_404_NOT_FOUND)
+    return own_experience(request, experience, InterviewExperienceSerializer)
+
+
+@async_reads(views.task_experience_detail)
+async def task_experience_detail(request, pk):
+    try:
+        task = await TaskExperience.objects.select_related('user').aget(pk=pk, user=request.user)
+    except TaskExperience.DoesNotExist:
+        return Response({'error': 'Task experience not found'}, status=status.HTTP_404_NOT_FOUND)
+    return own_experience(request, task, TaskExperienceSerializer)
+
+
+def own_experience(request, experience, serializer_class):
+    etag, last_modified = instance_validators(experience)
+    response = check_preconditions(request, etag, last_modified)
+    if response is not None:
+        return response
+    serializer = serializer_class(experience)
+    return set_validators(Response(serializer.data), etag, last_modified)
+
+
+@replica_reads
+@cache_public_response(InterviewExperience, CustomUser)
+@async_reads(views.public_interview_experiences)
+async def public_interview_experiences(request):
+    return await filtered_feed(request, INTERVIEW_FILTERS, InterviewExperienceSerializer)
+
+
+@replica_reads
+@cache_public_response(TaskExperience, CustomUser)
+@async_reads(views.public_task_experiences)
+async def public_task_experiences(request):
+    return await filtered_feed(request, TASK_FILTERS, TaskExperienceSerializer)
+
+
+async def filtered_feed(request, filter_set, serializer_class):
+    conditions, ordering = filter_set.parse(request.query_params)
+    selected = parse_fieldset(request.query_params, serializer_class)
+    paginator = KeysetPagination(ordering)
+    if settings.FAST_LIST_SERIALIZATION:
+        renderer = fast_renderer(serializer_class, selected)
+        queryset = renderer.values(filter_set.filter(filter_set.model.objects.all(), conditions), ordering)
+        data = renderer.render(await paginator.apaginate_queryset(queryset, request))
+    else:
+        queryset = defer_unselected(filter_set.model.objects.select_related('user'), selected, ordering)
+        rows = await paginator.apaginate_queryset(filter_set.filter(queryset, conditions), request)
+        data = serializer_class(rows, many=True, fields=selected).data
+    response = paginator.get_paginated_response(data)
+    if request.query_params.get('facets', 'true').lower() not in ('false', '0'):
+        response.data['facets'] = await filter_set.afacet_counts(filter_set.model.objects.all(), conditions)
+    return response
+
+
+@replica_reads
+@cache_public_response(CustomUser, UserProfile, InterviewExperience, TaskExperience, scope='user_id')
+@async_reads(views.user_profile_detail)
+async def user_profile_detail(request, user_id):
+    try:
+        user = await CustomUser.objects.select_related('profile').aget(id=user_id)
+    except CustomUser.DoesNotExist:
+        return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    interviews = views.nested_paginator('interviews', INTERVIEW_FEED_ORDERING)
+    user.interview_page = await interviews.apaginate_queryset(user.interview_experiences.all(), request)
+    tasks = views.nested_paginator('tasks', TASK_FEED_ORDERING)
+    user.task_page = await tasks.apaginate_queryset(user.task_experiences.all(), request)
+
+    data = UserDetailSerializer(user).data
+    data['interview_experiences_next'] = interviews.get_next_link()
+    data['task_experiences_next'] = tasks.get_next_link()
+    return Response(data)
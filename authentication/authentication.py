@@ -0,0 +1,146 @@
+"""
+Token authentication with an in-process token -> user cache.
+
+``CachedTokenAuthentication`` skips the ``authtoken_token`` + user join for
+tokens seen within the last ``TTL`` seconds. Entries are dropped explicitly
+when a token is deleted (logout) and whenever its user is saved, deleted or
+changed with ``CustomUser.objects.filter(...).update(...)``, which covers
+deactivation, password and permission changes; see ``signals.py`` and
+``models.CustomUserQuerySet``. The
+cache is per process, so in other workers a revoked token stays usable for
+at most ``TTL`` seconds.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+
+class TokenUserCache:
+    """Thread-safe bounded LRU of token key -> (user snapshot, expiry)."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        # user id -> token keys cached for that user, so invalidate_user is O(1)
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            user = entry[0]
+        # Hand out a copy so per-request changes never leak into the cache
+        return copy.copy(user)
+
+    def set(self, key, user, ttl, max_size):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (copy.copy(user), time.monotonic() + ttl)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > max_size:
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+                self._stats['invalidations'] += 1
+
+    def invalidate_user(self, user_id):
+        self.invalidate_users([user_id])
+
+    def invalidate_users(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                for key in self._keys_by_user.get(user_id, set()).copy():
+                    self._drop(key)
+                    self._stats['invalidations'] += 1
+
+    def _drop(self, key):
+        user, _ = self._entries.pop(key)
+        keys = self._keys_by_user[user.pk]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[user.pk]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
+
+
+token_cache = TokenUserCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` backed by ``token_cache`` (see ``TOKEN_AUTH_CACHE``)."""
+
+    def authenticate_credentials(self, key):
+        config = settings.TOKEN_AUTH_CACHE
+        if not config['ENABLED']:
+            return super().authenticate_credentials(key)
+
+        user = token_cache.get(key)
+        if user is not None:
+            return user, Token(key=key, user=user)
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, config['TTL'], config['MAX_SIZE'])
+        return user, token
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views (``async_views.py``), using the async ORM on a cache miss."""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        # Same checks and messages as TokenAuthentication.authenticate
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+
+        config = settings.TOKEN_AUTH_CACHE
+        user = token_cache.get(key) if config['ENABLED'] else None
+        if user is not None:
+            return user, Token(key=key, user=user)
+        try:
+            token = await self.get_model().objects.select_related('user').aget(key=key)
+        except self.get_model().DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        if config['ENABLED']:
+            token_cache.set(key, token.user, config['TTL'], config['MAX_SIZE'])
+        return token.user, token
@@ -0,0 +1,265 @@
+"""
+Versioned response cache for the public, read-heavy endpoints.
+
+Each cached response is stored under a key that embeds the current
+*generation* of every model it was built from.  Saving or deleting one of
+those models bumps its generation (see ``signals.py``), so stale entries are
+never read again and simply age out; nothing has to enumerate or delete them.
+Per-user documents use generations scoped to their owner instead.
+
+A miss is rebuilt by a single thread: threads in this process queue on a
+striped lock, and other processes sharing the cache back off on a
+``cache.add`` lock and wait for the winner's result.
+
+Large entries also store a gzip variant, compressed once at build time and
+served to clients that accept it.
+
+Entries built from a read replica (see ``routers.py``) may miss the write
+that bumped the generation, so they only live for the read-your-writes
+window; clients pinned to the primary skip the cache.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .compression import accepts_gzip, precompress
+from .routers import pinned_to_primary, using_replica
+
+KEY_PREFIX = 'response_cache'
+
+_build_locks = [threading.Lock() for _ in range(64)]
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def response_cache_stats():
+    """Hit/miss counters for this worker process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+    stats['hit_rate'] = round((stats['hits'] + stats['coalesced']) / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_response_cache_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _generation_key(model, scope=None):
+    key = f'{KEY_PREFIX}:gen:{model._meta.label_lower}'
+    return key if scope is None else f'{key}:{scope}'
+
+
+def bump_generation(model, scope=None):
+    """
+    Invalidate every cached response built from ``model``, or with ``scope``
+    only those built from its rows for that scope value (e.g. one user).
+    """
+    key = _generation_key(model, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Seed from the clock so an evicted counter never repeats an old value
+        cache.add(key, time.time_ns(), None)
+
+
+def get_generations(models, scope=None):
+    keys = [_generation_key(model, scope) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return [str(generations[key]) for key in keys]
+
+
+def get_or_build(key, build, timeout=None):
+    """
+    Return the cached value for ``key``, calling ``build()`` on a miss.
+
+    Concurrent misses for the same key trigger one build; the others wait
+    for its result. ``build`` may return ``None`` to skip caching.
+    """
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+
+    lock_timeout = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+    with _build_locks[hash(key) % len(_build_locks)]:
+        value = cache.get(key)
+        if value is not None:
+            _count('coalesced')
+            return value
+
+        lock_key = f'{key}:lock'
+        if cache.add(lock_key, 1, lock_timeout):
+            _count('misses')
+            try:
+                value = build()
+                if value is not None:
+                    cache.set(key, value, timeout)
+            finally:
+                cache.delete(lock_key)
+            return value
+
+        # Another process holds the build lock; wait for its result
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = cache.get(key)
+            if value is not None:
+                _count('coalesced')
+                return value
+        _count('misses')
+        return build()
+
+
+async def aget_or_build(key, build, timeout=None):
+    """
+    ``get_or_build`` for async views, where ``build`` is a coroutine
+    function. Concurrent misses only coalesce on the ``cache.add`` lock.
+    """
+    value = await cache.aget(key)
+    if value is not None:
+        _count('hits')
+        return value
+
+    lock_timeout = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+    lock_key = f'{key}:lock'
+    if await cache.aadd(lock_key, 1, lock_timeout):
+        _count('misses')
+        try:
+            value = await build()
+            if value is not None:
+                await cache.aset(key, value, timeout)
+        finally:
+            await cache.adelete(lock_key)
+        return value
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        value = await cache.aget(key)
+        if value is not None:
+            _count('coalesced')
+            return value
+    _count('misses')
+    return await build()
+
+
+def response_key(request, models, scope=None):
+    url = hashlib.sha1(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    return f"{KEY_PREFIX}:{url}:{'.'.join(get_generations(models, scope))}"
+
+
+def cache_public_response(*models, scope=None):
+    """
+    Cache successful GET responses of a public view until any of ``models``
+    changes. Apply outside ``@api_view`` so the rendered bytes are stored.
+    Async views are supported too.
+
+    ``scope`` names a URL keyword argument (e.g. ``'user_id'``); responses
+    then only follow the generations bumped for that value, so writes by
+    other users leave them cached.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def awrapped(request, *args, **kwargs):
+                if _bypass(request):
+                    return await view(request, *args, **kwargs)
+
+                built = {}
+
+                async def build():
+                    built['response'] = await view(request, *args, **kwargs)
+                    return _entry(built['response'])
+
+                # Reading the generations may seed them, so keep it off the event loop
+                key = await sync_to_async(response_key)(request, models, kwargs[scope] if scope else None)
+                entry = await aget_or_build(key, build, _timeout())
+                if entry is None:
+                    return built['response']
+                return _from_entry(request, entry, built)
+            return awrapped
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if _bypass(request):
+                return view(request, *args, **kwargs)
+
+            built = {}
+
+            def build():
+                built['response'] = view(request, *args, **kwargs)
+                return _entry(built['response'])
+
+            entry = get_or_build(
+                response_key(request, models, kwargs[scope] if scope else None),
+                build,
+                _timeout(),
+            )
+            if entry is None:
+                return built['response']
+            return _from_entry(request, entry, built)
+        return wrapped
+    return decorator
+
+
+def _bypass(request):
+    return (
+        request.method != 'GET'
+        or not settings.RESPONSE_CACHE_ENABLED
+        or pinned_to_primary(request)
+    )
+
+
+def _timeout():
+    timeout = settings.RESPONSE_CACHE_TIMEOUT
+    if using_replica():
+        timeout = min(timeout, settings.READ_YOUR_WRITES_SECONDS)
+    return timeout
+
+
+def _entry(response):
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        return None
+    return {
+        'content': response.content,
+        'gzip': precompress(response.content),
+        'headers': dict(response.items()),
+    }
+
+
+def _from_entry(request, entry, built):
+    compressed = entry.get('gzip')
+    if compressed and accepts_gzip(request):
+        response = HttpResponse(compressed)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(entry['content'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    if compressed:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    response['X-Cache'] = 'MISS' if built else 'HIT'
+    return response
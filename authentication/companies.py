@@ -0,0 +1,171 @@
+"""
+Incremental maintenance of ``CompanyStats``.
+
+Every interview contributes to its company's running totals. Creating one
+adds its contribution, deleting one subtracts it, and an edit subtracts the
+old values (snapshotted before the save) and adds the new ones, so moving an
+interview between companies or changing its rating or status stays exact.
+"""
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import CompanyStats, InterviewExperience
+
+# Fields of InterviewExperience that feed the stats
+TRACKED_FIELDS = ('company_name', 'rating', 'rounds', 'difficulty', 'status', 'interview_date')
+
+COUNTER_FIELDS = (
+    ['experience_count', 'rating_total', 'rounds_total']
+    + [f'{value}_count' for value, _ in InterviewExperience.DIFFICULTY_CHOICES]
+    + [f'{value}_count' for value, _ in InterviewExperience.INTERVIEW_STATUS_CHOICES]
+)
+
+
+def company_key(name):
+    return name.strip().lower()
+
+
+def snapshot(instance):
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS}
+
+
+def contribution(values):
+    return {
+        'experience_count': 1,
+        'rating_total': values['rating'],
+        'rounds_total': values['rounds'],
+        f"{values['difficulty']}_count": 1,
+        f"{values['status']}_count": 1,
+    }
+
+
+def add_experience(values):
+    add_experiences([values])
+
+
+def add_experiences(values_list):
+    """Add many experiences with one write per company."""
+    grouped = {}
+    for values in values_list:
+        key = company_key(values['company_name'])
+        name, deltas, latest = grouped.get(
+            key, (values['company_name'].strip(), {}, values['interview_date'])
+        )
+        for field, delta in contribution(values).items():
+            deltas[field] = deltas.get(field, 0) + delta
+        grouped[key] = (name, deltas, max(latest, values['interview_date']))
+
+    for key, (name, deltas, latest) in grouped.items():
+        updates = {field: F(field) + delta for field, delta in deltas.items()}
+        updates['latest_interview_date'] = _latest_with(latest)
+        if CompanyStats.objects.filter(company_key=key).update(**updates):
+            continue
+        try:
+            with transaction.atomic():
+                CompanyStats.objects.create(
+                    company_key=key, company_name=name, latest_interview_date=latest, **deltas
+                )
+        except IntegrityError:
+            # Another request created the row first
+            CompanyStats.objects.filter(company_key=key).update(**updates)
+
+
+def _latest_with(interview_date):
+    return Greatest(
+        Coalesce('latest_interview_date', Value(interview_date)), Value(interview_date)
+    )
+
+
+def _refresh_latest(key):
+    CompanyStats.objects.filter(company_key=key).update(latest_interview_date=_latest_for(key))
+
+
+def _latest_for(key):
+    """
+    Latest interview date of one company key. Keys are built in Python with
+    ``company_key``: SQLite's ``LOWER`` and ``iexact`` only fold ASCII and
+    don't trim, so grouping or filtering on them in SQL would disagree with
+    the incremental path. SQL narrows the rows to names containing the
+    key's longest ASCII run, which ``LIKE`` matches in any case and with any
+    surrounding space, and the key itself is checked here.
+    """
+    rows = InterviewExperience.objects.order_by().values('company_name').annotate(latest=Max('interview_date'))
+    runs = re.findall(r'[\x00-\x7f]+', key)
+    if runs:
+        rows = rows.filter(company_name__icontains=max(runs, key=len))
+    return max((row['latest'] for row in rows if company_key(row['company_name']) == key), default=None)
+
+
+def remove_experience(values):
+    key = company_key(values['company_name'])
+    updates = {field: F(field) - delta for field, delta in contribution(values).items()}
+    with transaction.atomic():
+        CompanyStats.objects.filter(company_key=key).update(**updates)
+        stats = CompanyStats.objects.filter(company_key=key).first()
+        if stats is None:
+            return
+        if stats.experience_count <= 0:
+            stats.delete()
+        elif stats.latest_interview_date == values['interview_date']:
+            # The maximum may have gone; recompute it from what is left
+            _refresh_latest(key)
+
+
+def update_experience(previous, current):
+    if previous == current:
+        return
+    key = company_key(current['company_name'])
+    if company_key(previous['company_name']) != key:
+        with transaction.atomic():
+            remove_experience(previous)
+            add_experience(current)
+        return
+
+    # Same company: apply the net delta in one UPDATE
+    deltas = contribution(current)
+    for field, delta in contribution(previous).items():
+        deltas[field] = deltas.get(field, 0) - delta
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    updates['latest_interview_date'] = _latest_with(current['interview_date'])
+    CompanyStats.objects.filter(company_key=key).update(**updates)
+    if current['interview_date'] < previous['interview_date']:
+        _refresh_latest(key)
+
+
+def computed_stats():
+    """
+    Stats per company key computed from scratch: one query grouped by the
+    exact company name, merged in Python under ``company_key`` (see
+    ``_latest_for`` for why not in SQL).
+    """
+    aggregates = {
+        'experience_count': Count('id'),
+        'rating_total': Coalesce(Sum('rating'), 0),
+        'rounds_total': Coalesce(Sum('rounds'), 0),
+        'latest_interview_date': Max('interview_date'),
+    }
+    for value, _ in InterviewExperience.DIFFICULTY_CHOICES:
+        aggregates[f'{value}_count'] = Count('id', filter=Q(difficulty=value))
+    for value, _ in InterviewExperience.INTERVIEW_STATUS_CHOICES:
+        aggregates[f'{value}_count'] = Count('id', filter=Q(status=value))
+    rows = (
+        InterviewExperience.objects.order_by('company_name')
+        .values('company_name')
+        .annotate(**aggregates)
+    )
+
+    stats = {}
+    for row in rows:
+        key = company_key(row['company_name'])
+        merged = stats.get(key)
+        if merged is None:
+            stats[key] = dict(row, company_name=row['company_name'].strip())
+            continue
+        for field in COUNTER_FIELDS:
+            merged[field] += row[field]
+        merged['latest_interview_date'] = max(merged['latest_interview_date'], row['latest_interview_date'])
+    return stats
@@ -0,0 +1,45 @@
+"""
+gzip for API responses.
+
+JSON lists shrink five to ten times under gzip, but compressing costs CPU on
+every request, so only bodies of at least ``GZIP_MIN_LENGTH`` bytes are
+compressed. Cached public responses carry a variant compressed once, when
+the entry is built (see ``cache.py``); they and WhiteNoise's precompressed
+static files already have a ``Content-Encoding`` and are passed through.
+"""
+
+import gzip
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware, re_accepts_gzip
+
+
+def accepts_gzip(request):
+    return bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def precompress(content):
+    """
+    ``content`` gzipped at the highest level, or ``None`` when it is below
+    the threshold or would not shrink. The cost is paid once per cache entry,
+    not per request.
+    """
+    if len(content) < settings.GZIP_MIN_LENGTH:
+        return None
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    return compressed if len(compressed) < len(content) else None
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """
+    ``GZipMiddleware`` that leaves bodies under ``GZIP_MIN_LENGTH`` and
+    Server-Sent Events alone.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.GZIP_MIN_LENGTH:
+            return response
+        # Event streams must reach the client message by message
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,160 @@
+"""
+Writes to the ``ActivityEvent`` log.
+
+Events are queued once their transaction commits and written with one
+``bulk_create`` when ``ACTIVITY_LOG['BUFFER_SIZE']`` of them are waiting or
+the oldest has waited ``FLUSH_INTERVAL`` seconds, so a request does not pay
+for an INSERT of its own. Pending events are flushed at exit; a crashed
+process loses at most one buffer. Usernames the caller did not have loaded
+are looked up with one query per flush. ``activity_logged`` is sent after
+every flush (see ``streams.py``).
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import ActivityEvent, CustomUser
+
+logger = logging.getLogger(__name__)
+
+# Sent after a flush: sender=ActivityEvent, count
+activity_logged = Signal()
+
+VERBS = {'created': 'Added', 'updated': 'Updated', 'deleted': 'Deleted'}
+
+
+class EventBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._timer = None
+
+    def extend(self, events):
+        config = settings.ACTIVITY_LOG
+        with self._lock:
+            self._events.extend(events)
+            full = len(self._events) >= config['BUFFER_SIZE']
+            if not full and self._events and self._timer is None:
+                self._timer = threading.Timer(config['FLUSH_INTERVAL'], self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write every pending event; returns how many were written."""
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return 0
+        try:
+            fill_usernames(events)
+            ActivityEvent.objects.bulk_create(events)
+        except DatabaseError:
+            # The log is best effort; never fail the caller over it
+            logger.exception('Dropped %d activity event(s)', len(events))
+            return 0
+        activity_logged.send(sender=ActivityEvent, count=len(events))
+        return len(events)
+
+    def pending(self):
+        with self._lock:
+            return len(self._events)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # Connections are per thread; do not leak this one
+            connections.close_all()
+
+
+def fill_usernames(events):
+    missing = {event.user_id for event in events if event.user_id and not event.username}
+    if missing:
+        names = dict(CustomUser.objects.filter(pk__in=missing).values_list('pk', 'username'))
+        for event in events:
+            if not event.username:
+                # Blank if the user was deleted in the meantime
+                event.username = names.get(event.user_id, '')
+
+
+event_buffer = EventBuffer()
+atexit.register(event_buffer.flush)
+
+
+def record(*events):
+    """Queue ``events`` for the log once the current transaction commits."""
+    transaction.on_commit(lambda: event_buffer.extend(events))
+
+
+def user_event(event_type, user, action, **metadata):
+    return ActivityEvent(
+        event_type=event_type,
+        user_id=user.pk,
+        username=user.username,
+        object_id=user.pk,
+        action=action,
+        metadata=metadata,
+        created_at=timezone.now(),
+    )
+
+
+def registration_event(user):
+    return user_event('registration', user, 'New user registered', email=user.email)
+
+
+def login_event(user):
+    return user_event('login', user, 'Logged in')
+
+
+def interview_event(verb, interview, username):
+    return ActivityEvent(
+        event_type=f'interview_{verb}',
+        user_id=interview.user_id,
+        username=username,
+        object_id=interview.pk,
+        action=f'{VERBS[verb]} interview at {interview.company_name}',
+        metadata={
+            'company': interview.company_name,
+            'position': interview.position,
+            'status': interview.status,
+        },
+        created_at=timezone.now(),
+    )
+
+
+def task_event(verb, task, username):
+    return ActivityEvent(
+        event_type=f'task_{verb}',
+        user_id=task.user_id,
+        username=username,
+        object_id=task.pk,
+        action=f'{VERBS[verb]} {task.task_type} at {task.company_name}',
+        metadata={
+            'company': task.company_name,
+            'position': task.position,
+            'type': task.task_type,
+            'currently_working': task.currently_working,
+        },
+        created_at=timezone.now(),
+    )
+
+
+def webhook_event(data, username):
+    return ActivityEvent(
+        event_type='webhook',
+        username=str(username or '')[:150],
+        action=str(data.get('event_type') or 'unknown')[:255],
+        metadata=data.get('details') if isinstance(data.get('details'), dict) else {},
+        created_at=timezone.now(),
+    )
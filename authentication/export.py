@@ -0,0 +1,119 @@
+"""
+Streaming exports of the public experiences as JSON Lines or CSV.
+
+Rows are read with ``values()`` through ``iterator(chunk_size=...)`` (or
+``aiterator(chunk_size=...)`` under ASGI, see ``astream``) and written out
+as they arrive, so neither model instances nor the whole document are ever
+held in memory. Rows come in ``(updated_at, id)`` order;
+``since`` keeps those updated at or after a timestamp, and the
+``X-Export-Started`` header of one export is the ``since`` for the next.
+
+``updated_at`` is stamped when a row is saved, not when it commits, so a
+row committed during an export can carry a timestamp before that export
+started without having been read. ``since`` therefore reaches back
+``EXPORT_SINCE_OVERLAP_SECONDS`` further; the rows in the overlap may be
+exported twice, and clients keep the last copy of each ``id``. Deleted rows
+are not reported.
+"""
+
+import csv
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from .models import InterviewExperience, TaskExperience
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Export:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.columns = ['id', 'user_id', 'username'] + fields + ['created_at', 'updated_at']
+
+    def queryset(self, since=None):
+        queryset = self.model.objects.order_by('updated_at', 'id')
+        if since is not None:
+            overlap = timedelta(seconds=settings.EXPORT_SINCE_OVERLAP_SECONDS)
+            queryset = queryset.filter(updated_at__gte=since - overlap)
+        return queryset.values('id', 'user_id', *self.fields, 'created_at', 'updated_at', username=F('user__username'))
+
+    def rows(self, since=None):
+        return self.queryset(since).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+    def arows(self, since=None):
+        return self.queryset(since).aiterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+EXPORTS = {
+    'interviews': Export(InterviewExperience, [
+        'company_name', 'position', 'interview_date', 'status', 'difficulty', 'duration',
+        'rounds', 'description', 'technical_questions', 'hr_questions', 'tips', 'rating',
+        'salary_offered', 'location',
+    ]),
+    'tasks': Export(TaskExperience, [
+        'company_name', 'position', 'task_type', 'start_date', 'end_date', 'currently_working',
+        'description', 'key_responsibilities', 'technologies_used', 'achievements',
+        'project_url', 'github_url', 'location',
+    ]),
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line for the generator to yield."""
+
+    def write(self, value):
+        return value
+
+
+def formatter(export, fmt):
+    """Return the header lines of ``fmt`` and a function writing one row as a line."""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+
+        def line(row):
+            return writer.writerow([
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in (row[column] for column in export.columns)
+            ])
+        return [writer.writerow(export.columns)], line
+
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def line(row):
+        return encoder.encode({column: row[column] for column in export.columns}) + '\n'
+    return [], line
+
+
+def stream(kind, fmt, since=None):
+    """Return an iterator of text lines exporting ``kind`` in ``fmt``."""
+    export = EXPORTS[kind]
+    header, line = formatter(export, fmt)
+    yield from header
+    for row in export.rows(since):
+        yield line(row)
+
+
+async def astream(kind, fmt, since=None):
+    """
+    ``stream`` as an async iterator, for ASGI, where Django would otherwise
+    consume a sync iterator in a thread and buffer the whole body. Lines are
+    sent a chunk of rows at a time, so ``GZipMiddleware``, which compresses
+    each part it is handed on its own, gets parts worth compressing.
+    """
+    export = EXPORTS[kind]
+    header, line = formatter(export, fmt)
+    lines = list(header)
+    async for row in export.arows(since):
+        lines.append(line(row))
+        if len(lines) >= settings.EXPORT_CHUNK_SIZE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
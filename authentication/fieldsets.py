@@ -0,0 +1,66 @@
+"""
+Sparse fieldsets for the experience list endpoints.
+
+``?fields=a,b`` renders only the named fields, ``?omit=a,b`` drops some and
+``?view=summary`` picks the serializer's ``Meta.summary_fields``. ``id`` is
+always kept. Columns that are not rendered are deferred in SQL as well, so a
+compact list never reads the large text fields.
+"""
+
+from rest_framework.exceptions import ValidationError
+
+VIEWS = ('full', 'summary')
+
+
+def parse_fieldset(params, serializer_class):
+    """Return the field names to render (``None`` for all) or raise ``ValidationError``."""
+    available = list(serializer_class().fields)
+    errors = {}
+    selected = None
+
+    view = params.get('view') or 'full'
+    if view not in VIEWS:
+        errors['view'] = [f"expected one of: {', '.join(VIEWS)}"]
+    elif view == 'summary':
+        selected = set(serializer_class.Meta.summary_fields)
+
+    for param in ('fields', 'omit'):
+        raw = params.get(param)
+        if raw is None:
+            continue
+        names = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown or not names:
+            errors[param] = [f"expected a comma separated subset of: {', '.join(available)}"]
+        elif param == 'fields':
+            selected = set(names)
+        else:
+            selected = (set(available) if selected is None else selected) - set(names)
+
+    if errors:
+        raise ValidationError(errors)
+    if selected is not None:
+        selected.add('id')
+    return selected
+
+
+def fieldset_key(selected):
+    """Stable text form of a fieldset, e.g. for ETags."""
+    return '' if selected is None else ','.join(sorted(selected))
+
+
+def defer_unselected(queryset, selected, ordering=()):
+    """
+    Defer the concrete columns ``selected`` leaves out, except relations and
+    anything the ordering (given, or the queryset's/model's) needs to read.
+    """
+    if selected is None:
+        return queryset
+    ordering = tuple(ordering) or tuple(queryset.query.order_by) or tuple(queryset.model._meta.ordering)
+    keep = set(selected) | {name.lstrip('-') for name in ordering}
+    deferred = [
+        field.name
+        for field in queryset.model._meta.concrete_fields
+        if field.name not in keep and not field.primary_key and not field.is_relation
+    ]
+    return queryset.defer(*deferred)
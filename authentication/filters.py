@@ -0,0 +1,189 @@
+"""
+Server-side filters, sort orders and facet counts for the public feeds.
+
+Every filter belongs to a *group* (``status``, ``rating``, ...).  Facet
+counts for a group are computed under all the other groups' filters but not
+its own, so the sidebar keeps showing the alternatives to what is selected,
+and all of them come from one conditional-aggregation query.
+"""
+
+from datetime import date
+
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+from .models import InterviewExperience, TaskExperience
+from .pagination import INTERVIEW_FEED_ORDERING, TASK_FEED_ORDERING
+
+
+def choice_filter(field, choices):
+    allowed = [value for value, _ in choices]
+
+    def build(raw):
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        invalid = [value for value in values if value not in allowed]
+        if invalid or not values:
+            raise ValueError(f"expected a comma separated subset of: {', '.join(allowed)}")
+        return Q(**{f'{field}__in': values})
+    return build
+
+
+def int_filter(lookup, minimum, maximum):
+    def build(raw):
+        value = int(raw)
+        if not minimum <= value <= maximum:
+            raise ValueError(f'expected an integer from {minimum} to {maximum}')
+        return Q(**{lookup: value})
+    return build
+
+
+def date_filter(lookup):
+    def build(raw):
+        return Q(**{lookup: date.fromisoformat(raw)})
+    return build
+
+
+def bool_filter(field):
+    def build(raw):
+        value = raw.lower()
+        if value not in ('true', 'false', '1', '0'):
+            raise ValueError('expected true or false')
+        return Q(**{field: value in ('true', '1')})
+    return build
+
+
+def text_filter(lookup):
+    def build(raw):
+        return Q(**{lookup: raw.strip()})
+    return build
+
+
+class FeedFilterSet:
+    """
+    Declarative filters, facets and sort orders for one public feed.
+
+    ``filters`` maps a query parameter to ``(group, builder)``; ``facets``
+    maps a field (which is also its group) to the values to count.
+    """
+
+    def __init__(self, model, filters, facets, sorts, default_sort):
+        self.model = model
+        self.filters = filters
+        self.facets = facets
+        self.sorts = sorts
+        self.default_sort = default_sort
+
+    def parse(self, params):
+        """Return ``(conditions by group, ordering)`` or raise ``ValidationError``."""
+        errors = {}
+        conditions = {}
+        for param, (group, build) in self.filters.items():
+            raw = params.get(param)
+            if raw in (None, ''):
+                continue
+            try:
+                condition = build(raw)
+            except ValueError as exc:
+                errors[param] = [str(exc)]
+                continue
+            conditions[group] = conditions.get(group, Q()) & condition
+
+        sort = params.get('sort', self.default_sort)
+        if sort not in self.sorts:
+            errors['sort'] = [f"expected one of: {', '.join(self.sorts)}"]
+        if errors:
+            raise ValidationError(errors)
+        return conditions, self.sorts[sort]
+
+    def filter(self, queryset, conditions):
+        for condition in conditions.values():
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def facet_counts(self, queryset, conditions):
+        """Count every facet value in a single aggregate query."""
+        aggregates, labels = self._facet_aggregates(conditions)
+        return self._facet_result(queryset.order_by().aggregate(**aggregates), labels)
+
+    async def afacet_counts(self, queryset, conditions):
+        aggregates, labels = self._facet_aggregates(conditions)
+        return self._facet_result(await queryset.order_by().aaggregate(**aggregates), labels)
+
+    def _facet_aggregates(self, conditions):
+        aggregates = {'total': Count('pk', filter=self._combine(conditions.values()))}
+        labels = {}
+        for field, values in self.facets.items():
+            others = self._combine(
+                condition for group, condition in conditions.items() if group != field
+            )
+            for index, value in enumerate(values):
+                alias = f'{field}_{index}'
+                labels[alias] = (field, value)
+                aggregates[alias] = Count('pk', filter=others & Q(**{field: value}))
+        return aggregates, labels
+
+    def _facet_result(self, row, labels):
+        counts = {field: {} for field in self.facets}
+        for alias, (field, value) in labels.items():
+            key = str(value).lower() if isinstance(value, bool) else str(value)
+            counts[field][key] = row[alias]
+        counts['total'] = row['total']
+        return counts
+
+    @staticmethod
+    def _combine(conditions):
+        combined = Q()
+        for condition in conditions:
+            combined &= condition
+        return combined
+
+
+INTERVIEW_FILTERS = FeedFilterSet(
+    InterviewExperience,
+    filters={
+        'company': ('company_name', text_filter('company_name__iexact')),
+        'status': ('status', choice_filter('status', InterviewExperience.INTERVIEW_STATUS_CHOICES)),
+        'difficulty': ('difficulty', choice_filter('difficulty', InterviewExperience.DIFFICULTY_CHOICES)),
+        'rating_min': ('rating', int_filter('rating__gte', 1, 5)),
+        'rating_max': ('rating', int_filter('rating__lte', 1, 5)),
+        'date_from': ('interview_date', date_filter('interview_date__gte')),
+        'date_to': ('interview_date', date_filter('interview_date__lte')),
+        'location': ('location', text_filter('location__icontains')),
+    },
+    facets={
+        'status': [value for value, _ in InterviewExperience.INTERVIEW_STATUS_CHOICES],
+        'difficulty': [value for value, _ in InterviewExperience.DIFFICULTY_CHOICES],
+        'rating': [1, 2, 3, 4, 5],
+    },
+    sorts={
+        'newest': INTERVIEW_FEED_ORDERING,
+        'oldest': ('created_at', 'id'),
+        'interview_date': ('-interview_date', '-id'),
+        'rating': ('-rating', '-created_at', '-id'),
+        'company': ('company_name', 'id'),
+    },
+    default_sort='newest',
+)
+
+TASK_FILTERS = FeedFilterSet(
+    TaskExperience,
+    filters={
+        'company': ('company_name', text_filter('company_name__iexact')),
+        'task_type': ('task_type', choice_filter('task_type', TaskExperience.TASK_TYPE_CHOICES)),
+        'currently_working': ('currently_working', bool_filter('currently_working')),
+        'date_from': ('start_date', date_filter('start_date__gte')),
+        'date_to': ('start_date', date_filter('start_date__lte')),
+        'location': ('location', text_filter('location__icontains')),
+    },
+    facets={
+        'task_type': [value for value, _ in TaskExperience.TASK_TYPE_CHOICES],
+        'currently_working': [True, False],
+    },
+    sorts={
+        'start_date': TASK_FEED_ORDERING,
+        'oldest': ('start_date', 'id'),
+        'newest': ('-created_at', '-id'),
+        'company': ('company_name', 'id'),
+    },
+    default_sort='start_date',
+)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import CustomUser
+from authentication.synthetic import PASSWORD, generate
+
+
+class Command(BaseCommand):
+    help = 'Create deterministic synthetic users and experiences for benchmarks or staging'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--interviews', type=int, default=1000)
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Same seed, same rows; use a new seed to add a second data set',
+        )
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        if CustomUser.objects.filter(username__startswith=f'synthetic{seed}_').exists():
+            raise CommandError(f'Synthetic data for seed {seed} already exists; pick another --seed')
+
+        start = time.monotonic()
+        generate(options['users'], options['interviews'], options['tasks'], seed=seed)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {options['users']} user(s), {options['interviews']} interview(s) and "
+                f"{options['tasks']} task(s) in {time.monotonic() - start:.1f}s. "
+                f"Users log in as synthetic{seed}_<n>@example.com / {PASSWORD}"
+            )
+        )
@@ -0,0 +1,241 @@
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from authentication.models import CustomUser, UserProfile
+from authentication.serializers import InterviewExperienceSerializer, TaskExperienceSerializer
+from authentication.signals import bulk_created
+
+SERIALIZERS = {
+    'interviews': InterviewExperienceSerializer,
+    'tasks': TaskExperienceSerializer,
+}
+
+
+class InvalidRow(Exception):
+    pass
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield InvalidRow(f'invalid JSON: {exc}')
+            continue
+        yield row if isinstance(row, dict) else InvalidRow('expected a JSON object')
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        # Empty cells mean "not given", so model defaults apply
+        yield {key: value for key, value in row.items() if value != ''}
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+class Command(BaseCommand):
+    help = 'Import interview or task experiences from an NDJSON or CSV file in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read, or '-' for stdin")
+        parser.add_argument('--type', choices=SERIALIZERS, required=True, dest='kind')
+        parser.add_argument(
+            '--format',
+            choices=READERS,
+            default=None,
+            help='Input format (default: from the file extension, else ndjson)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows validated and written per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--offset',
+            type=int,
+            default=0,
+            help='Skip the first N data rows, e.g. to resume an interrupted import',
+        )
+        parser.add_argument(
+            '--create-users',
+            action='store_true',
+            help='Create users for unknown emails instead of rejecting their rows',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row and resolve users without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['offset'] < 0:
+            raise CommandError('--batch-size must be positive and --offset not negative')
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        self.serializer_class = SERIALIZERS[options['kind']]
+        self.create_users = options['create_users']
+        self.dry_run = options['dry_run']
+        # Lower-cased email -> user id; 0 for unknown, None for "would create" in dry runs
+        self.users = {}
+        self.totals = {'imported': 0, 'invalid': 0, 'users_created': 0}
+
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as exc:
+                raise CommandError(exc)
+
+        position = options['offset']
+        start = time.monotonic()
+        try:
+            with stream:
+                rows = islice(READERS[fmt](stream), position, None)
+                while True:
+                    batch = list(islice(rows, options['batch_size']))
+                    if not batch:
+                        break
+                    self.import_batch(position, batch)
+                    position += len(batch)
+        except (KeyboardInterrupt, Exception) as exc:
+            self.stderr.write(
+                f'Stopped before row {position} ({exc!r}); '
+                f'rows before it are committed. Resume with --offset {position}'
+            )
+            raise CommandError('import interrupted') from exc
+
+        processed = position - options['offset']
+        elapsed = time.monotonic() - start
+        rate = processed / elapsed if elapsed else processed
+        verb = 'Validated' if self.dry_run else 'Imported'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {self.totals['imported']} of {processed} row(s), "
+                f"{self.totals['invalid']} invalid, {self.totals['users_created']} user(s) "
+                f"{'to create' if self.dry_run else 'created'} in {elapsed:.2f}s "
+                f'({rate:,.0f} rows/s)'
+            )
+        )
+
+    def import_batch(self, first, batch):
+        child = self.serializer_class()
+        valid = []
+        for number, row in enumerate(batch, start=first):
+            try:
+                if isinstance(row, InvalidRow):
+                    raise row
+                email = (row.get('email') or '').strip()
+                if not email:
+                    raise InvalidRow('email is required')
+                attrs = child.run_validation(row)
+                created_at = self.parse_created_at(row)
+            except ValidationError as exc:
+                self.reject(number, exc.detail)
+                continue
+            except InvalidRow as exc:
+                self.reject(number, exc)
+                continue
+            valid.append((number, email, row, attrs, created_at))
+
+        with transaction.atomic():
+            self.resolve_users({email.lower(): row for _, email, row, _, _ in valid})
+            instances = []
+            for number, email, _, attrs, created_at in valid:
+                user_id = self.users.get(email.lower(), 0)
+                if user_id == 0:
+                    self.reject(number, f'unknown user {email}')
+                    continue
+                instances.append((dict(attrs, user_id=user_id), created_at))
+            if instances and not self.dry_run:
+                self.write(instances)
+        self.totals['imported'] += len(instances)
+
+        self.stdout.write(
+            f'  rows {first}-{first + len(batch) - 1}: {len(instances)} ok, '
+            f'{len(batch) - len(instances)} rejected'
+        )
+
+    def parse_created_at(self, row):
+        """The row's own ``created_at``, if given; otherwise the row is created now."""
+        value = row.get('created_at')
+        if value is None:
+            return None
+        created_at = parse_datetime(value) if isinstance(value, str) else None
+        if created_at is None:
+            raise InvalidRow('created_at: expected an ISO 8601 datetime')
+        if timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+        return created_at
+
+    def write(self, instances):
+        """
+        One ``bulk_create``, then ``bulk_created`` with ``imported=True``:
+        the rollup counts the rows on the days they were created, and the
+        activity log and stream, which report what happens live, skip them.
+        """
+        model = self.serializer_class.Meta.model
+        created = model.objects.bulk_create([model(**attrs) for attrs, _ in instances])
+        # auto_now_add overwrote the given timestamps on the way in
+        backdated = []
+        for instance, (_, created_at) in zip(created, instances):
+            if created_at is not None:
+                instance.created_at = created_at
+                backdated.append(instance)
+        if backdated:
+            model.objects.bulk_update(backdated, ['created_at'])
+        bulk_created.send(sender=model, instances=created, imported=True)
+
+    def reject(self, number, error):
+        self.totals['invalid'] += 1
+        self.stdout.write(self.style.WARNING(f'  row {number}: {error}'))
+
+    def resolve_users(self, rows_by_email):
+        """Fill ``self.users`` for the batch's new emails with one query."""
+        missing = [email for email in rows_by_email if email not in self.users]
+        if not missing:
+            return
+        found = (
+            CustomUser.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=missing)
+            .values_list('email_lower', 'id')
+        )
+        self.users.update(found)
+        for email in missing:
+            if email in self.users:
+                continue
+            self.users[email] = self.create_user(rows_by_email[email]) if self.create_users else 0
+
+    def create_user(self, row):
+        """Create a user (unusable password) for ``row``; returns its id, or 0 on a clash."""
+        self.totals['users_created'] += 1
+        if self.dry_run:
+            return None
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create_user(
+                    username=row.get('username') or row['email'].strip(),
+                    email=row['email'].strip(),
+                    password=None,
+                )
+                UserProfile.objects.create(user=user)
+        except IntegrityError:
+            # Username taken by someone else; reject this email's rows
+            self.totals['users_created'] -= 1
+            return 0
+        return user.pk
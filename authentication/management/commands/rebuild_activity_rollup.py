@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from authentication.models import CustomUser, DailyActivity, InterviewExperience, TaskExperience
+from authentication.rollup import invalidate_closed_totals
+from authentication.utils import day_bounds
+
+# Rollup counters that can be recomputed from the source tables. Logins are
+# only ever recorded as they happen, so they are left untouched.
+#
+# Closed days keep counting rows that were deleted later (see rollup.py), so
+# for them the source tables only give a lower bound: a closed day is out of
+# sync when it counts fewer rows than still exist, and is raised to that
+# count, never lowered. Today's open row must match exactly.
+SOURCES = {
+    'registrations': CustomUser,
+    'interview_submissions': InterviewExperience,
+    'task_submissions': TaskExperience,
+}
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or reconcile the DailyActivity rollup from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Only reconcile the last N days (default: all history)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report mismatches without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days'] is not None:
+            since = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        expected = {}
+        for field, model in SOURCES.items():
+            queryset = model.objects.all()
+            if since is not None:
+                queryset = queryset.filter(created_at__gte=day_bounds(since)[0])
+            rows = (
+                queryset.annotate(day=TruncDate('created_at'))
+                .order_by()
+                .values('day')
+                .annotate(total=Count('id'))
+            )
+            for row in rows:
+                expected.setdefault(row['day'], dict.fromkeys(SOURCES, 0))[field] = row['total']
+
+        existing = DailyActivity.objects.all()
+        if since is not None:
+            existing = existing.filter(date__gte=since)
+        existing = {row.date: row for row in existing}
+
+        today = timezone.localdate()
+        to_create, to_update = [], []
+        for day in sorted(set(expected) | set(existing)):
+            counts = expected.get(day, dict.fromkeys(SOURCES, 0))
+            row = existing.get(day)
+            if row is None:
+                to_create.append(DailyActivity(date=day, **counts))
+                self.stdout.write(f'  {day}: missing row, expected {counts}')
+                continue
+            actual = {field: getattr(row, field) for field in SOURCES}
+            if day < today:
+                counts = {field: max(actual[field], counts[field]) for field in SOURCES}
+            if actual != counts:
+                self.stdout.write(f'  {day}: rollup {actual} != source {counts}')
+                for field, value in counts.items():
+                    setattr(row, field, value)
+                row.updated_at = timezone.now()
+                to_update.append(row)
+
+        mismatches = len(to_create) + len(to_update)
+        if options['check']:
+            style = self.style.WARNING if mismatches else self.style.SUCCESS
+            self.stdout.write(style(f'{mismatches} day(s) out of sync'))
+            return
+
+        with transaction.atomic():
+            DailyActivity.objects.bulk_create(to_create)
+            DailyActivity.objects.bulk_update(to_update, list(SOURCES) + ['updated_at'])
+        invalidate_closed_totals()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rollup rebuilt: {len(to_create)} day(s) created, {len(to_update)} updated'
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+
+from authentication.search import SEARCH_INDEXES, fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search indexes from the experience tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            choices=sorted(SEARCH_INDEXES),
+            help='Only rebuild one index (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        kinds = [options['type']] if options['type'] else list(SEARCH_INDEXES)
+        for kind in kinds:
+            index = SEARCH_INDEXES[kind]
+            connection = connections[router.db_for_write(index.model)]
+            if not fts_available(connection, index.table):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'{kind}: no FTS index on this database ({connection.vendor}); '
+                        'search uses the LIKE fallback. Run migrate on SQLite to create it.'
+                    )
+                )
+                continue
+            rebuild_index(kind, connection)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: rebuilt {index.table}'))
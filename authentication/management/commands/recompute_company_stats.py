@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from authentication.companies import COUNTER_FIELDS, computed_stats
+from authentication.models import CompanyStats
+
+COMPARED_FIELDS = COUNTER_FIELDS + ['latest_interview_date']
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-company interview statistics from scratch, or verify them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Compare the stored stats with a fresh computation without writing',
+        )
+
+    def handle(self, *args, **options):
+        expected = computed_stats()
+        stored = {stats.company_key: stats for stats in CompanyStats.objects.all()}
+
+        mismatches = []
+        for key in sorted(set(expected) | set(stored)):
+            want = expected.get(key)
+            have = stored.get(key)
+            if want is None:
+                mismatches.append(f'  {key}: stored but has no interviews')
+            elif have is None:
+                mismatches.append(f'  {key}: missing')
+            else:
+                diffs = [
+                    f'{field} {getattr(have, field)} != {want[field]}'
+                    for field in COMPARED_FIELDS
+                    if getattr(have, field) != want[field]
+                ]
+                if diffs:
+                    mismatches.append(f"  {key}: {', '.join(diffs)}")
+
+        for line in mismatches:
+            self.stdout.write(line)
+
+        if options['verify']:
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} company stat row(s) out of sync')
+            self.stdout.write(self.style.SUCCESS(f'{len(expected)} company stat row(s) verified'))
+            return
+
+        with transaction.atomic():
+            CompanyStats.objects.all().delete()
+            CompanyStats.objects.bulk_create([
+                CompanyStats(company_key=key, **values) for key, values in expected.items()
+            ])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Recomputed {len(expected)} company stat row(s), fixed {len(mismatches)}'
+            )
+        )
@@ -1,11 +1,20 @@
-from django.core.management.base import BaseCommand
+import json
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
-from datetime import timedelta
+
+from authentication.activity import POLL_LIMIT, high_water_mark, poll, recent_events
 from authentication.models import CustomUser, InterviewExperience, TaskExperience
 
+STATUS_EMOJI = {'selected': '✅', 'rejected': '❌', 'pending': '⏳', 'in_progress': '🔄'}
+TYPE_ICONS = {'registration': '👥', 'interview': '📝', 'task': '💼'}
+
+
 class Command(BaseCommand):
     help = 'Show recent user activity from the frontend website'
-    
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--days',
@@ -16,79 +25,109 @@ class Command(BaseCommand):
         parser.add_argument(
             '--live',
             action='store_true',
-            help='Show live monitoring mode',
+            help='Keep running and print new activity as it arrives',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds between polls for new activity in --live mode (default: 2)',
         )
-    
+        parser.add_argument(
+            '--format',
+            choices=('text', 'json'),
+            default='text',
+            help='text for people, json for one JSON event per line (default: text)',
+        )
+
     def handle(self, *args, **options):
+        if options['interval'] <= 0:
+            raise CommandError('--interval must be positive')
         days = options['days']
-        live_mode = options['live']
-        
-        now = timezone.now()
-        cutoff_date = now - timedelta(days=days)
-        
+        fmt = options['format']
+
+        # Taken first, so the report and the live tail neither overlap nor miss events
+        mark = high_water_mark()
+        events = recent_events(timezone.now() - timedelta(days=days), mark)
+
+        if fmt == 'json':
+            for event in reversed(events):
+                self.write_json(event)
+        else:
+            self.report(days, events)
+
+        if options['live']:
+            self.follow(mark, options['interval'], fmt)
+
+    def report(self, days, events):
         self.stdout.write(
             self.style.SUCCESS(
                 f'\n🌐 RECursion Frontend Activity Monitor (Last {days} days)\n'
                 + '=' * 60
             )
         )
-        
-        # Recent registrations
-        new_users = CustomUser.objects.filter(created_at__gte=cutoff_date).order_by('-created_at')
-        self.stdout.write(f'\n👥 NEW REGISTRATIONS ({new_users.count()}):')
-        if new_users:
-            for user in new_users:
-                time_ago = self.time_ago(user.created_at)
-                self.stdout.write(f'  • {user.username} ({user.email}) - {time_ago}')
-        else:
-            self.stdout.write('  No new registrations')
-        
-        # Recent interview experiences
-        recent_interviews = InterviewExperience.objects.filter(created_at__gte=cutoff_date).order_by('-created_at')
-        self.stdout.write(f'\n📝 INTERVIEW EXPERIENCES SUBMITTED ({recent_interviews.count()}):')
-        if recent_interviews:
-            for interview in recent_interviews:
-                time_ago = self.time_ago(interview.created_at)
-                status_emoji = {'selected': '✅', 'rejected': '❌', 'pending': '⏳', 'in_progress': '🔄'}.get(interview.status, '📝')
-                self.stdout.write(
-                    f'  • {interview.user.username}: {interview.company_name} - {interview.position} '
-                    f'{status_emoji} {interview.status} - {time_ago}'
-                )
-        else:
-            self.stdout.write('  No interview experiences submitted')
-        
-        # Recent task experiences
-        recent_tasks = TaskExperience.objects.filter(created_at__gte=cutoff_date).order_by('-created_at')
-        self.stdout.write(f'\n💼 TASK EXPERIENCES SUBMITTED ({recent_tasks.count()}):')
-        if recent_tasks:
-            for task in recent_tasks:
-                time_ago = self.time_ago(task.created_at)
-                status_emoji = '🟢' if task.currently_working else '⚫'
-                self.stdout.write(
-                    f'  • {task.user.username}: {task.company_name} - {task.position} '
-                    f'{status_emoji} {task.task_type} - {time_ago}'
-                )
-        else:
-            self.stdout.write('  No task experiences submitted')
-        
+
+        sections = (
+            ('registration', '👥 NEW REGISTRATIONS', 'No new registrations'),
+            ('interview', '📝 INTERVIEW EXPERIENCES SUBMITTED', 'No interview experiences submitted'),
+            ('task', '💼 TASK EXPERIENCES SUBMITTED', 'No task experiences submitted'),
+        )
+        for kind, title, empty in sections:
+            rows = [event for event in events if event['type'] == kind]
+            self.stdout.write(f'\n{title} ({len(rows)}):')
+            for event in rows:
+                time_ago = self.time_ago(datetime.fromisoformat(event['timestamp']))
+                self.stdout.write(f'  • {self.describe(event)} - {time_ago}')
+            if not rows:
+                self.stdout.write(f'  {empty}')
+
         # Summary stats
-        total_activity = new_users.count() + recent_interviews.count() + recent_tasks.count()
         self.stdout.write(f'\n📊 SUMMARY:')
         self.stdout.write(f'  Total Users: {CustomUser.objects.count()}')
         self.stdout.write(f'  Total Interviews: {InterviewExperience.objects.count()}')
         self.stdout.write(f'  Total Tasks: {TaskExperience.objects.count()}')
-        self.stdout.write(f'  Recent Activity Items: {total_activity}')
-        
-        if live_mode:
-            self.stdout.write(f'\n🔴 LIVE MODE: Run this command periodically to monitor activity')
-            self.stdout.write(f'Command: python manage.py show_activity --days 1')
-        
+        self.stdout.write(f'  Recent Activity Items: {len(events)}')
         self.stdout.write('\n' + '=' * 60)
-    
+
+    def follow(self, mark, interval, fmt):
+        """Poll the activity log past the high-water mark until interrupted."""
+        if fmt == 'text':
+            self.stdout.write(f'\n🔴 LIVE MODE: polling every {interval:g}s, Ctrl+C to stop')
+        try:
+            while True:
+                events, mark = poll(mark)
+                for event in events:
+                    if fmt == 'json':
+                        self.write_json(event)
+                    else:
+                        stamp = timezone.localtime(datetime.fromisoformat(event['timestamp']))
+                        self.stdout.write(
+                            f"[{stamp:%H:%M:%S}] {TYPE_ICONS[event['type']]} {self.describe(event)}"
+                        )
+                self.stdout.flush()
+                # A full batch means more rows are waiting
+                if len(events) < POLL_LIMIT:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def write_json(self, event):
+        self.stdout.write(json.dumps(event, ensure_ascii=False))
+
+    def describe(self, event):
+        meta = event['metadata']
+        if event['type'] == 'registration':
+            return f"{event['user']} ({meta['email']})"
+        if event['type'] == 'interview':
+            status_emoji = STATUS_EMOJI.get(meta['status'], '📝')
+            return f"{event['user']}: {meta['company']} - {meta['position']} {status_emoji} {meta['status']}"
+        status_emoji = '🟢' if meta['currently_working'] else '⚫'
+        return f"{event['user']}: {meta['company']} - {meta['position']} {status_emoji} {meta['type']}"
+
     def time_ago(self, datetime_obj):
         now = timezone.now()
         diff = now - datetime_obj
-        
+
         if diff.days > 0:
             return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
         elif diff.seconds > 3600:
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_taskexperience_interviewexperience'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['created_at'], name='user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['last_login'], name='user_last_login_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewexperience',
+            index=models.Index(fields=['user', 'created_at'], name='interview_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewexperience',
+            index=models.Index(fields=['created_at'], name='interview_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewexperience',
+            index=models.Index(fields=['status', 'difficulty'], name='interview_status_diff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewexperience',
+            index=models.Index(fields=['company_name'], name='interview_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskexperience',
+            index=models.Index(fields=['user', 'start_date'], name='task_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskexperience',
+            index=models.Index(fields=['start_date'], name='task_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskexperience',
+            index=models.Index(fields=['created_at'], name='task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskexperience',
+            index=models.Index(fields=['company_name'], name='task_company_idx'),
+        ),
+    ]
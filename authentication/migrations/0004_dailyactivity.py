@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('registrations', models.IntegerField(default=0)),
+                ('logins', models.IntegerField(default=0)),
+                ('interview_submissions', models.IntegerField(default=0)),
+                ('task_submissions', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'daily activity',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('company_key', models.CharField(max_length=200, unique=True)),
+                ('company_name', models.CharField(max_length=200)),
+                ('experience_count', models.IntegerField(default=0)),
+                ('rating_total', models.IntegerField(default=0)),
+                ('rounds_total', models.IntegerField(default=0)),
+                ('easy_count', models.IntegerField(default=0)),
+                ('medium_count', models.IntegerField(default=0)),
+                ('hard_count', models.IntegerField(default=0)),
+                ('selected_count', models.IntegerField(default=0)),
+                ('rejected_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('latest_interview_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'company stats',
+                'ordering': ['-experience_count', 'company_key'],
+                'indexes': [models.Index(fields=['-experience_count', 'company_key'], name='company_stats_count_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_companystats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interviewexperience',
+            index=models.Index(fields=['updated_at'], name='interview_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskexperience',
+            index=models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ),
+    ]
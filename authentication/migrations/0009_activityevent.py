@@ -0,0 +1,84 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+BATCH_SIZE = 1000
+
+
+def backfill(apps, schema_editor):
+    """Log a created event for every existing user, interview and task."""
+    ActivityEvent = apps.get_model('authentication', 'ActivityEvent')
+    CustomUser = apps.get_model('authentication', 'CustomUser')
+    InterviewExperience = apps.get_model('authentication', 'InterviewExperience')
+    TaskExperience = apps.get_model('authentication', 'TaskExperience')
+
+    def users():
+        for user in CustomUser.objects.order_by('created_at').iterator(BATCH_SIZE):
+            yield ActivityEvent(
+                event_type='registration', user_id=user.pk, username=user.username,
+                object_id=user.pk, action='New user registered',
+                metadata={'email': user.email}, created_at=user.created_at,
+            )
+
+    def interviews():
+        rows = InterviewExperience.objects.select_related('user').order_by('created_at')
+        for row in rows.iterator(BATCH_SIZE):
+            yield ActivityEvent(
+                event_type='interview_created', user_id=row.user_id, username=row.user.username,
+                object_id=row.pk, action=f'Added interview at {row.company_name}',
+                metadata={'company': row.company_name, 'position': row.position, 'status': row.status},
+                created_at=row.created_at,
+            )
+
+    def tasks():
+        rows = TaskExperience.objects.select_related('user').order_by('created_at')
+        for row in rows.iterator(BATCH_SIZE):
+            yield ActivityEvent(
+                event_type='task_created', user_id=row.user_id, username=row.user.username,
+                object_id=row.pk, action=f'Added {row.task_type} at {row.company_name}',
+                metadata={
+                    'company': row.company_name, 'position': row.position,
+                    'type': row.task_type, 'currently_working': row.currently_working,
+                },
+                created_at=row.created_at,
+            )
+
+    for events in (users(), interviews(), tasks()):
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) == BATCH_SIZE:
+                ActivityEvent.objects.bulk_create(batch)
+                batch = []
+        ActivityEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_export_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('registration', 'Registration'), ('login', 'Login'), ('interview_created', 'Interview created'), ('interview_updated', 'Interview updated'), ('interview_deleted', 'Interview deleted'), ('task_created', 'Task created'), ('task_updated', 'Task updated'), ('task_deleted', 'Task deleted'), ('webhook', 'Webhook')], max_length=20)),
+                ('username', models.CharField(blank=True, max_length=150)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('action', models.CharField(max_length=255)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['created_at', 'id'], name='activity_created_idx'), models.Index(fields=['event_type', 'created_at'], name='activity_type_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.23 on 2026-10-17 20:13
+
+import authentication.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_activityevent'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', authentication.models.CustomUserManager()),
+            ],
+        ),
+    ]
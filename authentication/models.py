@@ -1,14 +1,38 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.utils import timezone
+
+class CustomUserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # update() sends no signals; drop the affected users from the token
+        # cache like a save would (see authentication.py)
+        from .authentication import token_cache
+
+        user_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        token_cache.invalidate_users(user_ids)
+        return rows
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CustomUserManager()
+    
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Dashboard "registered / active today" range filters
+            models.Index(fields=['created_at'], name='user_created_idx'),
+            models.Index(fields=['last_login'], name='user_last_login_idx'),
+        ]
+    
     def __str__(self):
         return self.email
 
@@ -18,6 +42,7 @@ class UserProfile(models.Model):
     location = models.CharField(max_length=30, blank=True)
     birth_date = models.DateField(null=True, blank=True)
     avatar = models.URLField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.user.username}'s profile"
@@ -56,6 +81,17 @@ class InterviewExperience(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # "My interviews" list: filter by user, newest first
+            models.Index(fields=['user', 'created_at'], name='interview_user_created_idx'),
+            # Public feed keyset and dashboard date ranges. Ascending, so a
+            # backwards walk also yields ``-id`` order from the implicit rowid.
+            models.Index(fields=['created_at'], name='interview_created_idx'),
+            models.Index(fields=['status', 'difficulty'], name='interview_status_diff_idx'),
+            models.Index(fields=['company_name'], name='interview_company_idx'),
+            # Incremental exports (since=) walk rows in (updated_at, id) order
+            models.Index(fields=['updated_at'], name='interview_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.company_name} - {self.position}"
@@ -88,6 +124,148 @@ class TaskExperience(models.Model):
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            # "My tasks" list: filter by user, latest start first
+            models.Index(fields=['user', 'start_date'], name='task_user_start_idx'),
+            # Public feed keyset
+            models.Index(fields=['start_date'], name='task_start_idx'),
+            # Dashboard date ranges
+            models.Index(fields=['created_at'], name='task_created_idx'),
+            models.Index(fields=['company_name'], name='task_company_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.company_name} - {self.position}"
+
+class DailyActivity(models.Model):
+    """
+    Per-day activity counters for the dashboards, maintained incrementally by
+    the receivers in ``signals.py`` and rebuilt by ``rebuild_activity_rollup``.
+    Rows for days before today are closed and never change outside a rebuild.
+    """
+    date = models.DateField(unique=True)
+    registrations = models.IntegerField(default=0)
+    logins = models.IntegerField(default=0)
+    interview_submissions = models.IntegerField(default=0)
+    task_submissions = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = 'daily activity'
+    
+    def __str__(self):
+        return f"Activity on {self.date}"
+
+class CompanyStats(models.Model):
+    """
+    Aggregate interview statistics for one company, maintained incrementally
+    from InterviewExperience changes (see ``companies.py``) and recomputed by
+    ``recompute_company_stats``. Averages are derived from running totals.
+    """
+    company_key = models.CharField(max_length=200, unique=True)  # lower-cased company name
+    company_name = models.CharField(max_length=200)
+    experience_count = models.IntegerField(default=0)
+    rating_total = models.IntegerField(default=0)
+    rounds_total = models.IntegerField(default=0)
+    easy_count = models.IntegerField(default=0)
+    medium_count = models.IntegerField(default=0)
+    hard_count = models.IntegerField(default=0)
+    selected_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    in_progress_count = models.IntegerField(default=0)
+    latest_interview_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-experience_count', 'company_key']
+        verbose_name_plural = 'company stats'
+        indexes = [
+            models.Index(fields=['-experience_count', 'company_key'], name='company_stats_count_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.company_name} ({self.experience_count} experiences)"
+    
+    def _average(self, total):
+        if not self.experience_count:
+            return None
+        return round(total / self.experience_count, 2)
+    
+    @property
+    def average_rating(self):
+        return self._average(self.rating_total)
+    
+    @property
+    def average_rounds(self):
+        return self._average(self.rounds_total)
+    
+    @property
+    def difficulty_distribution(self):
+        return {
+            value: getattr(self, f'{value}_count')
+            for value, _ in InterviewExperience.DIFFICULTY_CHOICES
+        }
+    
+    @property
+    def status_distribution(self):
+        return {
+            value: getattr(self, f'{value}_count')
+            for value, _ in InterviewExperience.INTERVIEW_STATUS_CHOICES
+        }
+    
+    @property
+    def selection_rate(self):
+        """Share of decided interviews (selected or rejected) that ended in an offer."""
+        decided = self.selected_count + self.rejected_count
+        if not decided:
+            return None
+        return round(self.selected_count / decided, 4)
+
+class ActivityEvent(models.Model):
+    """
+    Append-only log of registrations, logins, experience writes and webhook
+    notifications. Rows are written in batches by the buffer in
+    ``events.py`` and never updated. ``username`` is copied at write time and
+    ``user`` has no database constraint, so events outlive their user.
+    """
+    EVENT_TYPE_CHOICES = [
+        ('registration', 'Registration'),
+        ('login', 'Login'),
+        ('interview_created', 'Interview created'),
+        ('interview_updated', 'Interview updated'),
+        ('interview_deleted', 'Interview deleted'),
+        ('task_created', 'Task created'),
+        ('task_updated', 'Task updated'),
+        ('task_deleted', 'Task deleted'),
+        ('webhook', 'Webhook'),
+    ]
+    
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    user = models.ForeignKey(
+        CustomUser, null=True, blank=True, on_delete=models.DO_NOTHING,
+        db_constraint=False, related_name='+',
+    )
+    username = models.CharField(max_length=150, blank=True)
+    object_id = models.BigIntegerField(null=True, blank=True)  # the user, interview or task
+    action = models.CharField(max_length=255)
+    metadata = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Recent activity feed and show_activity's time window
+            models.Index(fields=['created_at', 'id'], name='activity_created_idx'),
+            models.Index(fields=['event_type', 'created_at'], name='activity_type_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} by {self.username or 'anonymous'} at {self.created_at}"
+    
+    @property
+    def kind(self):
+        """``registration``, ``login``, ``interview``, ``task`` or ``webhook``."""
+        return self.event_type.split('_')[0]
@@ -3,15 +3,25 @@ Production Monitoring System for RECursion
 Like Netflix, Airbnb, Facebook - Real-time user activity monitoring
 """
 
+import hmac
+
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.utils import timezone
+from django.db import models
 from datetime import timedelta, datetime
 import json
+from .activity import feed_event, feed_rows
+from .events import record, webhook_event
 from .models import CustomUser, InterviewExperience, TaskExperience
+from .rollup import activity_windows, parse_range, standard_windows
+from .routers import replica_reads
+from .utils import day_bounds
 
+@method_decorator(replica_reads, name='dispatch')
 class LiveActivityDashboard(View):
     """
     Real-time dashboard like big tech companies use
@@ -21,41 +31,33 @@ class LiveActivityDashboard(View):
     def get(self, request):
         # Time periods
         now = timezone.now()
-        today = now.date()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
+        today_start, today_end = day_bounds(timezone.localdate(now))
+        windows = standard_windows()
+        try:
+            history = parse_range(request.GET)
+        except ValueError:
+            return JsonResponse({'error': 'start/end must be YYYY-MM-DD dates, start <= end'}, status=400)
+        if history:
+            windows['range'] = history
+        activity = activity_windows(windows)
         
         # Real-time metrics (like Netflix dashboard)
         metrics = {
             'real_time': {
                 'active_users_today': CustomUser.objects.filter(
-                    last_login__date=today
-                ).count(),
-                'new_registrations_today': CustomUser.objects.filter(
-                    created_at__date=today
+                    last_login__gte=today_start, last_login__lt=today_end
                 ).count(),
+                'logins_today': activity['today']['logins'],
+                'new_registrations_today': activity['today']['registrations'],
                 'submissions_today': {
-                    'interviews': InterviewExperience.objects.filter(
-                        created_at__date=today
-                    ).count(),
-                    'tasks': TaskExperience.objects.filter(
-                        created_at__date=today
-                    ).count()
+                    'interviews': activity['today']['interview_submissions'],
+                    'tasks': activity['today']['task_submissions']
                 }
             },
             
-            # Weekly trends (like Airbnb analytics)
-            'weekly_trends': {
-                'new_users': CustomUser.objects.filter(
-                    created_at__gte=week_ago
-                ).count(),
-                'interview_submissions': InterviewExperience.objects.filter(
-                    created_at__gte=week_ago
-                ).count(),
-                'task_submissions': TaskExperience.objects.filter(
-                    created_at__gte=week_ago
-                ).count()
-            },
+            # Weekly and monthly trends (like Airbnb analytics)
+            'weekly_trends': self.trend(activity['week']),
+            'monthly_trends': self.trend(activity['month']),
             
             # User engagement (like Facebook insights)
             'engagement': {
@@ -88,65 +90,34 @@ class LiveActivityDashboard(View):
             }
         }
         
+        if history:
+            metrics['range'] = dict(
+                self.trend(activity['range']),
+                start=history[0].isoformat(),
+                end=history[1].isoformat(),
+                logins=activity['range']['logins'],
+            )
+        
         return JsonResponse(metrics)
     
+    def trend(self, totals):
+        return {
+            'new_users': totals['registrations'],
+            'interview_submissions': totals['interview_submissions'],
+            'task_submissions': totals['task_submissions']
+        }
+    
     def get_recent_activity(self):
-        """Get recent activity across all models"""
-        activities = []
-        
-        # Recent interviews
-        recent_interviews = InterviewExperience.objects.order_by('-created_at')[:10]
-        for interview in recent_interviews:
-            activities.append({
-                'type': 'interview',
-                'user': interview.user.username,
-                'action': f"Added interview at {interview.company_name}",
-                'timestamp': interview.created_at.isoformat(),
-                'metadata': {
-                    'company': interview.company_name,
-                    'position': interview.position,
-                    'status': interview.status
-                }
-            })
-        
-        # Recent tasks
-        recent_tasks = TaskExperience.objects.order_by('-created_at')[:10]
-        for task in recent_tasks:
-            activities.append({
-                'type': 'task',
-                'user': task.user.username,
-                'action': f"Added {task.task_type} at {task.company_name}",
-                'timestamp': task.created_at.isoformat(),
-                'metadata': {
-                    'company': task.company_name,
-                    'position': task.position,
-                    'type': task.task_type
-                }
-            })
-        
-        # Recent users
-        recent_users = CustomUser.objects.order_by('-created_at')[:5]
-        for user in recent_users:
-            activities.append({
-                'type': 'registration',
-                'user': user.username,
-                'action': f"New user registered",
-                'timestamp': user.created_at.isoformat(),
-                'metadata': {
-                    'email': user.email
-                }
-            })
-        
-        # Sort by timestamp and return latest 20
-        activities.sort(key=lambda x: x['timestamp'], reverse=True)
-        return activities[:20]
+        """Latest registrations and submissions, newest first, from the activity log"""
+        rows = feed_rows().order_by('-created_at', '-id')[:20]
+        return [feed_event(row) for row in rows]
 
 # Live stats endpoint (like Instagram analytics)
 @csrf_exempt
 def live_stats_api(request):
     """API endpoint for real-time stats"""
-    dashboard = LiveActivityDashboard()
-    return dashboard.get(request)
+    # Through as_view() so the dashboard's replica_reads applies
+    return LiveActivityDashboard.as_view()(request)
 
 # Webhook for real-time notifications (like Slack/Discord)
 @csrf_exempt 
@@ -155,13 +126,36 @@ def activity_webhook(request):
     if request.method == 'POST':
         # This could send to Slack, Discord, email, etc.
         # Like how Airbnb notifies when bookings happen
-        data = json.loads(request.body)
+        config = settings.ACTIVITY_WEBHOOK
+        trusted = bool(config['SECRET']) and hmac.compare_digest(
+            request.headers.get('X-Webhook-Secret', ''), config['SECRET']
+        )
+        if not trusted and not request.user.is_staff:
+            return JsonResponse({'error': 'Webhook secret or staff login required'}, status=403)
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > config['MAX_BODY_BYTES'] or len(request.body) > config['MAX_BODY_BYTES']:
+            return JsonResponse({'error': f"Body over {config['MAX_BODY_BYTES']} bytes"}, status=413)
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'Expected a JSON object'}, status=400)
+        details = data.get('details', {})
+        if len(json.dumps(details)) > config['MAX_DETAILS_BYTES']:
+            return JsonResponse({'error': f"details over {config['MAX_DETAILS_BYTES']} bytes"}, status=400)
+        # Only a caller holding the secret may name the user; staff act as themselves
+        username = data.get('user') if trusted else request.user.username
+        record(webhook_event(data, username))
         
         # Example: Send to monitoring service
         notification = {
             'timestamp': timezone.now().isoformat(),
             'event': data.get('event_type', 'unknown'),
-            'user': data.get('user', 'anonymous'),
+            'user': username or 'anonymous',
             'details': data.get('details', {})
         }
         
@@ -0,0 +1,182 @@
+"""
+Keyset (cursor) pagination for the public feeds.
+
+Pages are addressed by the position of their first/last row in the feed
+ordering rather than by an offset, so page 500 costs the same index range
+scan as page 1.  Cursors are opaque base64 tokens that encode that position
+and the direction of travel.
+"""
+
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Feed orderings mirror each model's Meta.ordering, with ``id`` as tie-breaker
+INTERVIEW_FEED_ORDERING = ('-created_at', '-id')
+TASK_FEED_ORDERING = ('-start_date', '-id')
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate a queryset by ``ordering`` using ``WHERE (a, b) < (x, y)`` style
+    seeks instead of ``OFFSET``.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering, page_size=None, max_page_size=None):
+        self.ordering = [
+            (field.lstrip('-'), field.startswith('-')) for field in ordering
+        ]
+        self.page_size = page_size or settings.FEED_PAGE_SIZE
+        self.max_page_size = max_page_size or settings.FEED_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.model = queryset.model
+
+        def fetch(position, reverse, limit):
+            return list(self.seek_queryset(queryset, position, reverse)[:limit])
+
+        return self.paginate(fetch, request)
+
+    async def apaginate_queryset(self, queryset, request):
+        """``paginate_queryset`` for async views, reading with ``aiterator()``."""
+        self.model = queryset.model
+        position, reverse, page_size = self.start(request)
+        page = self.seek_queryset(queryset, position, reverse)[:page_size + 1]
+        rows = [row async for row in page.aiterator()]
+        return self.finish(rows, position, reverse, page_size)
+
+    def seek_queryset(self, queryset, position, reverse):
+        """``queryset`` after ``position`` in feed order, or reverse feed order."""
+        if position is not None:
+            queryset = queryset.filter(self.seek(position, reverse))
+        order_by = [
+            ('-' if descending != reverse else '') + name
+            for name, descending in self.ordering
+        ]
+        return queryset.order_by(*order_by)
+
+    def paginate(self, fetch, request):
+        """
+        Paginate with ``fetch(position, reverse, limit)``, which must return
+        up to ``limit`` rows after ``position`` in feed order (or in reverse
+        feed order when ``reverse`` is set).
+        """
+        position, reverse, page_size = self.start(request)
+        return self.finish(fetch(position, reverse, page_size + 1), position, reverse, page_size)
+
+    def start(self, request):
+        self.request = request
+        position, reverse = self.decode_cursor(request)
+        return position, reverse, self.get_page_size(request)
+
+    def finish(self, rows, position, reverse, page_size):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Travelling backwards we came from a later page, so there is always
+        # a next page; travelling forwards the same holds for the previous one.
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def seek(self, position, reverse):
+        """
+        Build the predicate selecting rows strictly after ``position``.
+
+        The leading ``<=``/``>=`` term on the first column lets the database
+        turn the expanded OR chain into a single index range seek.
+        """
+        names = [name for name, _ in self.ordering]
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            clause = Q(**{f'{name}__{lookup}': position[index]})
+            for previous_name, previous_value in zip(names[:index], position[:index]):
+                clause &= Q(**{previous_name: previous_value})
+            condition |= clause
+
+        first_name, first_descending = self.ordering[0]
+        bound = 'lte' if first_descending != reverse else 'gte'
+        return Q(**{f'{first_name}__{bound}': position[0]}) & condition
+
+    def to_python(self, name, value):
+        return self.model._meta.get_field(name).to_python(value)
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.ordering]
+        return [getattr(row, name) for name, _ in self.ordering]
+
+    def encode_cursor(self, position, reverse):
+        values = [
+            value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value
+            for value in position
+        ]
+        payload = json.dumps({'p': values, 'r': reverse}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, token
+        )
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            values = payload['p']
+            reverse = bool(payload['r'])
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.to_python(name, value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Stepped past the end; the first page is the way back
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param
+            )
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
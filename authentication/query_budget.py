@@ -0,0 +1,172 @@
+"""
+Per-endpoint query budgets.
+
+Every URL name in ``authentication/urls.py`` declares the maximum number of
+SQL queries a single request may run, including token authentication.
+``QueryBudgetMiddleware`` counts the queries of each request and logs (or,
+with ``QUERY_BUDGET_ENFORCE``, raises) when an endpoint goes over budget, so
+N+1 regressions show up in logs and in the test suite instead of production.
+
+Every connection counts into the counter of the request in the current
+context; async views run their queries in threads that copy the context,
+so they are counted too.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger(__name__)
+
+# URL name -> maximum queries per request, counting the token lookup made by
+# authenticated clients. Budgets must not grow with the number of rows
+# returned; raise one only when a view gains a fixed query. Writes include
+# the worst case of the DailyActivity upsert (update, savepoint, insert,
+# release); interview writes also pay for CompanyStats, worst when an edit
+# moves an interview to a company that has no stats row yet. The bulk routes
+# are sized for a small batch in one company: creates pay one stats write per
+# distinct company, while updates and deletes still pay the per-row stats and
+# rollup writes, so large batches are expected to log.
+QUERY_BUDGETS = {
+    'health_check': 0,
+    'register': 12,
+    'login': 17,
+    'logout': 2,
+    'profile': 2,
+    'update_profile': 3,
+    'interview_list_create': 10,
+    'interview_detail': 16,
+    'task_list_create': 6,
+    'task_detail': 7,
+    'interview_bulk': 16,
+    'task_bulk': 8,
+    'public_interviews': 3,
+    'public_tasks': 3,
+    'user_profile_detail': 3,
+    'company_stats_list': 2,
+    'company_stats_detail': 2,
+    'search': 4,
+    # Rows are fetched while streaming, after the middleware has returned
+    'export': 0,
+    # Polled by the shared watcher task, not by the request
+    'activity_stream': 0,
+    'cache_stats': 1,
+}
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook that counts the queries it sees."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+_request_counter = ContextVar('query_budget_counter', default=None)
+
+
+def count_request_query(execute, sql, params, many, context):
+    counter = _request_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_request_counter(sender, connection, **kwargs):
+    # Wrappers outlive reconnects of the same DatabaseWrapper
+    if count_request_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_request_query)
+
+
+def get_budget(url_name):
+    return QUERY_BUDGETS.get(url_name)
+
+
+def check_budget(url_name, count):
+    budget = get_budget(url_name)
+    if budget is None or count <= budget:
+        return
+    message = f"{url_name} ran {count} queries (budget {budget})"
+    if getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMiddleware:
+    """Count the queries each request runs and check them against its budget."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', True):
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        token = _request_counter.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_counter.reset(token)
+        self.check(request, counter)
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', True):
+            return await self.get_response(request)
+
+        counter = QueryCounter()
+        token = _request_counter.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_counter.reset(token)
+        self.check(request, counter)
+        return response
+
+    def check(self, request, counter):
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name:
+            check_budget(match.url_name, counter.count)
+
+
+class QueryBudgetTestMixin:
+    """TestCase helpers for asserting that a block stays within a URL's budget."""
+
+    @contextmanager
+    def assertWithinQueryBudget(self, url_name, using='default'):
+        budget = get_budget(url_name)
+        if budget is None:
+            self.fail(f"No query budget declared for {url_name!r}")
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        if len(context) > budget:
+            queries = '\n'.join(
+                f"{index}. {query['sql']}"
+                for index, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(
+                f"{url_name} ran {len(context)} queries (budget {budget}):\n{queries}"
+            )
@@ -0,0 +1,125 @@
+"""
+Daily activity rollup used by the monitoring dashboards.
+
+Counters live in ``DailyActivity`` rows, one per day.  Today's row is bumped
+in place by signal receivers; earlier rows are closed, so sums over closed
+days are cached indefinitely and only today's row is read live.
+"""
+
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import DailyActivity
+
+ROLLUP_FIELDS = ('registrations', 'logins', 'interview_submissions', 'task_submissions')
+
+VERSION_KEY = 'activity_rollup:version'
+
+
+def record_activity(field, delta=1, day=None):
+    """Add ``delta`` to ``field`` on ``day`` (today by default)."""
+    day = day or timezone.localdate()
+    updated = DailyActivity.objects.filter(date=day).update(**{field: F(field) + delta})
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            DailyActivity.objects.create(date=day, **{field: delta})
+    except IntegrityError:
+        # Another request created the row first
+        DailyActivity.objects.filter(date=day).update(**{field: F(field) + delta})
+
+
+def forget_activity(field, created_at):
+    """
+    Undo a submission or registration that is being deleted.
+
+    Only today's open row is adjusted; closed days keep the count of what
+    happened on them.
+    """
+    day = timezone.localdate(created_at)
+    if day == timezone.localdate():
+        record_activity(field, delta=-1, day=day)
+
+
+def _empty():
+    return dict.fromkeys(ROLLUP_FIELDS, 0)
+
+
+def _sum_rows(queryset):
+    totals = queryset.aggregate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+    return {field: totals[field] or 0 for field in ROLLUP_FIELDS}
+
+
+def closed_totals(start, end):
+    """Sum the closed days in ``[start, end]``; cached until the next rebuild."""
+    version = cache.get(VERSION_KEY, 0)
+    key = f'activity_rollup:{version}:{start.isoformat()}:{end.isoformat()}'
+    totals = cache.get(key)
+    if totals is None:
+        totals = _sum_rows(DailyActivity.objects.filter(date__gte=start, date__lte=end))
+        cache.set(key, totals, None)
+    return totals
+
+
+def invalidate_closed_totals():
+    """Drop every cached closed-day sum, e.g. after a rebuild."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def activity_windows(windows, today=None):
+    """
+    Return rollup totals for each ``name -> (start, end)`` date window
+    (both ends inclusive).
+
+    Closed days come from the cache; today's row is read at most once.
+    """
+    today = today or timezone.localdate()
+    yesterday = today - timedelta(days=1)
+    today_totals = None
+    results = {}
+    for name, (start, end) in windows.items():
+        totals = _empty()
+        if start <= min(end, yesterday):
+            for field, value in closed_totals(start, min(end, yesterday)).items():
+                totals[field] += value
+        if start <= today <= end:
+            if today_totals is None:
+                today_totals = _sum_rows(DailyActivity.objects.filter(date=today))
+            for field, value in today_totals.items():
+                totals[field] += value
+        results[name] = totals
+    return results
+
+
+def standard_windows(today=None):
+    """Today, the last 7 days and the last 30 days, each including today."""
+    today = today or timezone.localdate()
+    return {
+        'today': (today, today),
+        'week': (today - timedelta(days=6), today),
+        'month': (today - timedelta(days=29), today),
+    }
+
+
+def parse_range(params):
+    """
+    Read an optional ``start``/``end`` (YYYY-MM-DD) historical range from
+    query parameters. Returns ``None`` when absent, raises ``ValueError``
+    when malformed.
+    """
+    if 'start' not in params and 'end' not in params:
+        return None
+    today = timezone.localdate()
+    start = date.fromisoformat(params['start']) if params.get('start') else today
+    end = date.fromisoformat(params['end']) if params.get('end') else today
+    if start > end:
+        raise ValueError('start must not be after end')
+    return start, end
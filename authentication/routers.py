@@ -0,0 +1,126 @@
+"""
+Primary/replica routing.
+
+Views wrapped in ``replica_reads`` (the public feeds, public profiles and
+the monitoring dashboards) send their reads to ``settings.REPLICA_DATABASE``;
+everything else, and every write, uses ``default``. A replica lags behind
+the primary, so a client that has just written is pinned to the primary for
+``READ_YOUR_WRITES_SECONDS``: ``ReadYourWritesMiddleware`` sets a cookie on
+every successful unsafe request and ``replica_reads`` honours it. Keep that
+window longer than the replica's lag. Browsers don't send the cookie on
+cross-site requests, so the expiry is also returned in the
+``X-Read-Primary-Until`` header, which the frontend sends back.
+
+Only this app's models (users, profiles, experiences and the stats built
+from them) are read from the replica. Tokens and sessions always come from
+``default``: a client that just logged in must be recognised at once.
+
+With ``REPLICA_DATABASE`` unset all of this is inert.
+"""
+
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+
+# Holds an expiry timestamp; the primary is used until then
+PIN_COOKIE = 'read_primary_until'
+PIN_HEADER = 'X-Read-Primary-Until'
+
+# Apps whose models replica_reads views read from the replica
+REPLICA_APPS = {'authentication'}
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    return settings.REPLICA_DATABASE
+
+
+def pinned_to_primary(request):
+    """Whether ``request`` comes from a client that wrote within the window."""
+    if replica_alias() is None:
+        return False
+    now = time.time()
+    for value in (request.COOKIES.get(PIN_COOKIE), request.headers.get(PIN_HEADER)):
+        try:
+            if value and float(value) > now:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+def using_replica():
+    return _replica_reads.get() and replica_alias() is not None
+
+
+def replica_reads(view):
+    """Route the reads of ``view`` to the replica unless the client is pinned."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def awrapped(request, *args, **kwargs):
+            if replica_alias() is None or pinned_to_primary(request):
+                return await view(request, *args, **kwargs)
+            # sync_to_async copies the context, so the ORM's threads see this too
+            token = _replica_reads.set(True)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+        return awrapped
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if replica_alias() is None or pinned_to_primary(request):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapped
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if using_replica() and model._meta.app_label in REPLICA_APPS:
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Never follow an instance that was read from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica is a copy of the primary and gets its schema from there
+        return False if db == replica_alias() else None
+
+
+class ReadYourWritesMiddleware(MiddlewareMixin):
+    """
+    Pin clients that write to the primary for ``READ_YOUR_WRITES_SECONDS``,
+    with a cookie for same-site clients and a header for the others.
+    """
+
+    def process_response(self, request, response):
+        if (
+            replica_alias() is not None
+            and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            and response.status_code < 400
+        ):
+            window = settings.READ_YOUR_WRITES_SECONDS
+            until = f'{time.time() + window:.3f}'
+            response.set_cookie(PIN_COOKIE, until, max_age=window, httponly=True, samesite='Lax')
+            response[PIN_HEADER] = until
+        return response
@@ -0,0 +1,199 @@
+"""
+Full-text search over interview and task experiences.
+
+On SQLite the ``*_fts`` FTS5 tables created by migration 0006 (and kept in
+sync by triggers) provide BM25-ranked matches and snippets.  Other backends,
+or a database where the index is missing, fall back to ``icontains`` filters
+in feed order with snippets cut in Python.
+"""
+
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+from django.utils.html import escape
+
+from .models import InterviewExperience, TaskExperience
+from .pagination import INTERVIEW_FEED_ORDERING, TASK_FEED_ORDERING, KeysetPagination
+
+# Snippet markers, swapped for <mark> tags after the text is HTML-escaped
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_TOKENS = 16
+FALLBACK_SNIPPET_CHARS = 60
+
+
+class SearchIndex:
+    def __init__(self, model, table, fields, weights, ordering):
+        self.model = model
+        self.table = table
+        self.fields = fields
+        self.weights = weights
+        self.ordering = ordering
+
+
+SEARCH_INDEXES = {
+    'interviews': SearchIndex(
+        InterviewExperience,
+        'authentication_interview_fts',
+        ['company_name', 'position', 'description', 'technical_questions', 'hr_questions', 'tips'],
+        # Company and position matches outrank matches deep in free text
+        [10.0, 5.0, 1.0, 1.0, 1.0, 1.0],
+        INTERVIEW_FEED_ORDERING,
+    ),
+    'tasks': SearchIndex(
+        TaskExperience,
+        'authentication_task_fts',
+        ['technologies_used', 'description'],
+        [2.0, 1.0],
+        TASK_FEED_ORDERING,
+    ),
+}
+
+# Only positive answers are kept: an index missing now may be created by a
+# later migrate or rebuild_search_index without restarting the process
+_fts_tables = set()
+
+
+def fts_available(connection, table):
+    key = (connection.alias, table)
+    if key in _fts_tables:
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table]
+        )
+        found = cursor.fetchone() is not None
+    if found:
+        _fts_tables.add(key)
+    return found
+
+
+def tokenize(text):
+    return re.findall(r'\w+', text)
+
+
+def fts_query(tokens):
+    """Quote every token (AND semantics); the last one also matches as a prefix."""
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def render_snippet(text):
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+class SearchPagination(KeysetPagination):
+    """Keyset pagination over FTS results ordered by ``(rank, id)``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(('rank', 'id'), **kwargs)
+
+    def to_python(self, name, value):
+        return float(value) if name == 'rank' else int(value)
+
+
+def search_fts(index, tokens, request, connection):
+    paginator = SearchPagination()
+    weights = ', '.join(str(weight) for weight in index.weights)
+    inner = (
+        f"SELECT rowid AS id, bm25({index.table}, {weights}) AS rank, "
+        f"snippet({index.table}, -1, %s, %s, '…', {SNIPPET_TOKENS}) AS snippet "
+        f"FROM {index.table} WHERE {index.table} MATCH %s"
+    )
+
+    def fetch(position, reverse, limit):
+        # BM25 scores are negative; lower is a better match
+        sql = f"SELECT id, rank, snippet FROM ({inner})"
+        params = [MARK_START, MARK_END, fts_query(tokens)]
+        if position is not None:
+            op = '<' if reverse else '>'
+            sql += f" WHERE rank {op} %s OR (rank = %s AND id {op} %s)"
+            params += [position[0], position[0], position[1]]
+        direction = 'DESC' if reverse else 'ASC'
+        sql += f" ORDER BY rank {direction}, id {direction} LIMIT %s"
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [
+                {'id': row[0], 'rank': row[1], 'snippet': render_snippet(row[2])}
+                for row in cursor.fetchall()
+            ]
+
+    hits = paginator.paginate(fetch, request)
+    objects = (
+        index.model.objects.using(connection.alias)
+        .select_related('user')
+        .in_bulk([hit['id'] for hit in hits])
+    )
+    for hit in hits:
+        hit['object'] = objects.get(hit['id'])
+    return paginator, [hit for hit in hits if hit['object'] is not None]
+
+
+def fallback_snippet(instance, fields, tokens):
+    pattern = re.compile('|'.join(re.escape(token) for token in tokens), re.IGNORECASE)
+    for field in fields:
+        text = getattr(instance, field) or ''
+        match = pattern.search(text)
+        if match is None:
+            continue
+        start = max(match.start() - FALLBACK_SNIPPET_CHARS, 0)
+        end = min(match.end() + FALLBACK_SNIPPET_CHARS, len(text))
+        window = pattern.sub(lambda m: f'{MARK_START}{m.group(0)}{MARK_END}', text[start:end])
+        prefix = '…' if start else ''
+        suffix = '…' if end < len(text) else ''
+        return render_snippet(prefix + window + suffix)
+    return ''
+
+
+def search_fallback(index, tokens, request, connection):
+    paginator = KeysetPagination(index.ordering)
+    condition = Q()
+    for token in tokens:
+        any_field = Q()
+        for field in index.fields:
+            any_field |= Q(**{f'{field}__icontains': token})
+        condition &= any_field
+    queryset = (
+        index.model.objects.using(connection.alias)
+        .select_related('user')
+        .filter(condition)
+    )
+    rows = paginator.paginate_queryset(queryset, request)
+    hits = [
+        {
+            'id': row.pk,
+            'rank': None,
+            'snippet': fallback_snippet(row, index.fields, tokens),
+            'object': row,
+        }
+        for row in rows
+    ]
+    return paginator, hits
+
+
+def search(kind, text, request):
+    """
+    Search ``kind`` (``'interviews'`` or ``'tasks'``) for ``text``.
+
+    Returns the paginator and a page of hits, each a dict with ``id``,
+    ``rank``, HTML-safe ``snippet`` and the model ``object``.
+    """
+    index = SEARCH_INDEXES[kind]
+    tokens = tokenize(text)
+    connection = connections[router.db_for_read(index.model)]
+    if fts_available(connection, index.table):
+        return search_fts(index, tokens, request, connection)
+    return search_fallback(index, tokens, request, connection)
+
+
+def rebuild_index(kind, connection):
+    """Repopulate an FTS index from its content table."""
+    table = SEARCH_INDEXES[kind].table
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
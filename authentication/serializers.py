@@ -1,6 +1,11 @@
+import copy
+
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from .models import CustomUser, UserProfile, InterviewExperience, TaskExperience
+from django.db import transaction
+from django.utils import timezone
+from .models import CustomUser, UserProfile, InterviewExperience, TaskExperience, CompanyStats
+from .signals import bulk_created, bulk_updated
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -57,28 +62,104 @@ class UserProfileSerializer(serializers.ModelSerializer):
         model = UserProfile
         fields = ('user', 'bio', 'location', 'birth_date', 'avatar')
 
-class InterviewExperienceSerializer(serializers.ModelSerializer):
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    ``many=True`` writes in one ``bulk_create`` / ``bulk_update``.
+
+    For updates ``instance`` maps pk -> object and every item carries its
+    ``id``. Bulk queries skip ``post_save``, so ``bulk_created`` and
+    ``bulk_updated`` are sent instead to keep derived data in step; the
+    latter also carries copies of the objects as they were before the edit.
+    """
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            pk = data.get('id') if isinstance(data, dict) else None
+            if pk not in self.instance:
+                raise serializers.ValidationError({'id': ['Not found.']})
+            self.child.instance = self.instance[pk]
+        return super().run_child_validation(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        with transaction.atomic():
+            instances = model.objects.bulk_create([model(**attrs) for attrs in validated_data])
+            bulk_created.send(sender=model, instances=instances)
+        return instances
+
+    def update(self, instance, validated_data):
+        model = self.child.Meta.model
+        now = timezone.now()
+        instances, previous, fields = [], [], {'updated_at'}
+        for item, attrs in zip(self.initial_data, validated_data):
+            obj = instance[item['id']]
+            previous.append(copy.copy(obj))
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+            obj.updated_at = now
+            fields.update(attrs)
+            instances.append(obj)
+        with transaction.atomic():
+            model.objects.bulk_update(instances, sorted(fields))
+            bulk_updated.send(sender=model, instances=instances, previous=previous)
+        return instances
+
+class SparseFieldsMixin:
+    """Takes ``fields=`` (a set of names, ``None`` for all) to render a subset; see fieldsets.py."""
+
+    def __init__(self, *args, **kwargs):
+        selected = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+class InterviewExperienceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     
     class Meta:
         model = InterviewExperience
         fields = '__all__'
         read_only_fields = ('user', 'created_at', 'updated_at')
+        list_serializer_class = BulkListSerializer
+        # Feed cards: ?view=summary
+        summary_fields = ('id', 'user', 'company_name', 'position', 'status', 'difficulty',
+                          'rating', 'interview_date', 'location', 'created_at')
 
-class TaskExperienceSerializer(serializers.ModelSerializer):
+class TaskExperienceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     
     class Meta:
         model = TaskExperience
         fields = '__all__'
         read_only_fields = ('user', 'created_at', 'updated_at')
+        list_serializer_class = BulkListSerializer
+        summary_fields = ('id', 'user', 'company_name', 'position', 'task_type', 'start_date',
+                          'end_date', 'currently_working', 'location', 'created_at')
 
 class UserDetailSerializer(serializers.ModelSerializer):
+    """
+    Public profile document. The nested lists render ``interview_page`` and
+    ``task_page``, the slices of the user's experiences the view fetched.
+    """
     profile = UserProfileSerializer(read_only=True)
-    interview_experiences = InterviewExperienceSerializer(many=True, read_only=True)
-    task_experiences = TaskExperienceSerializer(many=True, read_only=True)
+    interview_experiences = InterviewExperienceSerializer(many=True, read_only=True, source='interview_page')
+    task_experiences = TaskExperienceSerializer(many=True, read_only=True, source='task_page')
     
     class Meta:
         model = CustomUser
         fields = ('id', 'username', 'email', 'profile', 'interview_experiences', 'task_experiences', 'created_at')
         read_only_fields = ('id', 'created_at')
+
+class CompanyStatsSerializer(serializers.ModelSerializer):
+    average_rating = serializers.ReadOnlyField()
+    average_rounds = serializers.ReadOnlyField()
+    selection_rate = serializers.ReadOnlyField()
+    difficulty_distribution = serializers.ReadOnlyField()
+    status_distribution = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = CompanyStats
+        fields = ('company_name', 'experience_count', 'average_rating', 'average_rounds',
+                  'selection_rate', 'difficulty_distribution', 'status_distribution',
+                  'latest_interview_date')
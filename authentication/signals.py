@@ -0,0 +1,207 @@
+"""
+Signal receivers that keep derived data in step with the core models.
+Connected from ``AuthenticationConfig.ready``.
+"""
+
+from collections import Counter
+
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from . import companies, events
+from .authentication import token_cache
+from .cache import bump_generation
+from .models import CustomUser, UserProfile, InterviewExperience, TaskExperience
+from .rollup import forget_activity, invalidate_closed_totals, record_activity
+from .streams import broadcaster
+
+# Sent by BulkListSerializer, whose bulk_create / bulk_update skip post_save.
+# bulk_created: sender, instances. bulk_updated: sender, instances, previous.
+# import_experiences sends bulk_created with imported=True: the rows may have
+# been created on earlier days and are not live activity.
+bulk_created = Signal()
+bulk_updated = Signal()
+
+ROLLUP_FIELD_BY_MODEL = {
+    CustomUser: 'registrations',
+    InterviewExperience: 'interview_submissions',
+    TaskExperience: 'task_submissions',
+}
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=InterviewExperience)
+@receiver(post_save, sender=TaskExperience)
+def rollup_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_activity(ROLLUP_FIELD_BY_MODEL[sender])
+
+
+@receiver(bulk_created, sender=InterviewExperience)
+@receiver(bulk_created, sender=TaskExperience)
+def rollup_bulk_created(sender, instances, imported=False, **kwargs):
+    if not imported:
+        record_activity(ROLLUP_FIELD_BY_MODEL[sender], delta=len(instances))
+        return
+    # Count each row on its own day, as rebuild_activity_rollup would
+    days = Counter(timezone.localdate(instance.created_at) for instance in instances)
+    for day, count in days.items():
+        record_activity(ROLLUP_FIELD_BY_MODEL[sender], delta=count, day=day)
+    if min(days) < timezone.localdate():
+        invalidate_closed_totals()
+
+
+EVENT_BY_MODEL = {
+    InterviewExperience: events.interview_event,
+    TaskExperience: events.task_event,
+}
+
+
+def username(model, instance):
+    """The owner's username if already loaded; otherwise the event buffer looks it up."""
+    return instance.user.username if model.user.is_cached(instance) else ''
+
+
+@receiver(post_save, sender=CustomUser)
+def log_registration(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        events.record(events.registration_event(instance))
+
+
+@receiver(user_logged_in)
+def log_login(sender, user, **kwargs):
+    events.record(events.login_event(user))
+
+
+@receiver(post_save, sender=InterviewExperience)
+@receiver(post_save, sender=TaskExperience)
+def log_experience_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        verb = 'created' if created else 'updated'
+        events.record(EVENT_BY_MODEL[sender](verb, instance, username(sender, instance)))
+
+
+@receiver(post_delete, sender=InterviewExperience)
+@receiver(post_delete, sender=TaskExperience)
+def log_experience_deleted(sender, instance, **kwargs):
+    events.record(EVENT_BY_MODEL[sender]('deleted', instance, username(sender, instance)))
+
+
+@receiver(bulk_created, sender=InterviewExperience)
+@receiver(bulk_created, sender=TaskExperience)
+@receiver(bulk_updated, sender=InterviewExperience)
+@receiver(bulk_updated, sender=TaskExperience)
+def log_experiences_bulk(sender, instances, signal, imported=False, **kwargs):
+    if imported:
+        return
+    verb = 'created' if signal is bulk_created else 'updated'
+    events.record(*(
+        EVENT_BY_MODEL[sender](verb, instance, username(sender, instance)) for instance in instances
+    ))
+
+
+@receiver(events.activity_logged)
+def announce_activity(sender, **kwargs):
+    # Wake the activity stream's watcher now the events are readable
+    broadcaster.notify()
+
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=InterviewExperience)
+@receiver(post_delete, sender=TaskExperience)
+def rollup_deleted(sender, instance, **kwargs):
+    forget_activity(ROLLUP_FIELD_BY_MODEL[sender], instance.created_at)
+
+
+@receiver(user_logged_in)
+def rollup_login(sender, user, **kwargs):
+    record_activity('logins')
+
+
+def owner_id(instance):
+    """The user whose public profile document shows ``instance``."""
+    return instance.pk if isinstance(instance, CustomUser) else instance.user_id
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=InterviewExperience)
+@receiver(post_save, sender=TaskExperience)
+def invalidate_cached_responses(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no public response shows
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_generation(sender)
+    bump_generation(sender, owner_id(instance))
+
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_delete, sender=InterviewExperience)
+@receiver(post_delete, sender=TaskExperience)
+def invalidate_cached_responses_on_delete(sender, instance, **kwargs):
+    bump_generation(sender)
+    bump_generation(sender, owner_id(instance))
+
+
+@receiver(bulk_created, sender=InterviewExperience)
+@receiver(bulk_created, sender=TaskExperience)
+@receiver(bulk_updated, sender=InterviewExperience)
+@receiver(bulk_updated, sender=TaskExperience)
+def invalidate_cached_responses_on_bulk(sender, instances, **kwargs):
+    bump_generation(sender)
+    for user_id in {instance.user_id for instance in instances}:
+        bump_generation(sender, user_id)
+
+
+@receiver(pre_save, sender=InterviewExperience)
+def snapshot_company_stats(sender, instance, raw=False, **kwargs):
+    # Remember the stored values so the post_save delta can subtract them
+    instance._company_stats_previous = None
+    if instance.pk and not raw:
+        instance._company_stats_previous = (
+            sender.objects.filter(pk=instance.pk).values(*companies.TRACKED_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=InterviewExperience)
+def update_company_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_company_stats_previous', None)
+    current = companies.snapshot(instance)
+    if created or previous is None:
+        companies.add_experience(current)
+    else:
+        companies.update_experience(previous, current)
+
+
+@receiver(bulk_created, sender=InterviewExperience)
+def add_bulk_company_stats(sender, instances, **kwargs):
+    companies.add_experiences([companies.snapshot(instance) for instance in instances])
+
+
+@receiver(bulk_updated, sender=InterviewExperience)
+def update_bulk_company_stats(sender, instances, previous, **kwargs):
+    for old, instance in zip(previous, instances):
+        companies.update_experience(companies.snapshot(old), companies.snapshot(instance))
+
+
+@receiver(post_delete, sender=InterviewExperience)
+def remove_company_stats(sender, instance, **kwargs):
+    companies.remove_experience(companies.snapshot(instance))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_tokens(sender, instance, **kwargs):
+    # Deactivation, password changes and deletes must not outlive the cache
+    token_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
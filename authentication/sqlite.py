@@ -0,0 +1,39 @@
+"""
+Per-connection SQLite tuning.
+
+``configure_connection`` runs the ``SQLITE_PRAGMAS`` setting on every new
+SQLite connection. ``journal_mode`` is stored in the database file, so it is
+skipped for in-memory databases (the test database), where WAL is not
+available; the other PRAGMAs only last as long as the connection.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Names or numbers only; the values come from the environment
+PRAGMA_VALUE = re.compile(r'-?\d+|[A-Za-z_]+')
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_VALUE.fullmatch(str(value)):
+            raise ImproperlyConfigured(f'SQLITE_PRAGMAS[{name!r}]: invalid value {value!r}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    if connection.is_in_memory_db():
+        pragmas.pop('journal_mode', None)
+    # On the DB-API connection, so query logs and budgets only see the request's queries
+    for statement in pragma_statements(pragmas):
+        connection.connection.execute(statement)
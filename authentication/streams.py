@@ -0,0 +1,138 @@
+"""
+Server-Sent Events stream of new registrations and submissions.
+
+One ``ActivityBroadcaster`` per process runs a single watcher task while
+anyone is listening. The watcher sleeps until the event buffer reports a
+flush to the activity log (``notify``), polls past its high-water mark
+(``activity.py``) once and fans the new events out to every subscriber, so
+the database cost does not grow with the number of viewers. Events logged
+by other processes raise no signal here; a slow fallback poll picks them up.
+
+Each subscriber has a bounded queue. A client too slow to drain it is
+disconnected with an ``overflow`` event rather than buffering without limit;
+``EventSource`` reconnects by itself.
+
+Django 4.2 does not notice that an ASGI client has gone away while a
+response streams, so a stream ends by itself after ``MAX_SECONDS``;
+otherwise every closed tab would stay subscribed for the life of the
+process. A connected browser just reconnects.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .activity import POLL_LIMIT, high_water_mark, poll
+
+# Sent first: how long EventSource waits before reconnecting, in ms
+RETRY_MS = 3000
+
+
+@dataclass(eq=False)
+class Subscriber:
+    queue: asyncio.Queue = field(
+        default_factory=lambda: asyncio.Queue(maxsize=settings.ACTIVITY_STREAM['QUEUE_SIZE'])
+    )
+    dropped: bool = False
+
+
+def public_event(event):
+    """``event`` without the registration email, which the stream does not show."""
+    metadata = {key: value for key, value in event['metadata'].items() if key != 'email'}
+    return dict(event, metadata=metadata)
+
+
+def format_event(event):
+    data = json.dumps(public_event(event), ensure_ascii=False)
+    return f"id: {event['type']}:{event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+class ActivityBroadcaster:
+    def __init__(self):
+        self.subscribers = set()
+        self.loop = None
+        self.wake = None
+        self.ready = None
+        self.task = None
+
+    def notify(self):
+        """Wake the watcher; safe to call from any thread."""
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.wake.set)
+
+    def subscribe(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.task is None or self.task.done():
+            self.loop = loop
+            self.wake = asyncio.Event()
+            self.ready = asyncio.Event()
+            self.task = loop.create_task(self.watch())
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+        if not self.subscribers and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def watch(self):
+        mark = await sync_to_async(high_water_mark)()
+        self.ready.set()
+        while True:
+            try:
+                await asyncio.wait_for(self.wake.wait(), settings.ACTIVITY_STREAM['FALLBACK_POLL'])
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            events, mark = await sync_to_async(poll)(mark)
+            self.publish(events)
+            if len(events) >= POLL_LIMIT:
+                # More rows are waiting; poll again without sleeping
+                self.wake.set()
+
+    def publish(self, events):
+        for subscriber in list(self.subscribers):
+            for event in events:
+                try:
+                    subscriber.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    subscriber.dropped = True
+                    self.subscribers.discard(subscriber)
+                    break
+
+    async def stream(self):
+        """Async iterator of SSE messages for one client."""
+        subscriber = self.subscribe()
+        heartbeat = settings.ACTIVITY_STREAM['HEARTBEAT']
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ACTIVITY_STREAM['MAX_SECONDS']
+        try:
+            # Everything committed after the first message is delivered
+            await self.ready.wait()
+            yield f'retry: {RETRY_MS}\n\n'
+            while True:
+                if subscriber.dropped and subscriber.queue.empty():
+                    yield 'event: overflow\ndata: {}\n\n'
+                    return
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), max(0, min(heartbeat, deadline - loop.time()))
+                    )
+                except asyncio.TimeoutError:
+                    if loop.time() >= deadline:
+                        return
+                    # Comment line; keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_event(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broadcaster = ActivityBroadcaster()
@@ -0,0 +1,170 @@
+"""
+Deterministic synthetic data for benchmarks and staging databases.
+
+``generate`` creates users with profiles plus interview and task
+experiences whose text sizes resemble real submissions. The same arguments
+always produce the same rows; only timestamps move, since they are spread
+over the year before the current date so the dashboards have something to
+show. Rows go in with ``bulk_create``, so the derived data (activity rollup,
+company stats, cached responses) is rebuilt at the end and the activity log
+is written directly; the search indexes are kept current by their triggers.
+"""
+
+import random
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_generation
+from .events import interview_event, registration_event, task_event
+from .models import ActivityEvent, CustomUser, UserProfile, InterviewExperience, TaskExperience
+
+PASSWORD = 'synthetic-pass'
+
+COMPANIES = [
+    'Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises',
+    'Wonka', 'Cyberdyne', 'Soylent', 'Tyrell', 'Aperture', 'Massive Dynamic', 'Vandelay',
+    'Pied Piper', 'Dunder Mifflin', 'Oscorp', 'Gringotts', 'Monarch', 'Nakatomi',
+    'Blue Sun', 'Virtucon', 'Bluth', 'Prestige Worldwide', 'Sterling Cooper',
+]
+POSITIONS = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Analyst',
+    'ML Engineer', 'SRE Intern', 'Product Manager', 'QA Engineer', 'DevOps Engineer',
+]
+LOCATIONS = ['Bangalore', 'Hyderabad', 'Pune', 'Remote', 'Chennai', 'Mumbai', 'Delhi', '']
+TECHNOLOGIES = [
+    'Python', 'Django', 'React', 'PostgreSQL', 'Redis', 'Docker', 'Kubernetes', 'Go',
+    'TypeScript', 'AWS', 'Kafka', 'Rust', 'GraphQL', 'Pandas', 'PyTorch', 'Java', 'Spring',
+]
+WORDS = (
+    'the interview started with a short introduction followed by questions on data structures '
+    'algorithms system design and past projects they asked about arrays linked lists trees '
+    'graphs dynamic programming hashing concurrency databases indexing caching scaling queues '
+    'the panel was friendly and gave hints when stuck prepare well revise fundamentals practice '
+    'mock interviews communicate clearly explain trade offs ask questions about the team culture '
+    'salary negotiation happened later with hr who discussed relocation joining date and benefits'
+).split()
+
+
+def words(rng, low, high):
+    """A paragraph of ``low``-``high`` words split into sentences."""
+    count = rng.randint(low, high)
+    sentences, sentence = [], []
+    for _ in range(count):
+        sentence.append(rng.choice(WORDS))
+        if len(sentence) >= rng.randint(8, 18):
+            sentences.append(' '.join(sentence).capitalize() + '.')
+            sentence = []
+    if sentence:
+        sentences.append(' '.join(sentence).capitalize() + '.')
+    return ' '.join(sentences)
+
+
+def _spread(rng, instances, now, days=365):
+    """Give each instance a created_at within the last ``days`` days."""
+    for instance in instances:
+        instance.created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        instance.updated_at = instance.created_at
+
+
+def generate(users=100, interviews=1000, tasks=1000, seed=0, batch_size=1000):
+    """Create the rows and rebuild derived data; returns the created users."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(PASSWORD)
+    prefix = f'synthetic{seed}'
+
+    with transaction.atomic():
+        people = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    username=f'{prefix}_{i}',
+                    email=f'{prefix}_{i}@example.com',
+                    first_name=rng.choice(['Asha', 'Ravi', 'Meera', 'Arjun', 'Kiran', 'Neha']),
+                    last_name=rng.choice(['Rao', 'Iyer', 'Shah', 'Menon', 'Gupta', 'Das']),
+                    password=password,
+                )
+                for i in range(users)
+            ],
+            batch_size=batch_size,
+        )
+        _spread(rng, people, now)
+        CustomUser.objects.bulk_update(people, ['created_at', 'updated_at'], batch_size=batch_size)
+        UserProfile.objects.bulk_create(
+            [
+                UserProfile(user=user, bio=words(rng, 5, 60), location=rng.choice(LOCATIONS))
+                for user in people
+            ],
+            batch_size=batch_size,
+        )
+
+        interview_rows = InterviewExperience.objects.bulk_create(
+            [
+                InterviewExperience(
+                    user=rng.choice(people),
+                    company_name=rng.choice(COMPANIES),
+                    position=rng.choice(POSITIONS),
+                    interview_date=(now - timedelta(days=rng.randint(0, 730))).date(),
+                    status=rng.choice(InterviewExperience.INTERVIEW_STATUS_CHOICES)[0],
+                    difficulty=rng.choice(InterviewExperience.DIFFICULTY_CHOICES)[0],
+                    duration=f'{rng.randint(30, 180)} minutes',
+                    rounds=rng.randint(1, 6),
+                    description=words(rng, 80, 400),
+                    technical_questions=words(rng, 20, 150),
+                    hr_questions=words(rng, 10, 60),
+                    tips=words(rng, 10, 80),
+                    rating=rng.randint(1, 5),
+                    location=rng.choice(LOCATIONS),
+                )
+                for _ in range(interviews)
+            ],
+            batch_size=batch_size,
+        )
+        _spread(rng, interview_rows, now)
+        InterviewExperience.objects.bulk_update(interview_rows, ['created_at', 'updated_at'], batch_size=batch_size)
+
+        task_rows = []
+        for _ in range(tasks):
+            start = (now - timedelta(days=rng.randint(30, 1500))).date()
+            current = rng.random() < 0.2
+            task_rows.append(TaskExperience(
+                user=rng.choice(people),
+                company_name=rng.choice(COMPANIES),
+                position=rng.choice(POSITIONS),
+                task_type=rng.choice(TaskExperience.TASK_TYPE_CHOICES)[0],
+                start_date=start,
+                end_date=None if current else start + timedelta(days=rng.randint(30, 700)),
+                currently_working=current,
+                description=words(rng, 40, 250),
+                key_responsibilities=words(rng, 10, 120),
+                technologies_used=', '.join(rng.sample(TECHNOLOGIES, rng.randint(2, 6))),
+                achievements=words(rng, 0, 80),
+                location=rng.choice(LOCATIONS),
+            ))
+        task_rows = TaskExperience.objects.bulk_create(task_rows, batch_size=batch_size)
+        _spread(rng, task_rows, now)
+        TaskExperience.objects.bulk_update(task_rows, ['created_at', 'updated_at'], batch_size=batch_size)
+
+        # Logged in time order, as they would have been
+        events = (
+            [(user, registration_event(user)) for user in people]
+            + [(row, interview_event('created', row, row.user.username)) for row in interview_rows]
+            + [(row, task_event('created', row, row.user.username)) for row in task_rows]
+        )
+        for instance, event in events:
+            event.created_at = instance.created_at
+        ActivityEvent.objects.bulk_create(
+            sorted((event for _, event in events), key=lambda event: event.created_at),
+            batch_size=batch_size,
+        )
+
+        call_command('rebuild_activity_rollup', stdout=StringIO())
+        call_command('recompute_company_stats', stdout=StringIO())
+
+    for model in (CustomUser, UserProfile, InterviewExperience, TaskExperience):
+        bump_generation(model)
+    return people
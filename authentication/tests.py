@@ -1,3 +1,2011 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import warnings
+from contextlib import ExitStack
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, connections, router, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.models import F
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import async_views, views
+from . import urls as auth_urls
+from .activity import poll
+from .authentication import token_cache
+from .events import event_buffer
+from .models import ActivityEvent, CustomUser, UserProfile, InterviewExperience, TaskExperience, DailyActivity, CompanyStats
+from .monitoring_views import LiveActivityDashboard, activity_webhook, live_stats_api
+from .cache import get_or_build, reset_response_cache_stats, response_cache_stats
+from .filters import INTERVIEW_FILTERS
+from . import fastpath
+from .fastpath import FastRenderer
+from .routers import PIN_COOKIE, PIN_HEADER, replica_reads
+from .serializers import InterviewExperienceSerializer
+from .sqlite import pragma_statements
+from .rollup import activity_windows, standard_windows
+from .streams import broadcaster
+from .synthetic import generate
+from .query_budget import QUERY_BUDGETS, QueryBudgetExceeded, QueryBudgetTestMixin
+from .utils import day_bounds
+
+
+_password_hash = None
+
+
+def make_user(username='alice', **extra):
+    # Hash the shared test password once; PBKDF2 per user dominates test time
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = make_password('testpass123')
+    user = CustomUser.objects.create(
+        username=username,
+        email=f'{username}@example.com',
+        password=_password_hash,
+        **extra
+    )
+    UserProfile.objects.create(user=user)
+    return user
+
+
+def make_interview(user, company_name='Acme', **extra):
+    fields = {
+        'position': 'Engineer',
+        'interview_date': datetime.date(2024, 1, 15),
+        'description': 'Two rounds of problem solving.',
+    }
+    fields.update(extra)
+    return InterviewExperience.objects.create(user=user, company_name=company_name, **fields)
+
+
+def make_task(user, company_name='Acme', **extra):
+    fields = {
+        'position': 'Intern',
+        'start_date': datetime.date(2024, 1, 15),
+        'description': 'Built internal tooling.',
+        'technologies_used': 'Python, Django',
+    }
+    fields.update(extra)
+    return TaskExperience.objects.create(user=user, company_name=company_name, **fields)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        self.interviews = [make_interview(self.user, company_name=f'Company {i}') for i in range(5)]
+        # Force a tie on created_at so the id tie-breaker is exercised
+        InterviewExperience.objects.filter(
+            pk__in=[self.interviews[1].pk, self.interviews[2].pk]
+        ).update(created_at=self.interviews[1].created_at)
+
+    def expected_order(self):
+        return list(
+            InterviewExperience.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def test_walk_forward_and_back(self):
+        url = reverse('public_interviews') + '?page_size=2'
+        seen = []
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['id'] for row in response.json()['results']])
+            seen.extend(pages[-1])
+            url = response.json()['next']
+        self.assertEqual(seen, self.expected_order())
+
+        # Walk back from the last page using the previous links
+        previous = response.json()['previous']
+        back = []
+        while previous:
+            response = self.client.get(previous)
+            back.insert(0, [row['id'] for row in response.json()['results']])
+            previous = response.json()['previous']
+        self.assertEqual(back, pages[:-1])
+
+    def test_deep_pages_do_not_use_offset(self):
+        first = self.client.get(reverse('public_interviews') + '?page_size=2')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.json()['next'])
+        self.assertTrue(queries.captured_queries)
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('public_interviews') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_task_feed_orders_by_start_date(self):
+        make_task(self.user, start_date=datetime.date(2023, 1, 1))
+        make_task(self.user, start_date=datetime.date(2024, 1, 1))
+        response = self.client.get(reverse('public_tasks') + '?page_size=1')
+        self.assertEqual(response.json()['results'][0]['start_date'], '2024-01-01')
+        self.assertIsNone(response.json()['previous'])
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(response.json()['results'][0]['start_date'], '2023-01-01')
+        self.assertIsNone(response.json()['next'])
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def add_experiences(self, count):
+        for i in range(count):
+            other = make_user(f'user{CustomUser.objects.count()}')
+            make_interview(other, company_name=f'Company {i}')
+            make_task(other, company_name=f'Company {i}')
+            make_interview(self.user, company_name=f'Mine {i}')
+            make_task(self.user, company_name=f'Mine {i}')
+
+    def test_every_route_declares_a_budget(self):
+        names = {pattern.name for pattern in auth_urls.urlpatterns}
+        self.assertEqual(names - set(QUERY_BUDGETS), set())
+
+    def test_list_endpoints_stay_within_budget(self):
+        self.add_experiences(6)
+        routes = [
+            ('public_interviews', reverse('public_interviews')),
+            ('public_tasks', reverse('public_tasks')),
+            ('interview_list_create', reverse('interview_list_create')),
+            ('task_list_create', reverse('task_list_create')),
+            ('user_profile_detail', reverse('user_profile_detail', args=[self.user.pk])),
+            ('profile', reverse('profile')),
+        ]
+        for url_name, url in routes:
+            with self.subTest(url_name=url_name):
+                with self.assertWithinQueryBudget(url_name):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_middleware_raises_over_budget(self):
+        with mock.patch.dict(QUERY_BUDGETS, {'public_interviews': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('public_interviews'))
+
+    def test_recent_activity_query_count_is_constant(self):
+        dashboard = LiveActivityDashboard()
+        self.add_experiences(1)
+        with CaptureQueriesContext(connection) as small:
+            dashboard.get_recent_activity()
+        self.add_experiences(5)
+        with CaptureQueriesContext(connection) as large:
+            dashboard.get_recent_activity()
+        self.assertEqual(len(small), len(large))
+
+    def test_dashboard_renders(self):
+        self.add_experiences(2)
+        response = LiveActivityDashboard.as_view()(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+
+
+class AdminChangelistTests(TestCase):
+    CHANGELISTS = (
+        'customuser', 'userprofile', 'interviewexperience', 'taskexperience', 'dailyactivity',
+        'activityevent',
+    )
+
+    def setUp(self):
+        self.admin = make_user('root', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count, prefix):
+        for i in range(count):
+            user = make_user(f'{prefix}{i}')
+            make_interview(user)
+            make_task(user)
+
+    def query_counts(self):
+        counts = {}
+        for name in self.CHANGELISTS:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(f'admin:authentication_{name}_changelist'))
+            self.assertEqual(response.status_code, 200)
+            counts[name] = len(queries)
+        return counts
+
+    def test_query_count_is_constant(self):
+        self.add_rows(1, 'a')
+        small = self.query_counts()
+        self.add_rows(6, 'b')
+        self.assertEqual(self.query_counts(), small)
+
+    def test_user_activity_counts(self):
+        self.add_rows(1, 'a')
+        make_interview(CustomUser.objects.get(username='a0'), company_name='Globex')
+        response = self.client.get(reverse('admin:authentication_customuser_changelist'))
+        self.assertContains(response, '2 interviews | 💼 1 tasks')
+
+    @override_settings(ADMIN_LARGE_TABLE_ROWS=3)
+    def test_large_tables_skip_counts_and_date_hierarchy(self):
+        self.add_rows(5, 'a')
+        url = reverse('admin:authentication_interviewexperience_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('COUNT(*)', sql)
+        self.assertNotIn('django_datetime_trunc', sql)
+        self.assertIsNone(response.context['cl'].date_hierarchy)
+        self.assertEqual(response.context['cl'].result_count, InterviewExperience.objects.latest('pk').pk)
+
+        # Filtered lists are still counted exactly
+        response = self.client.get(url, {'company_name': 'Acme', 'rating': '5'})
+        self.assertEqual(response.context['cl'].result_count, 5)
+
+
+# Log every event as soon as its transaction commits
+WEBHOOK = {'SECRET': 's3cret', 'MAX_BODY_BYTES': 400, 'MAX_DETAILS_BYTES': 100}
+LOG_UNBUFFERED = {'BUFFER_SIZE': 1, 'FLUSH_INTERVAL': 60}
+
+
+@override_settings(ACTIVITY_LOG=LOG_UNBUFFERED)
+class ShowActivityTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = make_user()
+            make_interview(self.user)
+            make_task(self.user)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('show_activity', *args, stdout=out)
+        return out.getvalue()
+
+    def test_report_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            self.run_command()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                make_interview(make_user(f'user{i}'), company_name=f'Company {i}')
+        with CaptureQueriesContext(connection) as large:
+            output = self.run_command()
+        self.assertEqual(len(small), len(large))
+        self.assertIn('INTERVIEW EXPERIENCES SUBMITTED (6)', output)
+        self.assertIn('alice: Acme - Engineer', output)
+
+    def test_live_json_prints_only_new_rows(self):
+        def sleep(seconds):
+            self.assertEqual(seconds, 0.5)
+            if sleep.calls:
+                raise KeyboardInterrupt
+            sleep.calls += 1
+            with self.captureOnCommitCallbacks(execute=True):
+                make_interview(make_user('bob'), company_name='Globex')
+        sleep.calls = 0
+
+        with mock.patch('authentication.management.commands.show_activity.time.sleep', sleep):
+            output = self.run_command('--live', '--days', '0', '--interval', '0.5', '--format', 'json')
+        events = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([event['type'] for event in events], ['registration', 'interview'])
+        self.assertEqual(events[1]['user'], 'bob')
+        self.assertEqual(events[1]['metadata']['company'], 'Globex')
+
+    def test_poll_advances_the_mark(self):
+        from .activity import high_water_mark
+
+        mark = high_water_mark()
+        self.assertEqual(poll(mark), ([], mark))
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                make_task(self.user, company_name=f'Company {i}')
+        with CaptureQueriesContext(connection) as queries:
+            events, mark = poll(mark, limit=2)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([event['metadata']['company'] for event in events], ['Company 0', 'Company 1'])
+        events, mark = poll(mark)
+        self.assertEqual([event['metadata']['company'] for event in events], ['Company 2'])
+
+
+@override_settings(ACTIVITY_LOG={'BUFFER_SIZE': 3, 'FLUSH_INTERVAL': 60})
+class ActivityLogTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+
+    def logged(self, *event_types):
+        return list(
+            ActivityEvent.objects.filter(event_type__in=event_types)
+            .order_by('id').values_list('event_type', 'username', 'action')
+        )
+
+    def test_events_are_written_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(2):
+                make_interview(self.user, company_name=f'Company {i}')
+        self.assertEqual(event_buffer.pending(), 2)
+        self.assertFalse(ActivityEvent.objects.exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                make_task(self.user)
+        inserts = [q['sql'] for q in queries.captured_queries if 'INSERT INTO "authentication_activityevent"' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(event_buffer.pending(), 0)
+        self.assertEqual(
+            self.logged('interview_created', 'task_created'),
+            [('interview_created', 'alice', 'Added interview at Company 0'),
+             ('interview_created', 'alice', 'Added interview at Company 1'),
+             ('task_created', 'alice', 'Added project at Acme')],
+        )
+
+    def test_pending_events_flush_on_a_timer(self):
+        flushed = threading.Event()
+        with override_settings(ACTIVITY_LOG={'BUFFER_SIZE': 100, 'FLUSH_INTERVAL': 0.01}):
+            with mock.patch.object(event_buffer, 'flush', side_effect=flushed.set):
+                with self.captureOnCommitCallbacks(execute=True):
+                    make_interview(self.user)
+                self.assertTrue(flushed.wait(5))
+        self.assertEqual(event_buffer.flush(), 1)
+        self.assertEqual(self.logged('interview_created')[0][2], 'Added interview at Acme')
+
+    def test_rolled_back_writes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    make_interview(self.user)
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(event_buffer.pending(), 0)
+
+    @override_settings(ACTIVITY_LOG=LOG_UNBUFFERED)
+    def test_login_edit_and_delete_are_logged(self):
+        interview = make_interview(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('login'), {'email': 'alice@example.com', 'password': 'testpass123'}, format='json'
+            )
+            self.assertEqual(response.status_code, 200)
+            interview.status = 'selected'
+            interview.save()
+            interview.delete()
+        self.assertEqual(
+            self.logged('login', 'interview_updated', 'interview_deleted'),
+            [('login', 'alice', 'Logged in'),
+             ('interview_updated', 'alice', 'Updated interview at Acme'),
+             ('interview_deleted', 'alice', 'Deleted interview at Acme')],
+        )
+        self.assertEqual(ActivityEvent.objects.get(event_type='interview_updated').metadata['status'], 'selected')
+
+    def test_usernames_are_looked_up_once_per_flush(self):
+        other = make_user('bob')
+        tasks = [make_task(user) for user in (self.user, other, self.user)]
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                TaskExperience.objects.filter(pk__in=[task.pk for task in tasks]).delete()
+        lookups = [q for q in queries.captured_queries if 'FROM "authentication_customuser"' in q['sql']]
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual([row[1] for row in self.logged('task_deleted')], ['alice', 'bob', 'alice'])
+
+    def post_webhook(self, body, user=None, **headers):
+        request = RequestFactory().post('/', body, content_type='application/json', headers=headers)
+        request.user = user or AnonymousUser()
+        return activity_webhook(request)
+
+    @override_settings(ACTIVITY_LOG=LOG_UNBUFFERED, ACTIVITY_WEBHOOK=WEBHOOK)
+    def test_webhook_is_logged(self):
+        body = {'event_type': 'signup_clicked', 'user': 'alice', 'details': {'page': 'home'}}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_webhook(body, X_Webhook_Secret='s3cret')
+        self.assertEqual(response.status_code, 200)
+        event = ActivityEvent.objects.get(event_type='webhook')
+        self.assertEqual((event.username, event.action, event.metadata), ('alice', 'signup_clicked', {'page': 'home'}))
+
+        # Staff can post too, but only as themselves
+        staff = self.user
+        staff.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_webhook(dict(body, user='mallory'), user=staff)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ActivityEvent.objects.filter(event_type='webhook').latest('id').username, 'alice')
+
+        response = self.post_webhook('[1]', X_Webhook_Secret='s3cret')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ACTIVITY_LOG=LOG_UNBUFFERED, ACTIVITY_WEBHOOK=WEBHOOK)
+    def test_webhook_rejects_strangers_and_large_bodies(self):
+        body = {'event_type': 'signup_clicked', 'details': {}}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.post_webhook(body).status_code, 403)
+            self.assertEqual(self.post_webhook(body, X_Webhook_Secret='wrong').status_code, 403)
+            self.assertEqual(self.post_webhook(body, user=self.user).status_code, 403)
+            response = self.post_webhook(dict(body, padding='x' * 500), X_Webhook_Secret='s3cret')
+            self.assertEqual(response.status_code, 413)
+            response = self.post_webhook({'details': {'text': 'x' * 150}}, X_Webhook_Secret='s3cret')
+            self.assertEqual(response.status_code, 400)
+        with override_settings(ACTIVITY_WEBHOOK=dict(WEBHOOK, SECRET='')):
+            self.assertEqual(self.post_webhook(body, X_Webhook_Secret='').status_code, 403)
+        self.assertFalse(ActivityEvent.objects.filter(event_type='webhook').exists())
+
+    @override_settings(ACTIVITY_LOG=LOG_UNBUFFERED)
+    def test_dashboard_reads_the_log(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_interview(self.user, company_name='Globex')
+            make_user('bob')
+            self.client.force_login(self.user)
+        activity = LiveActivityDashboard().get_recent_activity()
+        # Logins are logged but are not part of the feed
+        self.assertEqual([(item['type'], item['user']) for item in activity], [('registration', 'bob'), ('interview', 'alice')])
+        self.assertEqual(activity[1]['action'], 'Added interview at Globex')
+
+
+@override_settings(
+    ACTIVITY_STREAM={'QUEUE_SIZE': 100, 'HEARTBEAT': 30, 'FALLBACK_POLL': 60, 'MAX_SECONDS': 60},
+    ACTIVITY_LOG=LOG_UNBUFFERED,
+)
+class ActivityStreamTests(TransactionTestCase):
+    """Writes must commit for the stream to be notified, hence no TestCase."""
+
+    def setUp(self):
+        self.user = make_user()
+
+    async def read(self, stream):
+        return await asyncio.wait_for(stream.__anext__(), 5)
+
+    async def test_pushes_new_rows_to_every_viewer_with_one_poll(self):
+        first, second = broadcaster.stream(), broadcaster.stream()
+        try:
+            self.assertTrue((await self.read(first)).startswith('retry:'))
+            self.assertTrue((await self.read(second)).startswith('retry:'))
+            with mock.patch('authentication.streams.poll', wraps=poll) as polled:
+                await sync_to_async(make_interview)(self.user, company_name='Globex')
+                messages = [await self.read(first), await self.read(second)]
+            self.assertEqual(polled.call_count, 1)
+            for message in messages:
+                self.assertIn('event: interview\n', message)
+                data = json.loads(message.split('data: ', 1)[1])
+                self.assertEqual(data['metadata']['company'], 'Globex')
+
+            await sync_to_async(make_user)('bob')
+            message = await self.read(first)
+            self.assertIn('event: registration\n', message)
+            # Emails stay out of the public stream
+            self.assertNotIn('email', message)
+        finally:
+            await first.aclose()
+            await second.aclose()
+        self.assertIsNone(broadcaster.task)
+
+    @override_settings(ACTIVITY_STREAM={'QUEUE_SIZE': 1, 'HEARTBEAT': 30, 'FALLBACK_POLL': 60, 'MAX_SECONDS': 60})
+    async def test_slow_clients_are_dropped(self):
+        stream = broadcaster.stream()
+        try:
+            await self.read(stream)
+            await sync_to_async(InterviewExperienceSerializer(many=True).create)([
+                {'user_id': self.user.pk, 'company_name': f'Company {i}', 'position': 'Engineer',
+                 'interview_date': datetime.date(2024, 1, 15), 'description': 'Bulk'}
+                for i in range(3)
+            ])
+            self.assertIn('Company 0', await self.read(stream))
+            self.assertTrue((await self.read(stream)).startswith('event: overflow'))
+            with self.assertRaises(StopAsyncIteration):
+                await self.read(stream)
+        finally:
+            await stream.aclose()
+
+    @override_settings(ACTIVITY_STREAM={'QUEUE_SIZE': 100, 'HEARTBEAT': 30, 'FALLBACK_POLL': 60, 'MAX_SECONDS': 0.2})
+    async def test_streams_end_and_unsubscribe_after_max_seconds(self):
+        stream = broadcaster.stream()
+        await self.read(stream)
+        self.assertEqual(len(broadcaster.subscribers), 1)
+        with self.assertRaises(StopAsyncIteration):
+            await self.read(stream)
+        self.assertEqual(len(broadcaster.subscribers), 0)
+        self.assertIsNone(broadcaster.task)
+
+        # A client that goes away earlier is unsubscribed when the stream is closed
+        stream = broadcaster.stream()
+        await self.read(stream)
+        await stream.aclose()
+        self.assertEqual(len(broadcaster.subscribers), 0)
+
+    async def test_view_serves_event_stream(self):
+        async def messages():
+            yield 'retry: 3000\n\n'
+
+        with mock.patch.object(broadcaster, 'stream', messages):
+            response = await self.async_client.get(
+                reverse('activity_stream'), HTTP_ACCEPT_ENCODING='gzip'
+            )
+            body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(body, b'retry: 3000\n\n')
+
+    def test_wsgi_requests_are_refused(self):
+        self.assertEqual(self.client.get(reverse('activity_stream')).status_code, 501)
+
+
+class SqliteTuningTests(TestCase):
+    def pragma(self, conn, name):
+        with conn.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def open_file_database(self, path):
+        return DatabaseWrapper(dict(connection.settings_dict, NAME=path), alias='tuning')
+
+    def test_new_connections_are_tuned(self):
+        with tempfile.TemporaryDirectory() as directory:
+            conn = self.open_file_database(os.path.join(directory, 'db.sqlite3'))
+            self.assertEqual(self.pragma(conn, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(conn, 'synchronous'), 1)
+            self.assertEqual(self.pragma(conn, 'cache_size'), -20000)
+            self.assertEqual(self.pragma(conn, 'temp_store'), 2)
+            conn.close()
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_tuning_can_be_turned_off(self):
+        with tempfile.TemporaryDirectory() as directory:
+            conn = self.open_file_database(os.path.join(directory, 'db.sqlite3'))
+            self.assertEqual(self.pragma(conn, 'journal_mode'), 'delete')
+            self.assertEqual(self.pragma(conn, 'cache_size'), -2000)
+            conn.close()
+
+    def test_in_memory_databases_keep_their_journal(self):
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'memory')
+        self.assertEqual(self.pragma(connection, 'cache_size'), -20000)
+
+    def test_values_are_validated(self):
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_statements({'cache_size': '1; DROP TABLE authentication_customuser'})
+
+
+@override_settings(REPLICA_DATABASE='replica', READ_YOUR_WRITES_SECONDS=10, ACTIVITY_LOG=LOG_UNBUFFERED)
+class ReplicaRoutingTests(TransactionTestCase):
+    """The test replica mirrors the default database, so reads must see committed rows."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        make_interview(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+
+    def get(self, url):
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replica:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(primary), len(replica)
+
+    def test_safe_reads_use_the_replica(self):
+        # The token is looked up on the primary, once, then cached
+        _, primary, replica = self.get(reverse('public_interviews'))
+        self.assertEqual(primary, 1)
+        cache.clear()
+        for url in (
+            reverse('public_interviews'),
+            reverse('public_tasks'),
+            reverse('user_profile_detail', args=[self.user.pk]),
+        ):
+            with self.subTest(url=url):
+                _, primary, replica = self.get(url)
+                self.assertEqual(primary, 0)
+                self.assertGreater(replica, 0)
+
+        for view in (LiveActivityDashboard.as_view(), live_stats_api):
+            with self.subTest(view=view.__name__):
+                with CaptureQueriesContext(connections['default']) as primary:
+                    with CaptureQueriesContext(connections['replica']) as replica:
+                        view(RequestFactory().get('/'))
+                self.assertEqual(len(primary), 0)
+                self.assertGreater(len(replica), 0)
+
+        # Other endpoints still read from the primary
+        _, primary, replica = self.get(reverse('interview_list_create'))
+        self.assertEqual(replica, 0)
+
+    def test_writers_read_their_writes_from_the_primary(self):
+        self.get(reverse('public_interviews'))
+        response = self.client.post(reverse('interview_list_create'), {
+            'company_name': 'Globex', 'position': 'Engineer',
+            'interview_date': '2024-01-15', 'description': 'One round.',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+
+        response, primary, replica = self.get(reverse('public_interviews'))
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        # Pinned clients bypass the shared cache, which may hold replica reads
+        self.assertFalse(response.has_header('X-Cache'))
+
+        self.client.cookies[PIN_COOKIE] = str(time.time() - 1)
+        _, primary, replica = self.get(reverse('public_interviews'))
+        self.assertEqual(primary, 0)
+
+    def test_cross_site_clients_pin_with_the_header(self):
+        response = self.client.post(reverse('interview_list_create'), {
+            'company_name': 'Globex', 'position': 'Engineer',
+            'interview_date': '2024-01-15', 'description': 'One round.',
+        }, format='json')
+        until = response[PIN_HEADER]
+        self.assertEqual(until, response.cookies[PIN_COOKIE].value)
+        self.client.cookies.clear()
+
+        self.client.credentials(HTTP_X_READ_PRIMARY_UNTIL=until)
+        _, primary, replica = self.get(reverse('public_interviews'))
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+
+        self.client.credentials(HTTP_X_READ_PRIMARY_UNTIL=str(time.time() - 1))
+        _, primary, replica = self.get(reverse('public_interviews'))
+        self.assertEqual(primary, 0)
+
+    def test_tokens_and_sessions_are_read_from_the_primary(self):
+        @replica_reads
+        def view(request):
+            return {model: router.db_for_read(model) for model in (Token, Session, InterviewExperience)}
+
+        self.assertEqual(view(RequestFactory().get('/')), {
+            Token: 'default', Session: 'default', InterviewExperience: 'replica',
+        })
+
+    def test_replica_responses_are_cached_briefly(self):
+        with mock.patch('authentication.cache.get_or_build', wraps=get_or_build) as built:
+            self.get(reverse('public_interviews'))
+        self.assertEqual(built.call_args.args[2], 10)
+
+    def test_writes_and_migrations_stay_on_the_primary(self):
+        interview = InterviewExperience.objects.using('replica').get()
+        self.assertEqual(router.db_for_write(InterviewExperience, instance=interview), 'default')
+        self.assertTrue(router.allow_relation(interview, self.user))
+        self.assertFalse(router.allow_migrate('replica', 'authentication'))
+        with self.assertRaises(CommandError):
+            call_command('sync_replica', '--database', 'default', stdout=StringIO())
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_without_a_replica_nothing_changes(self):
+        _, primary, replica = self.get(reverse('public_interviews'))
+        self.assertEqual(replica, 0)
+        response = self.client.post(reverse('interview_list_create'), {
+            'company_name': 'Globex', 'position': 'Engineer',
+            'interview_date': '2024-01-15', 'description': 'One round.',
+        }, format='json')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class AsyncViewTests(TestCase):
+    """The async read views must answer exactly as the sync ones do."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.other = make_user('bob')
+        for i in range(3):
+            make_interview(self.user, company_name=f'Company {i}', status='selected' if i % 2 else 'pending')
+            make_task(self.user, company_name=f'Company {i}')
+        make_interview(self.other, company_name='Globex')
+        self.headers = {'Authorization': f'Token {Token.objects.create(user=self.user).key}'}
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self.routed = set()
+        # What ASYNC_VIEWS does to urls.py, without re-importing it
+        for pattern in auth_urls.urlpatterns:
+            name = next((name for name, view in vars(views).items() if view is pattern.callback), None)
+            if hasattr(async_views, name or ''):
+                stack.enter_context(mock.patch.object(pattern, 'callback', getattr(async_views, name)))
+                self.routed.add(pattern.name)
+
+    async def async_request(self, *args, **kwargs):
+        return await self.async_client.get(*args, **kwargs)
+
+    def fetch(self, url, params=None, **headers):
+        responses = []
+        for request in (self.client.get, async_to_sync(self.async_request)):
+            # Cold caches, so both run the same queries
+            cache.clear()
+            token_cache.clear()
+            responses.append(request(url, params or {}, headers=headers))
+        return responses
+
+    def assertSameResponse(self, url, params=None, **headers):
+        expected, actual = self.fetch(url, params, **headers)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        for header in ('Content-Type', 'Allow', 'ETag', 'Last-Modified', 'WWW-Authenticate'):
+            self.assertEqual(actual.get(header), expected.get(header), header)
+        return actual
+
+    def test_read_endpoints_are_routed(self):
+        self.assertEqual(self.routed, {
+            'profile', 'interview_list_create', 'interview_detail', 'task_list_create', 'task_detail',
+            'public_interviews', 'public_tasks', 'user_profile_detail',
+        })
+
+    def test_reads_match_the_sync_views(self):
+        interview = self.user.interview_experiences.first()
+        task = self.user.task_experiences.first()
+        cases = [
+            (reverse('profile'), None),
+            (reverse('interview_list_create'), None),
+            (reverse('interview_list_create'), {'view': 'summary'}),
+            (reverse('task_list_create'), {'fields': 'company_name,position'}),
+            (reverse('interview_detail', args=[interview.pk]), None),
+            (reverse('task_detail', args=[task.pk]), None),
+        ]
+        public = [
+            (reverse('public_tasks'), None),
+            (reverse('public_interviews'), {'status': 'selected', 'sort': 'company'}),
+            (reverse('user_profile_detail', args=[self.user.pk]), {'interviews_limit': 1}),
+        ]
+        for fast in (False, True):
+            for (url, params), headers in [(case, self.headers) for case in cases] + [(case, {}) for case in public]:
+                with self.subTest(url=url, params=params, fast=fast), override_settings(FAST_LIST_SERIALIZATION=fast):
+                    self.assertSameResponse(url, params, **headers)
+
+        response = self.assertSameResponse(reverse('public_interviews'), {'page_size': 2, 'facets': 'false'})
+        self.assertNotIn('facets', response.json())
+        self.assertSameResponse(response.json()['next'])
+
+    def test_errors_and_conditional_requests_match(self):
+        foreign = self.other.interview_experiences.get()
+        etag = self.client.get(reverse('interview_list_create'), headers=self.headers)['ETag']
+        cases = [
+            (reverse('profile'), None, {}),
+            (reverse('public_tasks'), None, {'Authorization': 'Token nope'}),
+            (reverse('interview_detail', args=[foreign.pk]), None, self.headers),
+            (reverse('task_detail', args=[0]), None, self.headers),
+            (reverse('user_profile_detail', args=[0]), None, {}),
+            (reverse('public_interviews'), {'cursor': 'garbage'}, {}),
+            (reverse('public_interviews'), {'rating_min': '9', 'sort': 'nope'}, {}),
+            (reverse('interview_list_create'), None, dict(self.headers, If_None_Match=etag)),
+        ]
+        for url, params, headers in cases:
+            with self.subTest(url=url, params=params, headers=headers):
+                response = self.assertSameResponse(url, params, **headers)
+                self.assertGreaterEqual(response.status_code, 300)
+
+    def test_writes_go_to_the_sync_views(self):
+        async def post():
+            return await self.async_client.post(
+                reverse('interview_list_create'),
+                {'company_name': 'Initech', 'position': 'Engineer', 'interview_date': '2024-01-15',
+                 'description': 'One round.'},
+                content_type='application/json', headers=self.headers,
+            )
+
+        async def delete(pk):
+            return await self.async_client.delete(reverse('interview_detail', args=[pk]), headers=self.headers)
+
+        response = async_to_sync(post)()
+        self.assertEqual(response.status_code, 201)
+        interview = InterviewExperience.objects.get(company_name='Initech')
+        response = async_to_sync(delete)(interview.pk)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(InterviewExperience.objects.filter(pk=interview.pk).exists())
+
+    def test_async_requests_count_against_the_budget(self):
+        urls = {
+            'public_interviews': reverse('public_interviews'),
+            'profile': reverse('profile'),
+            'interview_list_create': reverse('interview_list_create'),
+            'user_profile_detail': reverse('user_profile_detail', args=[self.user.pk]),
+        }
+        for name, url in urls.items():
+            headers = {} if name.startswith(('public', 'user')) else self.headers
+            with self.subTest(name=name), mock.patch('authentication.query_budget.check_budget') as check:
+                self.fetch(url, **headers)
+            sync_call, async_call = check.call_args_list
+            self.assertEqual(async_call, sync_call)
+            self.assertGreater(async_call.args[1], 0)
+
+    def test_static_files_are_served_in_async_mode(self):
+        expected, actual = self.fetch('/static/admin/css/base.css')
+        self.assertEqual(actual.status_code, 200)
+        self.assertEqual(b''.join(actual.streaming_content), b''.join(expected.streaming_content))
+
+
+class IndexUsageTests(TestCase):
+    """
+    Capture EXPLAIN output for the hot query shapes before and after the
+    composite indexes / range predicates, and assert the planner uses them.
+    """
+
+    def setUp(self):
+        self.user = make_user()
+        make_interview(self.user)
+        make_task(self.user)
+        self.today = timezone.localdate()
+
+    def plan(self, queryset):
+        return queryset.explain()
+
+    def test_date_bucket_filters_use_index(self):
+        start, end = day_bounds(self.today)
+        before = self.plan(InterviewExperience.objects.filter(created_at__date=self.today))
+        after = self.plan(InterviewExperience.objects.filter(created_at__gte=start, created_at__lt=end))
+        self.assertIn('SCAN', before, before)
+        self.assertIn('interview_created_idx', after, after)
+
+        before = self.plan(CustomUser.objects.filter(last_login__date=self.today))
+        after = self.plan(CustomUser.objects.filter(last_login__gte=start, last_login__lt=end))
+        self.assertIn('SCAN', before, before)
+        self.assertIn('user_last_login_idx', after, after)
+
+    def test_user_lists_are_served_in_index_order(self):
+        interviews = self.plan(InterviewExperience.objects.filter(user=self.user))
+        self.assertIn('interview_user_created_idx', interviews, interviews)
+        self.assertNotIn('TEMP B-TREE', interviews, interviews)
+
+        tasks = self.plan(TaskExperience.objects.filter(user=self.user))
+        self.assertIn('task_user_start_idx', tasks, tasks)
+        self.assertNotIn('TEMP B-TREE', tasks, tasks)
+
+    def test_public_feed_seek_uses_index(self):
+        start, _ = day_bounds(self.today)
+        plan = self.plan(
+            InterviewExperience.objects
+            .filter(created_at__lte=start)
+            .order_by('-created_at', '-id')[:20]
+        )
+        self.assertIn('interview_created_idx', plan, plan)
+        self.assertNotIn('TEMP B-TREE', plan, plan)
+
+
+class ActivityRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.today = timezone.localdate()
+
+    def rollup(self, day=None):
+        return DailyActivity.objects.get(date=day or self.today)
+
+    def test_signals_maintain_today(self):
+        interview = make_interview(self.user)
+        make_task(self.user)
+        make_task(self.user)
+        self.client.post(
+            reverse('login'),
+            {'email': 'alice@example.com', 'password': 'testpass123'},
+            content_type='application/json',
+        )
+        row = self.rollup()
+        self.assertEqual(
+            (row.registrations, row.logins, row.interview_submissions, row.task_submissions),
+            (1, 1, 1, 2),
+        )
+        interview.delete()
+        self.assertEqual(self.rollup().interview_submissions, 0)
+
+    def backdate(self, interview, day):
+        """Move ``interview`` to ``day`` as if it had been submitted then."""
+        InterviewExperience.objects.filter(pk=interview.pk).update(created_at=day_bounds(day)[0])
+        DailyActivity.objects.filter(date=self.today).update(interview_submissions=F('interview_submissions') - 1)
+
+    def test_closed_days_are_immutable(self):
+        old = make_interview(self.user)
+        yesterday = self.today - datetime.timedelta(days=1)
+        self.backdate(old, yesterday)
+        DailyActivity.objects.create(date=yesterday, interview_submissions=1)
+        InterviewExperience.objects.get(pk=old.pk).delete()
+        self.assertEqual(self.rollup(yesterday).interview_submissions, 1)
+
+        # ...and the rebuild leaves that history alone
+        out = StringIO()
+        call_command('rebuild_activity_rollup', '--check', stdout=out)
+        self.assertIn('0 day(s) out of sync', out.getvalue())
+        call_command('rebuild_activity_rollup', stdout=StringIO())
+        self.assertEqual(self.rollup(yesterday).interview_submissions, 1)
+
+    def test_rebuild_raises_closed_days_that_undercount(self):
+        old = make_interview(self.user)
+        yesterday = self.today - datetime.timedelta(days=1)
+        self.backdate(old, yesterday)
+        DailyActivity.objects.create(date=yesterday, interview_submissions=0, task_submissions=3)
+        out = StringIO()
+        call_command('rebuild_activity_rollup', '--check', stdout=out)
+        self.assertIn('1 day(s) out of sync', out.getvalue())
+        call_command('rebuild_activity_rollup', stdout=StringIO())
+        row = self.rollup(yesterday)
+        self.assertEqual((row.interview_submissions, row.task_submissions), (1, 3))
+
+    def test_windows_read_closed_days_from_cache(self):
+        for days_ago, count in [(1, 2), (5, 3), (20, 4), (40, 100)]:
+            DailyActivity.objects.create(
+                date=self.today - datetime.timedelta(days=days_ago), task_submissions=count
+            )
+        make_task(self.user)
+        activity_windows(standard_windows())
+        with CaptureQueriesContext(connection) as queries:
+            activity = activity_windows(standard_windows())
+        # Only today's open row is read; closed-day sums are cached
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(activity['today']['task_submissions'], 1)
+        self.assertEqual(activity['week']['task_submissions'], 6)
+        self.assertEqual(activity['month']['task_submissions'], 10)
+
+    def test_dashboards_answer_from_rollup(self):
+        make_interview(self.user)
+        response = LiveActivityDashboard.as_view()(RequestFactory().get('/', {'start': '2020-01-01'}))
+        data = json.loads(response.content)
+        self.assertEqual(data['real_time']['new_registrations_today'], 1)
+        self.assertEqual(data['weekly_trends']['interview_submissions'], 1)
+        self.assertEqual(data['range']['interview_submissions'], 1)
+
+    def test_rebuild_command_reconciles(self):
+        make_interview(self.user)
+        DailyActivity.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_activity_rollup', '--check', stdout=out)
+        self.assertIn('1 day(s) out of sync', out.getvalue())
+        self.assertFalse(DailyActivity.objects.exists())
+        call_command('rebuild_activity_rollup', stdout=StringIO())
+        row = self.rollup()
+        self.assertEqual((row.registrations, row.interview_submissions), (1, 1))
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_response_cache_stats()
+        self.client = APIClient()
+        self.user = make_user()
+        make_interview(self.user)
+
+    def test_repeat_requests_are_served_from_cache(self):
+        url = reverse('public_interviews')
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+
+    def test_writes_bump_the_generation(self):
+        url = reverse('public_interviews')
+        self.client.get(url)
+        make_interview(self.user, company_name='Globex')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.json()['results']), 2)
+
+        # Logins only touch last_login and must not flush the feeds
+        self.client.post(
+            reverse('login'),
+            {'email': 'alice@example.com', 'password': 'testpass123'},
+            format='json',
+        )
+        self.assertEqual(APIClient().get(url)['X-Cache'], 'HIT')
+
+    def test_errors_are_not_cached(self):
+        url = reverse('user_profile_detail', args=[9999])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(response_cache_stats()['hits'], 0)
+
+    def test_concurrent_misses_build_once(self):
+        builds = []
+        barrier = threading.Barrier(8)
+
+        def build():
+            builds.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        def worker():
+            barrier.wait()
+            results.append(get_or_build('single-flight-test', build))
+
+        results = []
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(results, ['value'] * 8)
+        stats = response_cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['coalesced'], 7)
+
+    def test_stats_endpoint_is_staff_only(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(self.client.get(reverse('cache_stats')).status_code, 403)
+        CustomUser.objects.filter(pk=self.user.pk).update(is_staff=True)
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.json()['response_cache'])
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        for i in range(10):
+            make_interview(self.user, company_name=f'Company {i}', description='Long answer. ' * 20)
+
+    def test_cached_feed_serves_gzip_variant(self):
+        url = reverse('public_interviews')
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        with mock.patch('authentication.cache.precompress') as precompress:
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        # Compressed when the entry was built, not per request
+        precompress.assert_not_called()
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get(reverse('health_check'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_authenticated_responses_are_compressed(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        url = reverse('interview_list_create')
+        plain = self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        # The ETag is weakened, and still validates
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        conditional = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(conditional.status_code, 304)
+
+    def test_weak_etag_satisfies_if_match(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        interview = make_interview(self.user, description='Long answer. ' * 200)
+        url = reverse('interview_detail', args=[interview.pk])
+        etag = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        data = {
+            'company_name': 'Acme', 'position': 'Engineer',
+            'interview_date': '2024-01-15', 'description': 'Updated',
+        }
+        response = self.client.put(url, data, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_exports_stream_compressed(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.client.get(reverse('export', args=['interviews']), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 10)
+
+    def test_admin_renders_without_a_manifest(self):
+        # Tests never run collectstatic; non-strict manifest lookups must cope
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ProfileDocumentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        self.url = reverse('user_profile_detail', args=[self.user.pk])
+
+    def test_query_count_does_not_grow_with_experiences(self):
+        make_interview(self.user)
+        make_task(self.user)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        for i in range(10):
+            make_interview(self.user, company_name=f'Company {i}')
+            make_task(self.user, company_name=f'Company {i}')
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.json()['interview_experiences']), 11)
+        self.assertEqual(response.json()['interview_experiences'][0]['user'], self.user.email)
+
+    def test_nested_lists_follow_cursors(self):
+        for i in range(5):
+            make_interview(self.user, company_name=f'Company {i}')
+        make_task(self.user)
+        seen = []
+        url = f'{self.url}?interviews_limit=2'
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['interview_experiences']), 2)
+            self.assertEqual(len(data['task_experiences']), 1)
+            self.assertIsNone(data['task_experiences_next'])
+            seen += [row['id'] for row in data['interview_experiences']]
+            url = data['interview_experiences_next']
+        expected = InterviewExperience.objects.filter(user=self.user).order_by('-created_at', '-id')
+        self.assertEqual(seen, [row.pk for row in expected])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(self.url, {'tasks_cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cache_is_scoped_to_the_user(self):
+        interview = make_interview(self.user)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+        # Another user's writes leave this document cached
+        other = make_user('bob')
+        make_interview(other)
+        other.profile.bio = 'Hi'
+        other.profile.save()
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        interview.rating = 2
+        interview.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['interview_experiences'][0]['rating'], 2)
+
+        self.user.profile.bio = 'Updated'
+        self.user.profile.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['profile']['bio'], 'Updated')
+
+    def test_bulk_writes_invalidate_the_owner(self):
+        self.client.get(self.url)
+        InterviewExperienceSerializer(many=True).create([
+            {'user_id': self.user.pk, 'company_name': 'Acme', 'position': 'Engineer',
+             'interview_date': datetime.date(2024, 1, 15), 'description': 'Bulk'},
+        ])
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.json()['interview_experiences']), 1)
+
+
+class TokenAuthCacheTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = make_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def auth_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [q for q in queries if 'authtoken_token' in q['sql']]
+
+    def test_repeat_requests_skip_the_token_lookup(self):
+        url = reverse('profile')
+        response, queries = self.auth_queries(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.auth_queries(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+        self.assertEqual(token_cache.stats()['hits'], 1)
+
+    def test_logout_revokes_the_cached_token(self):
+        self.client.get(reverse('profile'))
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_deactivation_and_password_change_invalidate(self):
+        self.client.get(reverse('profile'))
+        self.user.set_password('newpass456')
+        self.user.save()
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+        self.client.get(reverse('profile'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_queryset_updates_invalidate(self):
+        other = Token.objects.create(user=make_user('bob'))
+        self.client.get(reverse('profile'))
+        APIClient(HTTP_AUTHORIZATION=f'Token {other.key}').get(reverse('profile'))
+        self.assertEqual(token_cache.stats()['size'], 2)
+
+        # Bulk deactivation from an admin action or a shell sends no signals
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(token_cache.stats()['size'], 1)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 401)
+
+    def test_entries_are_indexed_by_user(self):
+        for key in ('a', 'b'):
+            token_cache.set(key, self.user, 60, 10)
+        token_cache.set('c', CustomUser(pk=self.user.pk + 1), 60, 10)
+        token_cache.set('a', self.user, 60, 10)
+        token_cache.invalidate_user(self.user.pk)
+        self.assertEqual(token_cache.stats()['size'], 1)
+        self.assertEqual(token_cache.stats()['invalidations'], 2)
+        token_cache.set('d', self.user, 60, 1)
+        # Evicting 'c' keeps the index in step with the entries
+        self.assertEqual(token_cache._keys_by_user, {self.user.pk: {'d'}})
+
+    def test_entries_expire_and_evict(self):
+        other = Token.objects.create(user=make_user('bob'))
+        with override_settings(TOKEN_AUTH_CACHE={'ENABLED': True, 'TTL': 60, 'MAX_SIZE': 1}):
+            self.client.get(reverse('profile'))
+            APIClient(HTTP_AUTHORIZATION=f'Token {other.key}').get(reverse('profile'))
+            stats = token_cache.stats()
+            self.assertEqual((stats['size'], stats['evictions']), (1, 1))
+
+            with mock.patch('authentication.authentication.time.monotonic', return_value=time.monotonic() + 61):
+                _, queries = self.auth_queries(reverse('profile'))
+            self.assertEqual(len(queries), 1)
+
+    def test_disabled_cache_always_queries(self):
+        with override_settings(TOKEN_AUTH_CACHE={'ENABLED': False, 'TTL': 60, 'MAX_SIZE': 10}):
+            self.client.get(reverse('profile'))
+            _, queries = self.auth_queries(reverse('profile'))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+
+class BulkEndpointTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def items(self, count, company_name='Acme', **extra):
+        return [
+            dict({
+                'company_name': company_name,
+                'position': f'Engineer {i}',
+                'interview_date': '2024-01-15',
+                'description': 'Two rounds.',
+                'rating': 4,
+            }, **extra)
+            for i in range(count)
+        ]
+
+    def test_create_inserts_the_batch_and_maintains_derived_data(self):
+        public = reverse('public_interviews')
+        self.client.get(public)
+        with self.assertWithinQueryBudget('interview_bulk'):
+            response = self.client.post(reverse('interview_bulk'), self.items(5), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 5)
+        self.assertTrue(all(item['id'] for item in response.json()))
+        self.assertEqual(InterviewExperience.objects.filter(user=self.user).count(), 5)
+
+        stats = CompanyStats.objects.get(company_key='acme')
+        self.assertEqual((stats.experience_count, stats.rating_total), (5, 20))
+        today = DailyActivity.objects.get(date=timezone.localdate())
+        self.assertEqual(today.interview_submissions, 5)
+        self.assertEqual(self.client.get(public)['X-Cache'], 'MISS')
+        call_command('recompute_company_stats', '--verify', stdout=StringIO())
+
+    def test_invalid_items_reject_the_whole_batch(self):
+        items = self.items(3)
+        items[1]['difficulty'] = 'brutal'
+        del items[2]['position']
+        response = self.client.post(reverse('interview_bulk'), items, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('difficulty', errors[1])
+        self.assertIn('position', errors[2])
+        self.assertFalse(InterviewExperience.objects.exists())
+
+    @override_settings(BULK_MAX_BATCH_SIZE=2)
+    def test_batch_size_is_capped(self):
+        response = self.client.post(reverse('task_bulk'), [{}, {}, {}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.json())
+        response = self.client.delete(reverse('task_bulk'), {'ids': [1, 2, 3]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_is_scoped_to_the_user(self):
+        mine = make_interview(self.user, rating=2)
+        theirs = make_interview(make_user('bob'), rating=2)
+        response = self.client.patch(
+            reverse('interview_bulk'),
+            [{'id': mine.pk, 'rating': 5}, {'id': theirs.pk, 'rating': 5}],
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[1], {'id': ['Not found.']})
+
+        with self.assertWithinQueryBudget('interview_bulk'):
+            response = self.client.patch(
+                reverse('interview_bulk'),
+                [{'id': mine.pk, 'rating': 5, 'company_name': 'Globex'}],
+                format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['rating'], 5)
+        mine.refresh_from_db()
+        theirs.refresh_from_db()
+        self.assertEqual((mine.rating, mine.company_name, theirs.rating), (5, 'Globex', 2))
+        self.assertGreater(mine.updated_at, mine.created_at)
+        call_command('recompute_company_stats', '--verify', stdout=StringIO())
+
+    def test_delete_reports_missing_ids(self):
+        tasks = [make_task(self.user) for _ in range(2)]
+        theirs = make_task(make_user('bob'))
+        ids = [tasks[0].pk, tasks[1].pk, theirs.pk]
+        response = self.client.delete(reverse('task_bulk'), {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'deleted': ids[:2], 'not_found': [theirs.pk]})
+        self.assertEqual(list(TaskExperience.objects.values_list('pk', flat=True)), [theirs.pk])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.first = make_interview(self.user, company_name='Acme', description='Line one\nline "two"')
+        self.second = make_interview(self.user, company_name='Globex')
+
+    def test_ndjson_streams_rows_in_update_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('export', args=['interviews']))
+        # Nothing is read until the body is consumed
+        self.assertEqual(len(queries), 0)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.first.pk, self.second.pk])
+        self.assertEqual(rows[0]['username'], 'alice')
+        self.assertEqual(rows[0]['description'], 'Line one\nline "two"')
+        self.assertEqual(rows[0]['interview_date'], '2024-01-15')
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_csv_export(self):
+        response = self.client.get(reverse('export', args=['tasks']), {'format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('tasks.csv', response['Content-Disposition'])
+        make_task(self.user)
+        response = self.client.get(reverse('export', args=['tasks']), {'format': 'csv'})
+        lines = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(lines[0][:3], ['id', 'user_id', 'username'])
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1][lines[0].index('currently_working')], 'False')
+
+    @override_settings(EXPORT_SINCE_OVERLAP_SECONDS=0)
+    def test_since_exports_only_changed_rows(self):
+        started = self.client.get(reverse('export', args=['interviews']))['X-Export-Started']
+        self.first.rating = 3
+        self.first.save()
+        response = self.client.get(reverse('export', args=['interviews']), {'since': started})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.first.pk])
+
+    @override_settings(EXPORT_SINCE_OVERLAP_SECONDS=60)
+    def test_since_reaches_back_over_late_commits(self):
+        started = self.client.get(reverse('export', args=['interviews']))['X-Export-Started']
+        boundary = datetime.datetime.fromisoformat(started)
+        # Saved before the export started, but committed after it read the table
+        late = make_interview(self.user, company_name='Initech')
+        InterviewExperience.objects.filter(pk=late.pk).update(updated_at=boundary - datetime.timedelta(seconds=59))
+        InterviewExperience.objects.filter(pk=self.first.pk).update(updated_at=boundary - datetime.timedelta(seconds=61))
+        InterviewExperience.objects.filter(pk=self.second.pk).update(updated_at=boundary - datetime.timedelta(seconds=60))
+        response = self.client.get(reverse('export', args=['interviews']), {'since': started})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.second.pk, late.pk])
+
+    @override_settings(EXPORT_CHUNK_SIZE=1)
+    def test_asgi_export_streams_asynchronously(self):
+        async def export():
+            response = await self.async_client.get(reverse('export', args=['interviews']))
+            return response, [part async for part in response.streaming_content]
+
+        with warnings.catch_warnings():
+            # Django warns when it has to buffer a sync iterator under ASGI
+            warnings.simplefilter('error')
+            response, parts = async_to_sync(export)()
+        self.assertTrue(response.is_async)
+        # One part per chunk of rows, sent as each chunk is read
+        self.assertEqual(len(parts), 2)
+        rows = [json.loads(line) for line in b''.join(parts).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.first.pk, self.second.pk])
+
+    def test_bad_parameters(self):
+        url = reverse('export', args=['interviews'])
+        self.assertEqual(self.client.get(url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export', args=['users'])).status_code, 404)
+
+
+class ImportExperiencesTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+        return path
+
+    def interview_lines(self, emails):
+        return ''.join(
+            json.dumps({
+                'email': email,
+                'company_name': f'Company {i % 2}',
+                'position': 'Engineer',
+                'interview_date': '2023-06-01',
+                'description': 'Imported.',
+            }) + '\n'
+            for i, email in enumerate(emails)
+        )
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command('import_experiences', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_imports_valid_rows_in_batches(self):
+        text = self.interview_lines(['alice@example.com', 'ALICE@example.com', 'nobody@example.com'])
+        text += '{not json\n' + json.dumps({'email': 'alice@example.com', 'position': 'x'}) + '\n'
+        path = self.write('interviews.ndjson', text)
+        with CaptureQueriesContext(connection) as queries:
+            output = self.run_import(path, '--type', 'interviews', '--batch-size', '2')
+        self.assertIn('Imported 2 of 5 row(s), 3 invalid', output)
+        self.assertIn('rows/s', output)
+        self.assertIn('row 2: unknown user nobody@example.com', output)
+        self.assertIn('row 3: invalid JSON', output)
+        self.assertEqual(InterviewExperience.objects.filter(user=self.user).count(), 2)
+        # Users are looked up once per batch and then cached
+        lookups = [q for q in queries if 'LOWER' in q['sql'] and 'authentication_customuser' in q['sql']]
+        self.assertEqual(len(lookups), 2)
+        call_command('recompute_company_stats', '--verify', stdout=StringIO())
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write('interviews.ndjson', self.interview_lines(['new@example.com'] * 3))
+        output = self.run_import(path, '--type', 'interviews', '--dry-run', '--create-users')
+        self.assertIn('Validated 3 of 3 row(s), 0 invalid, 1 user(s) to create', output)
+        self.assertFalse(InterviewExperience.objects.exists())
+        self.assertFalse(CustomUser.objects.filter(email='new@example.com').exists())
+
+    def test_create_users_and_resume_from_offset(self):
+        path = self.write('interviews.ndjson', self.interview_lines(['new@example.com'] * 4))
+        output = self.run_import(path, '--type', 'interviews', '--create-users', '--offset', '3')
+        self.assertIn('Imported 1 of 1 row(s)', output)
+        user = CustomUser.objects.get(email='new@example.com')
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+        self.assertEqual(user.interview_experiences.count(), 1)
+
+    def test_csv_tasks(self):
+        path = self.write('tasks.csv', (
+            'email,company_name,position,start_date,description,technologies_used,end_date\n'
+            'alice@example.com,Acme,Intern,2023-01-01,Built things,Python,\n'
+            'alice@example.com,Acme,Intern,not-a-date,Built things,Python,\n'
+        ))
+        output = self.run_import(path, '--type', 'tasks')
+        self.assertIn('Imported 1 of 2 row(s), 1 invalid', output)
+        self.assertIsNone(TaskExperience.objects.get().end_date)
+
+    @override_settings(ACTIVITY_LOG=LOG_UNBUFFERED)
+    def test_imported_rows_count_on_the_day_they_were_created(self):
+        today = list(DailyActivity.objects.filter(date=timezone.localdate()).values())
+        events = ActivityEvent.objects.count()
+        rows = [
+            {'email': 'alice@example.com', 'company_name': 'Acme', 'position': 'Engineer',
+             'interview_date': '2023-06-01', 'description': 'Imported.', 'created_at': created_at}
+            for created_at in ('2023-06-02T10:00:00+00:00', '2023-06-02T11:00:00', 'yesterday')
+        ]
+        path = self.write('interviews.ndjson', ''.join(json.dumps(row) + '\n' for row in rows))
+        output = self.run_import(path, '--type', 'interviews')
+        self.assertIn('Imported 2 of 3 row(s), 1 invalid', output)
+        self.assertIn('row 2: created_at: expected an ISO 8601 datetime', output)
+
+        self.assertEqual(list(DailyActivity.objects.filter(date=timezone.localdate()).values()), today)
+        self.assertEqual(DailyActivity.objects.get(date=datetime.date(2023, 6, 2)).interview_submissions, 2)
+        self.assertEqual(
+            {row.created_at.date() for row in InterviewExperience.objects.filter(description='Imported.')},
+            {datetime.date(2023, 6, 2)},
+        )
+        # History is not live activity
+        self.assertEqual(ActivityEvent.objects.count(), events)
+        out = StringIO()
+        call_command('rebuild_activity_rollup', '--check', stdout=out)
+        self.assertIn('0 day(s) out of sync', out.getvalue())
+
+    def test_interrupted_import_reports_the_resume_offset(self):
+        path = self.write('interviews.ndjson', self.interview_lines(['alice@example.com'] * 4))
+        err = StringIO()
+        with mock.patch('authentication.serializers.bulk_created.send', side_effect=[None, RuntimeError('boom')]):
+            with self.assertRaises(CommandError):
+                call_command('import_experiences', path, '--type', 'interviews', '--batch-size', '2',
+                             stdout=StringIO(), stderr=err)
+        self.assertIn('Resume with --offset 2', err.getvalue())
+        self.assertEqual(InterviewExperience.objects.count(), 2)
+
+
+class SyntheticDataTests(TestCase):
+    def test_generation_is_deterministic_and_consistent(self):
+        def contents():
+            return (
+                list(InterviewExperience.objects.order_by('id').values_list('company_name', 'rating', 'description')),
+                list(TaskExperience.objects.order_by('id').values_list('position', 'technologies_used')),
+                list(UserProfile.objects.order_by('user__username').values_list('user__username', 'bio')),
+            )
+
+        generate(users=4, interviews=20, tasks=10, seed=3)
+        self.assertEqual(CustomUser.objects.count(), 4)
+        self.assertEqual(InterviewExperience.objects.count(), 20)
+        self.assertEqual(TaskExperience.objects.count(), 10)
+        call_command('recompute_company_stats', '--verify', stdout=StringIO())
+        first = contents()
+
+        CustomUser.objects.all().delete()
+        generate(users=4, interviews=20, tasks=10, seed=3)
+        self.assertEqual(contents(), first)
+
+        with self.assertRaises(CommandError):
+            call_command('generate_synthetic_data', '--seed', '3', stdout=StringIO())
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        for i in range(3):
+            make_interview(self.user, company_name=f'Company {i}', tips='A long tip. ' * 50)
+            make_task(self.user, company_name=f'Company {i}')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+
+    def test_summary_view_defers_large_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('public_interviews'), {'view': 'summary', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(set(results[0]), set(InterviewExperienceSerializer.Meta.summary_fields))
+        feed_sql = [q['sql'] for q in queries if 'ORDER BY' in q['sql']]
+        self.assertEqual(len(feed_sql), 1)
+        self.assertNotIn('"tips"', feed_sql[0])
+        self.assertNotIn('"description"', feed_sql[0])
+
+        # Keyset cursors keep working on the deferred queryset
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_fields_and_omit(self):
+        response = self.client.get(reverse('task_list_create'), {'fields': 'company_name,position'})
+        self.assertEqual(set(response.json()[0]), {'id', 'company_name', 'position'})
+
+        response = self.client.get(reverse('public_tasks'), {'omit': 'description,key_responsibilities'})
+        row = response.json()['results'][0]
+        self.assertNotIn('description', row)
+        self.assertIn('technologies_used', row)
+
+    def test_fieldsets_get_their_own_etag(self):
+        url = reverse('interview_list_create')
+        full = self.client.get(url)
+        summary = self.client.get(url, {'view': 'summary'})
+        self.assertNotEqual(full['ETag'], summary['ETag'])
+        self.assertNotIn('tips', summary.json()[0])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('public_interviews'), {'fields': 'company_name,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json())
+        response = self.client.get(reverse('public_interviews'), {'view': 'tiny'})
+        self.assertEqual(response.status_code, 400)
+
+
+class FastPathEquivalenceTests(TestCase):
+    def setUp(self):
+        user = make_user('zoë')
+        for i in range(5):
+            make_interview(
+                user, company_name=f'Café {i}', rating=i + 1, status='selected' if i % 2 else 'pending',
+                tips='Use "quotes" & <tags>\n' * i, salary_offered='₹12 LPA',
+            )
+            make_task(user, company_name=f'Café {i}', end_date=None if i % 2 else datetime.date(2024, 6, 1),
+                      currently_working=bool(i % 2), key_responsibilities='Ship ✓')
+        self.client = APIClient()
+
+    def assertSameBytes(self, url, params=None):
+        responses = []
+        for fast in (False, True):
+            cache.clear()
+            with override_settings(FAST_LIST_SERIALIZATION=fast):
+                responses.append(self.client.get(url, params or {}))
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[0].content, responses[1].content)
+        return responses[1]
+
+    def test_feeds_render_identically(self):
+        for name in ('public_interviews', 'public_tasks'):
+            for params in ({}, {'view': 'summary'}, {'fields': 'company_name,user,created_at'},
+                           {'omit': 'description', 'sort': 'company', 'page_size': 2}):
+                with self.subTest(name=name, params=params):
+                    response = self.assertSameBytes(reverse(name), params)
+            # Cursors built from value rows match the serializer's too
+            self.assertSameBytes(response.json()['next'])
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_datetimes_follow_the_current_timezone(self):
+        response = self.assertSameBytes(reverse('public_interviews'), {'status': 'selected'})
+        self.assertTrue(response.json()['results'][0]['created_at'].endswith('+05:30'))
+
+    def test_renderer_cache_is_bounded(self):
+        fields = list(InterviewExperienceSerializer().fields)
+        renderer = fastpath.fast_renderer(InterviewExperienceSerializer, {'id', 'rating'})
+        self.assertIs(fastpath.fast_renderer(InterviewExperienceSerializer, ['rating', 'id']), renderer)
+        for size in range(1, len(fields)):
+            for start in range(len(fields)):
+                fastpath.fast_renderer(InterviewExperienceSerializer, set((fields * 2)[start:start + size]))
+        self.assertLessEqual(fastpath._renderer.cache_info().currsize, fastpath.RENDERER_CACHE_SIZE)
+
+    def test_unsupported_fields_fail_loudly(self):
+        class Custom(InterviewExperienceSerializer):
+            extra = serializers.SerializerMethodField()
+
+            def get_extra(self, obj):
+                return 1
+
+        with self.assertRaises(ImproperlyConfigured):
+            FastRenderer(Custom)
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = make_user()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.interview = make_interview(self.user)
+
+    def payload(self, **extra):
+        data = {
+            'company_name': 'Acme',
+            'position': 'Engineer',
+            'interview_date': '2024-01-15',
+            'description': 'Updated',
+        }
+        data.update(extra)
+        return data
+
+    def test_list_answers_304_without_loading_rows(self):
+        url = reverse('interview_list_create')
+        first = self.client.get(url)
+        etag = first['ETag']
+        self.assertFalse(first.has_header('Last-Modified'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        # The token is cached from the first request; only the aggregate runs
+        self.assertEqual(len(queries), 1)
+
+        make_interview(self.user, company_name='Globex')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_changes_on_delete(self):
+        make_task(self.user)
+        task = make_task(self.user)
+        url = reverse('task_list_create')
+        etag = self.client.get(url)['ETag']
+        task.delete()
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_list_ignores_if_modified_since_after_a_delete(self):
+        make_task(self.user)
+        task = make_task(self.user)
+        url = reverse('task_list_create')
+        since = http_date(time.time() + 60)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+        task.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_detail_if_modified_since(self):
+        url = reverse('interview_detail', args=[self.interview.pk])
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_put_honors_if_match(self):
+        url = reverse('interview_detail', args=[self.interview.pk])
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.put(url, self.payload(), format='json', HTTP_IF_MATCH='"stale"')
+        self.assertEqual(response.status_code, 412)
+
+        response = self.client.put(url, self.payload(), format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        new_etag = response['ETag']
+        self.assertNotEqual(new_etag, etag)
+        # The returned ETag is current, so the client can skip a re-fetch
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=new_etag).status_code, 304)
+
+    def test_profile_etag_tracks_profile_updates(self):
+        url = reverse('profile')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.client.put(reverse('update_profile'), {'bio': 'Hello'}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        self.stripe = make_interview(
+            self.user,
+            company_name='Stripe',
+            description='Payments system design round.',
+            tips='Know <script> escaping & idempotency keys.',
+        )
+        self.other = make_interview(
+            self.user,
+            company_name='Acme',
+            description='Asked about Stripe webhooks and payments retries.',
+        )
+        make_interview(self.user, company_name='Globex', description='Graph algorithms.')
+
+    def search(self, **params):
+        response = self.client.get(reverse('search'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_ranked_results_with_snippets(self):
+        data = self.search(q='stripe')
+        ids = [row['id'] for row in data['results']]
+        # A company-name match outranks a mention in the description
+        self.assertEqual(ids, [self.stripe.pk, self.other.pk])
+        self.assertLess(data['results'][0]['rank'], data['results'][1]['rank'])
+        self.assertIn('<mark>', data['results'][0]['snippet'])
+
+    def test_snippets_are_html_escaped(self):
+        data = self.search(q='idempotency')
+        snippet = data['results'][0]['snippet']
+        self.assertIn('&lt;script&gt;', snippet)
+        self.assertNotIn('<script>', snippet)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.stripe.company_name = 'Initech'
+        self.stripe.save()
+        self.assertEqual([row['id'] for row in self.search(q='initech')['results']], [self.stripe.pk])
+        self.stripe.delete()
+        self.assertEqual(self.search(q='initech')['results'], [])
+
+    def test_prefix_match_and_pagination(self):
+        data = self.search(q='paym', page_size=1)
+        self.assertEqual(len(data['results']), 1)
+        second = self.client.get(data['next']).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertNotEqual(data['results'][0]['id'], second['results'][0]['id'])
+        self.assertIsNone(second['next'])
+
+    def test_task_search(self):
+        make_task(self.user, technologies_used='Rust, Tokio')
+        data = self.search(q='tokio', type='tasks')
+        self.assertEqual(len(data['results']), 1)
+
+    def test_fallback_without_fts(self):
+        with mock.patch('authentication.search.fts_available', return_value=False):
+            data = self.search(q='stripe payments')
+        self.assertEqual({row['id'] for row in data['results']}, {self.stripe.pk, self.other.pk})
+        self.assertIsNone(data['results'][0]['rank'])
+        self.assertIn('<mark>', data['results'][0]['snippet'])
+
+    def test_missing_index_is_checked_again(self):
+        from .search import fts_available
+
+        self.assertFalse(fts_available(connection, 'authentication_late_fts'))
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE authentication_late_fts (id integer)')
+        self.assertTrue(fts_available(connection, 'authentication_late_fts'))
+        # A positive answer is cached
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(fts_available(connection, 'authentication_late_fts'))
+        self.assertEqual(len(queries), 0)
+
+    def test_requires_query(self):
+        self.assertEqual(self.client.get(reverse('search'), {'q': '  '}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('search'), {'q': 'x', 'type': 'users'}).status_code, 400)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO authentication_interview_fts(authentication_interview_fts) VALUES ('delete-all')")
+        self.assertEqual(self.search(q='globex')['results'], [])
+        cache.clear()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search(q='globex')['results']), 1)
+
+
+class FeedFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+        make_interview(self.user, company_name='Acme', status='selected', difficulty='hard', rating=5)
+        make_interview(self.user, company_name='Acme', status='rejected', difficulty='hard', rating=2)
+        make_interview(self.user, company_name='Globex', status='selected', difficulty='easy', rating=4,
+                       interview_date=datetime.date(2023, 6, 1), location='Berlin')
+
+    def feed(self, **params):
+        response = self.client.get(reverse('public_interviews'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_filters(self):
+        self.assertEqual(len(self.feed(company='acme')['results']), 2)
+        self.assertEqual(len(self.feed(status='selected,rejected', difficulty='hard')['results']), 2)
+        self.assertEqual(len(self.feed(rating_min=3, rating_max=4)['results']), 1)
+        self.assertEqual(len(self.feed(date_to='2023-12-31')['results']), 1)
+        self.assertEqual(len(self.feed(location='berl')['results']), 1)
+
+    def test_invalid_filters_are_rejected(self):
+        response = self.client.get(reverse('public_interviews'), {'status': 'hired', 'rating_min': 'x', 'sort': 'random'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'status', 'rating_min', 'sort'})
+
+    def test_facets_exclude_their_own_selection(self):
+        data = self.feed(status='selected', difficulty='hard')
+        facets = data['facets']
+        self.assertEqual(facets['total'], 1)
+        # Status counts ignore the status filter but honour difficulty=hard
+        self.assertEqual(facets['status']['selected'], 1)
+        self.assertEqual(facets['status']['rejected'], 1)
+        # Difficulty counts ignore the difficulty filter but honour status=selected
+        self.assertEqual(facets['difficulty'], {'easy': 1, 'medium': 0, 'hard': 1})
+        self.assertEqual(facets['rating']['5'], 1)
+
+    def test_facets_are_one_query(self):
+        conditions, _ = INTERVIEW_FILTERS.parse({'status': 'selected', 'rating_min': '2'})
+        with CaptureQueriesContext(connection) as queries:
+            INTERVIEW_FILTERS.facet_counts(InterviewExperience.objects.all(), conditions)
+        self.assertEqual(len(queries), 1)
+
+    def test_sort_by_rating_paginates(self):
+        first = self.feed(sort='rating', page_size=2, facets='false')
+        self.assertNotIn('facets', first)
+        self.assertEqual([row['rating'] for row in first['results']], [5, 4])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['rating'] for row in second['results']], [2])
+
+    def test_task_filters(self):
+        make_task(self.user, task_type='internship', currently_working=True)
+        make_task(self.user, task_type='freelance')
+        response = self.client.get(reverse('public_tasks'), {'currently_working': 'true'})
+        data = response.json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(data['facets']['currently_working'], {'true': 1, 'false': 1})
+        self.assertEqual(data['facets']['task_type']['internship'], 1)
+
+
+class CompanyStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = make_user()
+
+    def stats(self, name='acme'):
+        return CompanyStats.objects.get(company_key=name)
+
+    def verify(self):
+        call_command('recompute_company_stats', '--verify', stdout=StringIO())
+
+    def test_incremental_updates_match_recompute(self):
+        first = make_interview(self.user, company_name='Acme', rating=4, rounds=3, status='selected',
+                               difficulty='hard', interview_date=datetime.date(2024, 3, 1))
+        make_interview(self.user, company_name='ACME', rating=2, rounds=1, status='rejected',
+                       interview_date=datetime.date(2024, 1, 1))
+        stats = self.stats()
+        self.assertEqual(stats.experience_count, 2)
+        self.assertEqual(stats.average_rating, 3)
+        self.assertEqual(stats.average_rounds, 2)
+        self.assertEqual(stats.selection_rate, 0.5)
+        self.assertEqual(stats.difficulty_distribution, {'easy': 0, 'medium': 1, 'hard': 1})
+        self.assertEqual(stats.latest_interview_date, datetime.date(2024, 3, 1))
+        self.verify()
+
+        # Edits apply the old -> new delta, including moving companies
+        first.rating = 5
+        first.status = 'pending'
+        first.save()
+        self.assertEqual(self.stats().rating_total, 7)
+        self.assertEqual(self.stats().status_distribution['pending'], 1)
+        first.company_name = 'Globex'
+        first.save()
+        self.assertEqual(self.stats().experience_count, 1)
+        self.assertEqual(self.stats().latest_interview_date, datetime.date(2024, 1, 1))
+        self.assertEqual(self.stats('globex').rating_total, 5)
+        self.verify()
+
+        first.delete()
+        self.assertFalse(CompanyStats.objects.filter(company_key='globex').exists())
+        self.verify()
+
+    def test_names_differing_in_spacing_or_non_ascii_case_share_a_row(self):
+        make_interview(self.user, company_name='Acme', interview_date=datetime.date(2024, 1, 1))
+        make_interview(self.user, company_name=' acme', interview_date=datetime.date(2024, 2, 1))
+        make_interview(self.user, company_name='Émile', interview_date=datetime.date(2024, 1, 1))
+        latest = make_interview(self.user, company_name='émile ', interview_date=datetime.date(2024, 3, 1))
+        self.assertEqual(self.stats().experience_count, 2)
+        self.assertEqual(self.stats('émile').experience_count, 2)
+        self.verify()
+
+        # Deleting the latest one re-reads the maximum under the same key
+        latest.delete()
+        self.assertEqual(self.stats('émile').latest_interview_date, datetime.date(2024, 1, 1))
+        self.verify()
+
+        CompanyStats.objects.all().delete()
+        call_command('recompute_company_stats', stdout=StringIO())
+        self.assertEqual(
+            {(row.company_key, row.experience_count) for row in CompanyStats.objects.all()},
+            {('acme', 2), ('émile', 1)},
+        )
+        self.verify()
+
+    def test_refreshing_the_latest_date_reads_only_that_company(self):
+        make_interview(self.user, company_name='Acme', interview_date=datetime.date(2024, 1, 1))
+        latest = make_interview(self.user, company_name='ACME ', interview_date=datetime.date(2024, 2, 1))
+        make_interview(self.user, company_name='Acme Corp', interview_date=datetime.date(2024, 6, 1))
+        make_interview(self.user, company_name='Globex', interview_date=datetime.date(2024, 6, 1))
+        with CaptureQueriesContext(connection) as queries:
+            latest.delete()
+        self.assertEqual(self.stats().latest_interview_date, datetime.date(2024, 1, 1))
+        grouped = [query['sql'] for query in queries if 'GROUP BY' in query['sql']]
+        self.assertEqual(len(grouped), 1)
+        self.assertIn('LIKE', grouped[0])
+        self.verify()
+
+    def test_recompute_repairs_drift(self):
+        make_interview(self.user, company_name='Acme')
+        CompanyStats.objects.update(rating_total=999)
+        with self.assertRaises(CommandError):
+            self.verify()
+        call_command('recompute_company_stats', stdout=StringIO())
+        self.verify()
+        self.assertEqual(self.stats().rating_total, 5)
+
+    def test_endpoints(self):
+        make_interview(self.user, company_name='Acme', rating=4)
+        make_interview(self.user, company_name='Acme', rating=2)
+        make_interview(self.user, company_name='Globex')
+        data = self.client.get(reverse('company_stats_list')).json()
+        self.assertEqual([row['company_name'] for row in data['results']], ['Acme', 'Globex'])
+        detail = self.client.get(reverse('company_stats_detail', args=['ACME'])).json()
+        self.assertEqual(detail['experience_count'], 2)
+        self.assertEqual(detail['average_rating'], 3)
+        response = self.client.get(reverse('company_stats_detail', args=['Initech']))
+        self.assertEqual(response.status_code, 404)
@@ -1,24 +1,41 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Async implementations of the read endpoints, for ASGI (see async_views.py)
+if settings.ASYNC_VIEWS:
+    from . import async_views as reads
+else:
+    reads = views
+
 urlpatterns = [
     path('health/', views.health_check, name='health_check'),
     path('register/', views.register, name='register'),
     path('login/', views.user_login, name='login'),
     path('logout/', views.user_logout, name='logout'),
-    path('profile/', views.user_profile, name='profile'),
+    path('profile/', reads.user_profile, name='profile'),
     path('profile/update/', views.update_profile, name='update_profile'),
     
     # Interview Experience endpoints
-    path('interviews/', views.interview_experience_list_create, name='interview_list_create'),
-    path('interviews/<int:pk>/', views.interview_experience_detail, name='interview_detail'),
+    path('interviews/', reads.interview_experience_list_create, name='interview_list_create'),
+    path('interviews/bulk/', views.interview_experience_bulk, name='interview_bulk'),
+    path('interviews/<int:pk>/', reads.interview_experience_detail, name='interview_detail'),
     
     # Task Experience endpoints  
-    path('tasks/', views.task_experience_list_create, name='task_list_create'),
-    path('tasks/<int:pk>/', views.task_experience_detail, name='task_detail'),
+    path('tasks/', reads.task_experience_list_create, name='task_list_create'),
+    path('tasks/bulk/', views.task_experience_bulk, name='task_bulk'),
+    path('tasks/<int:pk>/', reads.task_experience_detail, name='task_detail'),
     
     # Public endpoints for viewing all experiences
-    path('public/interviews/', views.public_interview_experiences, name='public_interviews'),
-    path('public/tasks/', views.public_task_experiences, name='public_tasks'),
-    path('public/users/<int:user_id>/', views.user_profile_detail, name='user_profile_detail'),
+    path('public/interviews/', reads.public_interview_experiences, name='public_interviews'),
+    path('public/tasks/', reads.public_task_experiences, name='public_tasks'),
+    path('public/users/<int:user_id>/', reads.user_profile_detail, name='user_profile_detail'),
+    path('public/companies/', views.company_stats_list, name='company_stats_list'),
+    path('public/companies/<str:company>/', views.company_stats_detail, name='company_stats_detail'),
+    path('export/<str:kind>/', views.export_experiences, name='export'),
+    path('search/', views.search_experiences, name='search'),
+    path('activity/stream/', views.activity_stream, name='activity_stream'),
+    
+    # Cache metrics (staff only)
+    path('cache/stats/', views.cache_stats, name='cache_stats'),
 ]
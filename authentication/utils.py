@@ -0,0 +1,18 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+
+def day_bounds(day):
+    """
+    Return the aware ``[start, end)`` datetimes covering ``day`` in the
+    current timezone.
+
+    Filtering with ``field__gte=start, field__lt=end`` can use an index on
+    ``field``; ``field__date=day`` wraps the column in a cast and forces a
+    full table scan.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+    return start, end
@@ -1,14 +1,32 @@
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer, UserProfileSerializer, InterviewExperienceSerializer, TaskExperienceSerializer, UserDetailSerializer
-from .models import CustomUser, UserProfile, InterviewExperience, TaskExperience
-from django.http import HttpResponse
+from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer, UserProfileSerializer, InterviewExperienceSerializer, TaskExperienceSerializer, UserDetailSerializer, CompanyStatsSerializer
+from .models import CustomUser, UserProfile, InterviewExperience, TaskExperience, CompanyStats
+from .companies import company_key
+from .conditional import check_preconditions, collection_validators, instance_validators, set_validators
+from .authentication import token_cache
+from .cache import cache_public_response, response_cache_stats
+from .routers import replica_reads
+from .search import SEARCH_INDEXES, search, tokenize
+from .fastpath import fast_renderer
+from .fieldsets import defer_unselected, fieldset_key, parse_fieldset
+from .filters import INTERVIEW_FILTERS, TASK_FILTERS
+from .pagination import INTERVIEW_FEED_ORDERING, TASK_FEED_ORDERING, KeysetPagination
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from .export import EXPORTS, FORMATS, astream, stream
+from .streams import broadcaster
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -92,6 +110,8 @@ def user_logout(request):
     """
     try:
         request.user.auth_token.delete()
+        if request.auth is not None:
+            token_cache.invalidate(request.auth.key)
         logout(request)
         return Response({
             'message': 'Logout successful'
@@ -108,9 +128,13 @@ def user_profile(request):
     Get user profile
     """
     try:
-        profile = UserProfile.objects.get(user=request.user)
+        profile = UserProfile.objects.select_related('user').get(user=request.user)
+        etag, last_modified = instance_validators(profile, profile.user)
+        response = check_preconditions(request, etag, last_modified)
+        if response is not None:
+            return response
         serializer = UserProfileSerializer(profile)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, last_modified)
     except UserProfile.DoesNotExist:
         return Response({
             'error': 'Profile not found'
@@ -123,7 +147,7 @@ def update_profile(request):
     Update user profile
     """
     try:
-        profile = UserProfile.objects.get(user=request.user)
+        profile = UserProfile.objects.select_related('user').get(user=request.user)
         serializer = UserProfileSerializer(profile, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -144,9 +168,14 @@ def update_profile(request):
 @permission_classes([IsAuthenticated])
 def interview_experience_list_create(request):
     if request.method == 'GET':
-        experiences = InterviewExperience.objects.filter(user=request.user)
-        serializer = InterviewExperienceSerializer(experiences, many=True)
-        return Response(serializer.data)
+        selected = parse_fieldset(request.query_params, InterviewExperienceSerializer)
+        experiences = InterviewExperience.objects.select_related('user').filter(user=request.user)
+        etag, last_modified = collection_validators(experiences, request.user, fieldset_key(selected))
+        response = check_preconditions(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = InterviewExperienceSerializer(defer_unselected(experiences, selected), many=True, fields=selected)
+        return set_validators(Response(serializer.data), etag, last_modified)
     
     elif request.method == 'POST':
         serializer = InterviewExperienceSerializer(data=request.data)
@@ -159,19 +188,25 @@ def interview_experience_list_create(request):
 @permission_classes([IsAuthenticated])
 def interview_experience_detail(request, pk):
     try:
-        experience = InterviewExperience.objects.get(pk=pk, user=request.user)
+        experience = InterviewExperience.objects.select_related('user').get(pk=pk, user=request.user)
     except InterviewExperience.DoesNotExist:
         return Response({'error': 'Interview experience not found'}, status=status.HTTP_404_NOT_FOUND)
     
+    if request.method in ('GET', 'PUT'):
+        # 304 for a fresh GET; 412 for a PUT whose If-Match no longer matches
+        response = check_preconditions(request, *instance_validators(experience))
+        if response is not None:
+            return response
+    
     if request.method == 'GET':
         serializer = InterviewExperienceSerializer(experience)
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), *instance_validators(experience))
     
     elif request.method == 'PUT':
         serializer = InterviewExperienceSerializer(experience, data=request.data)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            return set_validators(Response(serializer.data), *instance_validators(experience))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
@@ -183,9 +218,14 @@ def interview_experience_detail(request, pk):
 @permission_classes([IsAuthenticated])
 def task_experience_list_create(request):
     if request.method == 'GET':
-        tasks = TaskExperience.objects.filter(user=request.user)
-        serializer = TaskExperienceSerializer(tasks, many=True)
-        return Response(serializer.data)
+        selected = parse_fieldset(request.query_params, TaskExperienceSerializer)
+        tasks = TaskExperience.objects.select_related('user').filter(user=request.user)
+        etag, last_modified = collection_validators(tasks, request.user, fieldset_key(selected))
+        response = check_preconditions(request, etag, last_modified)
+        if response is not None:
+            return response
+        serializer = TaskExperienceSerializer(defer_unselected(tasks, selected), many=True, fields=selected)
+        return set_validators(Response(serializer.data), etag, last_modified)
     
     elif request.method == 'POST':
         serializer = TaskExperienceSerializer(data=request.data)
@@ -198,53 +238,244 @@ def task_experience_list_create(request):
 @permission_classes([IsAuthenticated])
 def task_experience_detail(request, pk):
     try:
-        task = TaskExperience.objects.get(pk=pk, user=request.user)
+        task = TaskExperience.objects.select_related('user').get(pk=pk, user=request.user)
     except TaskExperience.DoesNotExist:
         return Response({'error': 'Task experience not found'}, status=status.HTTP_404_NOT_FOUND)
     
+    if request.method in ('GET', 'PUT'):
+        # 304 for a fresh GET; 412 for a PUT whose If-Match no longer matches
+        response = check_preconditions(request, *instance_validators(task))
+        if response is not None:
+            return response
+    
     if request.method == 'GET':
         serializer = TaskExperienceSerializer(task)
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), *instance_validators(task))
     
     elif request.method == 'PUT':
         serializer = TaskExperienceSerializer(task, data=request.data)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            return set_validators(Response(serializer.data), *instance_validators(task))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
         task.delete()
         return Response({'message': 'Task experience deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
+# Batch endpoints: one request, one validation pass and one transaction per batch
+@api_view(['POST', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def interview_experience_bulk(request):
+    """Create, update (by id) or delete many of the user's interview experiences"""
+    return bulk_experiences(request, InterviewExperience, InterviewExperienceSerializer)
+
+@api_view(['POST', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def task_experience_bulk(request):
+    """Create, update (by id) or delete many of the user's task experiences"""
+    return bulk_experiences(request, TaskExperience, TaskExperienceSerializer)
+
+def bulk_experiences(request, model, serializer_class):
+    max_size = settings.BULK_MAX_BATCH_SIZE
+    if request.method == 'DELETE':
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids or not all(type(pk) is int for pk in ids):
+            return Response({'ids': ['Expected a non-empty list of ids.']}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > max_size:
+            return Response({'ids': [f'Ensure this field has no more than {max_size} elements.']}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            owned = model.objects.filter(user=request.user, pk__in=ids)
+            found = set(owned.values_list('pk', flat=True))
+            owned.delete()
+        return Response({
+            'deleted': [pk for pk in ids if pk in found],
+            'not_found': [pk for pk in ids if pk not in found],
+        })
+
+    instances = None
+    if request.method == 'PATCH':
+        ids = []
+        if isinstance(request.data, list):
+            ids = [item.get('id') for item in request.data if isinstance(item, dict)]
+        instances = (
+            model.objects.select_related('user')
+            .filter(user=request.user)
+            .in_bulk([pk for pk in ids if type(pk) is int])
+        )
+    serializer = serializer_class(
+        instances, data=request.data, many=True, partial=instances is not None, max_length=max_size
+    )
+    if not serializer.is_valid():
+        # A list with one entry per item ({} when valid), or a dict for batch-level errors
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    if instances is None:
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    serializer.save()
+    return Response(serializer.data)
+
 # Public Views for displaying all users' experiences
+@replica_reads
+@cache_public_response(InterviewExperience, CustomUser)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def public_interview_experiences(request):
-    """Get all interview experiences from all users (public view)"""
-    experiences = InterviewExperience.objects.all()
-    serializer = InterviewExperienceSerializer(experiences, many=True)
-    return Response(serializer.data)
+    """Get interview experiences from all users (public view), filtered, sorted and cursor paginated"""
+    return filtered_feed(request, INTERVIEW_FILTERS, InterviewExperienceSerializer)
 
+@replica_reads
+@cache_public_response(TaskExperience, CustomUser)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def public_task_experiences(request):
-    """Get all task experiences from all users (public view)"""
-    tasks = TaskExperience.objects.all()
-    serializer = TaskExperienceSerializer(tasks, many=True)
-    return Response(serializer.data)
+    """Get task experiences from all users (public view), filtered, sorted and cursor paginated"""
+    return filtered_feed(request, TASK_FILTERS, TaskExperienceSerializer)
+
+def filtered_feed(request, filter_set, serializer_class):
+    conditions, ordering = filter_set.parse(request.query_params)
+    selected = parse_fieldset(request.query_params, serializer_class)
+    paginator = KeysetPagination(ordering)
+    if settings.FAST_LIST_SERIALIZATION:
+        # values_list() rows rendered directly; same JSON as the serializer
+        renderer = fast_renderer(serializer_class, selected)
+        queryset = renderer.values(filter_set.filter(filter_set.model.objects.all(), conditions), ordering)
+        data = renderer.render(paginator.paginate_queryset(queryset, request))
+    else:
+        queryset = defer_unselected(filter_set.model.objects.select_related('user'), selected, ordering)
+        rows = paginator.paginate_queryset(filter_set.filter(queryset, conditions), request)
+        data = serializer_class(rows, many=True, fields=selected).data
+    response = paginator.get_paginated_response(data)
+    if request.query_params.get('facets', 'true').lower() not in ('false', '0'):
+        response.data['facets'] = filter_set.facet_counts(filter_set.model.objects.all(), conditions)
+    return response
 
+@replica_reads
+@cache_public_response(CustomUser, UserProfile, InterviewExperience, TaskExperience, scope='user_id')
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def user_profile_detail(request, user_id):
-    """Get detailed user profile with all their experiences"""
+    """
+    Get a user's public profile with their latest experiences. Each nested
+    list is cursor paginated on its own (``interviews_limit`` /
+    ``interviews_cursor``, ``tasks_limit`` / ``tasks_cursor``); the
+    ``*_next`` links fetch the following slice.
+    """
     try:
-        user = CustomUser.objects.get(id=user_id)
-        serializer = UserDetailSerializer(user)
-        return Response(serializer.data)
+        user = CustomUser.objects.select_related('profile').get(id=user_id)
     except CustomUser.DoesNotExist:
         return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    # Related managers attach ``user`` to each row, so nothing re-queries it
+    interviews = nested_paginator('interviews', INTERVIEW_FEED_ORDERING)
+    user.interview_page = interviews.paginate_queryset(user.interview_experiences.all(), request)
+    tasks = nested_paginator('tasks', TASK_FEED_ORDERING)
+    user.task_page = tasks.paginate_queryset(user.task_experiences.all(), request)
+
+    data = UserDetailSerializer(user).data
+    data['interview_experiences_next'] = interviews.get_next_link()
+    data['task_experiences_next'] = tasks.get_next_link()
+    return Response(data)
+
+def nested_paginator(prefix, ordering):
+    paginator = KeysetPagination(ordering, page_size=settings.PROFILE_EXPERIENCES_PAGE_SIZE)
+    paginator.cursor_query_param = f'{prefix}_cursor'
+    paginator.page_size_query_param = f'{prefix}_limit'
+    return paginator
+
+# Per-company statistics (maintained incrementally, see companies.py)
+@cache_public_response(InterviewExperience)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def company_stats_list(request):
+    """Companies with the most interview experiences first, cursor paginated"""
+    paginator = KeysetPagination(('-experience_count', 'company_key'))
+    companies = paginator.paginate_queryset(CompanyStats.objects.all(), request)
+    serializer = CompanyStatsSerializer(companies, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+@cache_public_response(InterviewExperience)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def company_stats_detail(request, company):
+    """What interviewing at one company is like"""
+    try:
+        stats = CompanyStats.objects.get(company_key=company_key(company))
+    except CompanyStats.DoesNotExist:
+        return Response({'error': 'Company not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(CompanyStatsSerializer(stats).data)
+
+@cache_public_response(InterviewExperience, TaskExperience, CustomUser)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_experiences(request):
+    """Full-text search over interview (default) or task experiences, best matches first"""
+    kind = request.query_params.get('type', 'interviews')
+    if kind not in SEARCH_INDEXES:
+        return Response({'error': f"type must be one of: {', '.join(SEARCH_INDEXES)}"}, status=status.HTTP_400_BAD_REQUEST)
+    text = request.query_params.get('q', '')
+    if not tokenize(text):
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    paginator, hits = search(kind, text, request)
+    serializer_class = InterviewExperienceSerializer if kind == 'interviews' else TaskExperienceSerializer
+    results = []
+    for hit in hits:
+        data = serializer_class(hit['object']).data
+        data['rank'] = hit['rank']
+        data['snippet'] = hit['snippet']
+        results.append(data)
+    return paginator.get_paginated_response(results)
+
+# Streaming export: a plain Django view, as DRF would treat ?format= as a
+# renderer override
+@require_GET
+def export_experiences(request, kind):
+    """Stream every public interview or task experience as NDJSON (default) or CSV"""
+    if kind not in EXPORTS:
+        return JsonResponse({'error': f"export must be one of: {', '.join(EXPORTS)}"}, status=404)
+    fmt = request.GET.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return JsonResponse({'format': [f"expected one of: {', '.join(FORMATS)}"]}, status=400)
+    since = None
+    if request.GET.get('since'):
+        since = parse_datetime(request.GET['since'])
+        if since is None:
+            return JsonResponse({'since': ['expected an ISO 8601 datetime']}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+    started = timezone.now()
+    # Under ASGI a sync iterator would be read to the end in a thread before
+    # the first byte is sent
+    lines = astream if isinstance(request, ASGIRequest) else stream
+    response = StreamingHttpResponse(lines(kind, fmt, since), content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    response['X-Export-Started'] = started.isoformat()
+    return response
+
+# Server-Sent Events need an ASGI server (recursion_backend/asgi.py): under
+# WSGI a worker would be held for as long as the client stays connected
+async def activity_stream(request):
+    """Push new registrations, interview and task submissions as they happen"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The activity stream is only served over ASGI'}, status=501)
+    response = StreamingHttpResponse(broadcaster.stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """Hit/miss counters of the response and token caches in this worker process"""
+    return Response({
+        'response_cache': response_cache_stats(),
+        'token_auth_cache': token_cache.stats(),
+    })
+
 def admin_test(request):
     """Simple test view to check if Django is working"""
     return HttpResponse("""
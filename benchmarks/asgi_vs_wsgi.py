@@ -0,0 +1,191 @@
+"""
+Serve the read endpoints with gunicorn's sync workers (the WSGI deployment
+in the Procfile) and then with uvicorn workers (``recursion_backend.asgi``,
+which turns on the async views), and load both with the same number of
+concurrent keep-alive clients. Reports requests per second, median and p99
+latency and errors.
+
+Both servers run the same number of worker processes against one database
+file in a temporary directory. The response cache is off unless ``--cache``
+is given, so every request reaches the database.
+
+    python benchmarks/asgi_vs_wsgi.py [--clients 200] [--workers 2] [--seconds 15]
+
+Needs ``uvicorn`` (requirements.txt) next to gunicorn.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT
+from sqlite_concurrency import prepare
+
+SERVERS = {
+    'wsgi': ['recursion_backend.wsgi:application'],
+    'asgi': ['recursion_backend.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+PUBLIC_PATHS = ('/api/auth/public/interviews/', '/api/auth/public/tasks/')
+PRIVATE_PATHS = ('/api/auth/profile/', '/api/auth/interviews/', '/api/auth/tasks/')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, env, workers):
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'gunicorn', *SERVERS[kind],
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning',
+    ]
+    server = subprocess.Popen(command, cwd=ROOT, env=dict(os.environ, **env))
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server, port
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError(f'{kind} server exited with {server.returncode}')
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{kind} server did not start')
+
+
+async def read_response(reader):
+    """Status, body and whether the server keeps the connection open."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    if 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        body = b''
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            body += await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        body = await reader.read()
+        headers['connection'] = 'close'
+    return status, body, headers.get('connection', '').lower() != 'close'
+
+
+async def client(port, paths, token, stop, stats):
+    reader = writer = None
+    i = 0
+    while not stop.is_set():
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            request = (
+                f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                + (f'Authorization: Token {token}\r\n' if path in PRIVATE_PATHS else '')
+                + '\r\n'
+            )
+            writer.write(request.encode('latin-1'))
+            status, _, keep_alive = await asyncio.wait_for(read_response(reader), 30)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            stats['errors'] += 1
+            keep_alive = False
+        else:
+            if stats['measuring']:
+                stats['ok' if status == 200 else 'errors'] += 1
+                stats['latencies'].append(time.perf_counter() - start)
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, tokens, args):
+    stop = asyncio.Event()
+    stats = {'ok': 0, 'errors': 0, 'latencies': [], 'measuring': False}
+    paths = PUBLIC_PATHS + PRIVATE_PATHS
+    clients = [
+        asyncio.create_task(client(port, paths[i % len(paths):] + paths[:i % len(paths)],
+                                   tokens[i % len(tokens)], stop, stats))
+        for i in range(args.clients)
+    ]
+    await asyncio.sleep(args.warmup)
+    stats['measuring'], stats['errors'] = True, 0
+    await asyncio.sleep(args.seconds)
+    stats['measuring'] = False
+    stop.set()
+    await asyncio.wait(clients, timeout=35)
+    return stats
+
+
+def run(kind, env, tokens, args):
+    server, port = start_server(kind, env, args.workers)
+    try:
+        stats = asyncio.run(load(port, tokens, args))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+    latencies = sorted(stats['latencies'])
+    return {
+        'server': kind,
+        'requests_per_second': round(stats['ok'] / args.seconds, 1),
+        'errors': stats['errors'],
+        'median_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=200, help='concurrent keep-alive connections')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes per server')
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--warmup', type=float, default=3)
+    parser.add_argument('--users', type=int, default=20, help='users whose tokens the clients use')
+    parser.add_argument('--rows', type=int, default=2000, help='interviews and tasks in the database')
+    parser.add_argument('--cache', action='store_true', help='leave the response cache on')
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            'SQLITE_PATH': os.path.join(directory, 'db.sqlite3'),
+            'RESPONSE_CACHE_ENABLED': str(args.cache),
+            'QUERY_BUDGET_ENABLED': 'False',
+            'DEBUG': 'False',
+        }
+        with ctx.Pool(1) as pool:
+            tokens = pool.apply(prepare, (env, args.users, args.rows))
+
+        print(f'{args.clients} clients, {args.workers} workers per server, {args.seconds:g}s')
+        print(f"{'server':8}{'req/s':>10}{'median':>10}{'p99':>10}{'errors':>8}")
+        for kind in args.servers:
+            row = run(kind, env, tokens, args)
+            print(
+                f"{row['server']:8}{row['requests_per_second']:>10}{row['median_ms']:>8}ms"
+                f"{row['p99_ms']:>8}ms{row['errors']:>8}"
+            )
+
+
+if __name__ == '__main__':
+    main()
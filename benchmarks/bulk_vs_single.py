@@ -0,0 +1,58 @@
+"""
+Compare inserting N interview experiences one POST at a time with a single
+batch POST to ``interviews/bulk/``.
+
+    python benchmarks/bulk_vs_single.py [--items 100] [--companies 5]
+"""
+
+import argparse
+import json
+
+from common import authenticated_client, measure, setup_django
+
+
+def payload(count, companies):
+    return [
+        {
+            'company_name': f'Company {i % companies}',
+            'position': 'Engineer',
+            'interview_date': '2024-01-15',
+            'description': 'Two rounds of problem solving.',
+            'rating': i % 5 + 1,
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--companies', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.conf import settings
+        from django.urls import reverse
+
+        settings.BULK_MAX_BATCH_SIZE = max(settings.BULK_MAX_BATCH_SIZE, args.items)
+        items = payload(args.items, args.companies)
+        results = {}
+
+        _, client = authenticated_client('single')
+        with measure(results, 'single'):
+            for item in items:
+                assert client.post(reverse('interview_list_create'), item, format='json').status_code == 201
+
+        _, client = authenticated_client('bulk')
+        with measure(results, 'bulk'):
+            assert client.post(reverse('interview_bulk'), items, format='json').status_code == 201
+
+        results['speedup'] = round(results['single']['seconds'] / results['bulk']['seconds'], 1)
+        print(json.dumps({'items': args.items, 'companies': args.companies, **results}, indent=2))
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Shared setup for the scripts in this directory.
+
+Each script runs against a throwaway test database, so it never touches
+``db.sqlite3``. Run them from the repository root, e.g.
+``python benchmarks/bulk_vs_single.py``.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    """Configure Django and create a fresh test database; returns a teardown callable."""
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recursion_backend.settings')
+    # Benchmarks run big batches on purpose; keep the budget logger quiet
+    os.environ.setdefault('QUERY_BUDGET_ENABLED', 'False')
+
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    django.setup()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return teardown
+
+
+def authenticated_client(username='bench'):
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+
+    from authentication.models import CustomUser, UserProfile
+
+    user = CustomUser.objects.create(
+        username=username, email=f'{username}@example.com', password=make_password(None)
+    )
+    UserProfile.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+    return user, client
+
+
+@contextmanager
+def measure(results, name):
+    """Record wall time and query count of the block under ``results[name]``."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        yield
+    results[name] = {
+        'seconds': round(time.perf_counter() - start, 4),
+        'queries': len(queries),
+    }
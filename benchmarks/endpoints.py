@@ -0,0 +1,358 @@
+"""
+Time every route in ``authentication/urls.py`` plus the live dashboard and
+the admin ``dashboard_stats`` view at several data scales.
+
+For each scale the database is refilled with ``authentication.synthetic``
+and every route is run ``--repeat`` times with the response cache cleared,
+recording median / p95 latency, query count and peak Python heap. Results
+are compared with the stored baseline and regressions beyond
+``--threshold`` are flagged (exit status 1); ``--save`` writes a new one.
+
+    python benchmarks/endpoints.py [--scales small medium] [--repeat 5] [--save]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from common import ROOT, setup_django
+
+SCALES = {
+    'small': {'users': 50, 'interviews': 500, 'tasks': 500},
+    'medium': {'users': 200, 'interviews': 5000, 'tasks': 5000},
+    'large': {'users': 1000, 'interviews': 50000, 'tasks': 50000},
+}
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baselines', 'endpoints.json')
+
+# Differences below these are noise, whatever the relative change
+MIN_LATENCY_MS = 2.0
+MIN_PEAK_KB = 64
+
+
+class Context:
+    """Fixtures shared by the route specs at one scale."""
+
+    def __init__(self):
+        from rest_framework.authtoken.models import Token
+        from rest_framework.test import APIClient
+
+        from authentication.models import CompanyStats, CustomUser, InterviewExperience, TaskExperience
+        from authentication.synthetic import PASSWORD
+
+        self.password = PASSWORD
+        self.user = CustomUser.objects.order_by('id').first()
+        self.user.is_staff = True
+        self.user.save()
+        self.token = Token.objects.get_or_create(user=self.user)[0]
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.interview = InterviewExperience.objects.filter(user=self.user).first()
+        self.task = TaskExperience.objects.filter(user=self.user).first()
+        self.company = CompanyStats.objects.order_by('-experience_count').first().company_name
+        self.counter = 0
+
+    def unique(self):
+        self.counter += 1
+        return f'bench{self.counter}'
+
+    def interview_payload(self, **extra):
+        return dict({
+            'company_name': 'Bench Co',
+            'position': 'Engineer',
+            'interview_date': '2024-01-15',
+            'description': 'Benchmark run.',
+        }, **extra)
+
+    def task_payload(self, **extra):
+        return dict({
+            'company_name': 'Bench Co',
+            'position': 'Intern',
+            'start_date': '2024-01-15',
+            'description': 'Benchmark run.',
+            'technologies_used': 'Python',
+        }, **extra)
+
+
+def route_specs():
+    """
+    URL name -> ``spec(ctx)`` that does any setup and returns the zero
+    argument callable to time.
+    """
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+
+    from authentication.models import TaskExperience
+
+    def get(name, *args, **params):
+        return lambda ctx: lambda: ctx.client.get(reverse(name, args=args), params)
+
+    def register(ctx):
+        name = ctx.unique()
+        data = {
+            'username': name, 'email': f'{name}@example.com', 'password': 'benchpass123',
+            'confirmPassword': 'benchpass123', 'first_name': 'Bench', 'last_name': 'User',
+        }
+        return lambda: APIClient().post(reverse('register'), data, format='json')
+
+    def login(ctx):
+        data = {'email': ctx.user.email, 'password': ctx.password}
+        return lambda: APIClient().post(reverse('login'), data, format='json')
+
+    def logout(ctx):
+        # Log out a throwaway token so the shared one keeps working
+        other = ctx.user.__class__.objects.exclude(pk=ctx.user.pk).order_by('id').first()
+        Token.objects.filter(user=other).delete()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=other).key}')
+        return lambda: client.post(reverse('logout'))
+
+    def update_profile(ctx):
+        return lambda: ctx.client.put(reverse('update_profile'), {'bio': ctx.unique()}, format='json')
+
+    def create_interview(ctx):
+        return lambda: ctx.client.post(reverse('interview_list_create'), ctx.interview_payload(), format='json')
+
+    def update_interview(ctx):
+        data = ctx.interview_payload(company_name=ctx.interview.company_name, rating=3)
+        return lambda: ctx.client.put(reverse('interview_detail', args=[ctx.interview.pk]), data, format='json')
+
+    def bulk_interviews(ctx):
+        data = [ctx.interview_payload(position=f'Engineer {i}') for i in range(20)]
+        return lambda: ctx.client.post(reverse('interview_bulk'), data, format='json')
+
+    def create_task(ctx):
+        return lambda: ctx.client.post(reverse('task_list_create'), ctx.task_payload(), format='json')
+
+    def update_task(ctx):
+        data = ctx.task_payload(company_name=ctx.task.company_name)
+        return lambda: ctx.client.put(reverse('task_detail', args=[ctx.task.pk]), data, format='json')
+
+    def bulk_tasks(ctx):
+        ids = list(TaskExperience.objects.filter(user=ctx.user).values_list('id', flat=True)[:20])
+        data = [{'id': pk, 'achievements': ctx.unique()} for pk in ids]
+        return lambda: ctx.client.patch(reverse('task_bulk'), data, format='json')
+
+    def export(ctx):
+        def run():
+            response = ctx.client.get(reverse('export', args=['interviews']))
+            for _ in response.streaming_content:
+                pass
+            return response
+        return run
+
+    def activity_stream(ctx):
+        # Insert-to-delivery latency for one viewer of the SSE stream
+        from asgiref.sync import async_to_sync, sync_to_async
+
+        from authentication.events import event_buffer
+        from authentication.models import InterviewExperience
+        from authentication.streams import broadcaster
+
+        async def deliver():
+            stream = broadcaster.stream()
+            try:
+                await stream.__anext__()  # retry: sent once the watcher is ready
+                await sync_to_async(InterviewExperience.objects.create)(
+                    user=ctx.user, **ctx.interview_payload()
+                )
+                # Measured from the log write, not from the buffer's timer
+                await sync_to_async(event_buffer.flush)()
+                return await stream.__anext__()
+            finally:
+                await stream.aclose()
+
+        class Delivered:
+            status_code = 200
+
+        def run():
+            async_to_sync(deliver)()
+            return Delivered
+        return run
+
+    return {
+        'health_check': get('health_check'),
+        'register': register,
+        'login': login,
+        'logout': logout,
+        'profile': get('profile'),
+        'update_profile': update_profile,
+        'interview_list_create': get('interview_list_create'),
+        'interview_list_create:post': create_interview,
+        'interview_detail': lambda ctx: get('interview_detail', ctx.interview.pk)(ctx),
+        'interview_detail:put': update_interview,
+        'interview_bulk': bulk_interviews,
+        'task_list_create': get('task_list_create'),
+        'task_list_create:post': create_task,
+        'task_detail': lambda ctx: get('task_detail', ctx.task.pk)(ctx),
+        'task_detail:put': update_task,
+        'task_bulk': bulk_tasks,
+        'public_interviews': get('public_interviews'),
+        'public_interviews:filtered': get('public_interviews', status='selected', sort='rating'),
+        'public_interviews:summary': get('public_interviews', view='summary'),
+        'public_tasks': get('public_tasks'),
+        'user_profile_detail': lambda ctx: get('user_profile_detail', ctx.user.pk)(ctx),
+        'company_stats_list': get('company_stats_list'),
+        'company_stats_detail': lambda ctx: get('company_stats_detail', ctx.company)(ctx),
+        'search': get('search', q='system design'),
+        'export': export,
+        'cache_stats': get('cache_stats'),
+        'activity_stream': activity_stream,
+        'live_dashboard': live_dashboard,
+        'dashboard_stats': dashboard_stats,
+    }
+
+
+def live_dashboard(ctx):
+    from django.test import RequestFactory
+
+    from authentication.monitoring_views import LiveActivityDashboard
+
+    return lambda: LiveActivityDashboard.as_view()(RequestFactory().get('/'))
+
+
+def dashboard_stats(ctx):
+    from django.test import RequestFactory
+
+    from authentication.admin import admin_site
+
+    request = RequestFactory().get('/')
+    request.user = ctx.user
+    return lambda: admin_site.dashboard_stats(request)
+
+
+def check_coverage(specs):
+    from authentication import urls
+
+    missing = {pattern.name for pattern in urls.urlpatterns} - {name.split(':')[0] for name in specs}
+    if missing:
+        sys.exit(f"No benchmark for route(s): {', '.join(sorted(missing))}")
+
+
+def measure(spec, ctx, repeat):
+    from django.core.cache import cache
+    from django.db import connection
+
+    from authentication.query_budget import QueryCounter
+
+    def fresh():
+        # Cold response cache every time, so the view itself is measured
+        cache.clear()
+        return spec(ctx)
+
+    # Views print debug output; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        fresh()()  # warm-up
+
+        # CaptureQueriesContext would be reset by request_started; count directly
+        run = fresh()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            tracemalloc.start()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        timings = []
+        for _ in range(repeat):
+            run = fresh()
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                response = run()
+                timings.append((time.perf_counter() - start) * 1000)
+            finally:
+                gc.enable()
+
+    timings.sort()
+    return {
+        'status': response.status_code,
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'queries': counter.count,
+        'peak_kb': peak // 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for scale, routes in results.items():
+        for name, current in routes.items():
+            before = baseline.get(scale, {}).get(name)
+            if before is None:
+                continue
+            if current['queries'] > before['queries']:
+                regressions.append(f"{scale} {name}: queries {before['queries']} -> {current['queries']}")
+            for metric, floor in (('median_ms', MIN_LATENCY_MS), ('peak_kb', MIN_PEAK_KB)):
+                if (current[metric] > before[metric] * (1 + threshold)
+                        and current[metric] - before[metric] > floor):
+                    regressions.append(f'{scale} {name}: {metric} {before[metric]} -> {current[metric]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', choices=SCALES, default=['small', 'medium'])
+    parser.add_argument('--routes', nargs='+', help='Only run these benchmarks')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative slowdown that counts as a regression (default: 0.25)')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.core.management import call_command
+
+        from authentication.synthetic import generate
+
+        specs = route_specs()
+        check_coverage(specs)
+        if args.routes:
+            specs = {name: spec for name, spec in specs.items() if name in args.routes}
+
+        results = {}
+        for scale in args.scales:
+            call_command('flush', interactive=False, verbosity=0)
+            generate(seed=0, **SCALES[scale])
+            ctx = Context()
+            results[scale] = {}
+            for name, spec in specs.items():
+                results[scale][name] = row = measure(spec, ctx, args.repeat)
+                print(f"{scale:<7} {name:<28} {row['status']:>4} {row['median_ms']:>9.2f}ms "
+                      f"p95 {row['p95_ms']:>9.2f}ms {row['queries']:>4}q {row['peak_kb']:>7}KB")
+    finally:
+        teardown()
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+            handle.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print('No baseline to compare with; run with --save to create one')
+        return
+    with open(args.baseline) as handle:
+        regressions = compare(results, json.load(handle), args.threshold)
+    for line in regressions:
+        print(f'REGRESSION {line}')
+    if regressions:
+        sys.exit(1)
+    print('No regressions against the baseline')
+
+
+if __name__ == '__main__':
+    main()
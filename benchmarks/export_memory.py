@@ -0,0 +1,58 @@
+"""
+Check that the streaming export keeps memory flat as the table grows.
+
+Inserts interview experiences in steps and records the peak Python heap
+(tracemalloc) while consuming ``export/interviews/`` at each size.
+
+    python benchmarks/export_memory.py [--sizes 1000 10000 50000] [--format ndjson]
+"""
+
+import argparse
+import datetime
+import json
+import tracemalloc
+
+from common import authenticated_client, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.urls import reverse
+
+        from authentication.models import InterviewExperience
+
+        user, client = authenticated_client()
+        results = []
+        for size in sorted(args.sizes):
+            missing = size - InterviewExperience.objects.count()
+            InterviewExperience.objects.bulk_create(
+                InterviewExperience(
+                    user=user,
+                    company_name=f'Company {i % 50}',
+                    position='Engineer',
+                    interview_date=datetime.date(2024, 1, 15),
+                    description='Two rounds of problem solving. ' * 10,
+                )
+                for i in range(missing)
+            )
+
+            tracemalloc.start()
+            response = client.get(reverse('export', args=['interviews']), {'format': args.format})
+            total = sum(len(chunk) for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append({'rows': size, 'bytes_streamed': total, 'peak_heap_kb': peak // 1024})
+
+        print(json.dumps(results, indent=2))
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
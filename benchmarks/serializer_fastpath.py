@@ -0,0 +1,87 @@
+"""
+Rows/sec of the ModelSerializer path versus the values() fast path used by
+the public feeds, for interviews and tasks.
+
+"serialize" times only turning already-fetched rows into data; "end to end"
+also includes the query and JSON rendering. Both paths are checked to
+produce identical JSON.
+
+    python benchmarks/serializer_fastpath.py [--rows 2000] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+
+from common import setup_django
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from rest_framework.renderers import JSONRenderer
+
+        from authentication.fastpath import fast_renderer
+        from authentication.pagination import INTERVIEW_FEED_ORDERING, TASK_FEED_ORDERING
+        from authentication.serializers import InterviewExperienceSerializer, TaskExperienceSerializer
+        from authentication.synthetic import generate
+
+        generate(users=100, interviews=args.rows, tasks=args.rows)
+        render = JSONRenderer().render
+        results = {}
+        cases = (
+            ('interviews', InterviewExperienceSerializer, INTERVIEW_FEED_ORDERING),
+            ('tasks', TaskExperienceSerializer, TASK_FEED_ORDERING),
+        )
+        for kind, serializer_class, ordering in cases:
+            model = serializer_class.Meta.model
+            renderer = fast_renderer(serializer_class)
+
+            def fetch_objects():
+                return list(model.objects.select_related('user').order_by(*ordering)[:args.rows])
+
+            def fetch_values():
+                return list(renderer.values(model.objects.order_by(*ordering), ordering)[:args.rows])
+
+            objects, values = fetch_objects(), fetch_values()
+            assert render(serializer_class(objects, many=True).data) == render(renderer.render(values))
+
+            timings = {
+                'serializer': best_of(args.repeat, lambda: serializer_class(objects, many=True).data),
+                'fast_path': best_of(args.repeat, lambda: renderer.render(values)),
+                'serializer_end_to_end': best_of(
+                    args.repeat, lambda: render(serializer_class(fetch_objects(), many=True).data)
+                ),
+                'fast_path_end_to_end': best_of(
+                    args.repeat, lambda: render(renderer.render(fetch_values()))
+                ),
+            }
+            results[kind] = {
+                name: {'rows_per_sec': round(args.rows / seconds), 'ms': round(seconds * 1000, 1)}
+                for name, seconds in timings.items()
+            }
+            results[kind]['speedup'] = round(timings['serializer'] / timings['fast_path'], 1)
+            results[kind]['speedup_end_to_end'] = round(
+                timings['serializer_end_to_end'] / timings['fast_path_end_to_end'], 1
+            )
+        print(json.dumps({'rows': args.rows, **results}, indent=2))
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Hammer ``interviews/`` POSTs and the public feeds from several processes at
+once, with and without the ``SQLITE_PRAGMAS`` tuning, and report throughput
+and "database is locked" errors.
+
+Unlike the other scripts this one needs a database file that every process
+opens, so each run creates its own in a temporary directory. Requests go
+through the full middleware stack with the test client, one client per
+process, like one gunicorn worker each. The response cache is off so every
+read reaches the database.
+
+    python benchmarks/sqlite_concurrency.py [--writers 4] [--readers 4] [--seconds 10]
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from common import ROOT
+
+MODES = {'untuned': 'False', 'tuned': 'True'}
+READ_ROUTES = ('public_interviews', 'public_tasks')
+
+
+def configure(env):
+    """Set up Django in this process against the run's database file."""
+    os.environ.update(env)
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recursion_backend.settings')
+
+    import django
+    from django.test.utils import setup_test_environment
+
+    django.setup()
+    setup_test_environment()
+
+
+def prepare(env, writers, rows):
+    """Migrate and fill the database; returns one API token per writer."""
+    configure(env)
+    from io import StringIO
+
+    from django.core.management import call_command
+    from rest_framework.authtoken.models import Token
+
+    from authentication.events import event_buffer
+    from authentication.synthetic import generate
+
+    call_command('migrate', verbosity=0, stdout=StringIO())
+    people = generate(users=max(writers, 10), interviews=rows, tasks=rows)
+    tokens = [Token.objects.create(user=user).key for user in people[:writers]]
+    event_buffer.flush()
+    return tokens
+
+
+def worker(env, role, token, seconds, barrier, results):
+    configure(env)
+    from django.db import OperationalError, connections
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    if token:
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+    write_url = reverse('interview_list_create')
+    read_urls = [reverse(name) for name in READ_ROUTES]
+    payload = {
+        'company_name': 'Acme',
+        'position': 'Engineer',
+        'interview_date': '2024-01-15',
+        'description': 'Two rounds of problem solving.',
+    }
+
+    stats = {'role': role, 'ok': 0, 'locked': 0, 'errors': 0, 'latencies': []}
+    barrier.wait()
+    deadline = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            if role == 'write':
+                response = client.post(write_url, payload, format='json')
+            else:
+                response = client.get(read_urls[i % len(read_urls)])
+            stats['ok' if response.status_code < 400 else 'errors'] += 1
+        except OperationalError as exc:
+            stats['locked' if 'locked' in str(exc) else 'errors'] += 1
+            # A failed statement can leave the connection mid-transaction
+            connections.close_all()
+        stats['latencies'].append(time.perf_counter() - start)
+        i += 1
+    results.put(stats)
+
+
+def run(mode, args):
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            'SQLITE_PATH': os.path.join(directory, 'db.sqlite3'),
+            'SQLITE_TUNING': MODES[mode],
+            'RESPONSE_CACHE_ENABLED': 'False',
+            'QUERY_BUDGET_ENABLED': 'False',
+        }
+        with ctx.Pool(1) as pool:
+            tokens = pool.apply(prepare, (env, args.writers, args.rows))
+
+        roles = [('write', token) for token in tokens] + [('read', None)] * args.readers
+        barrier = ctx.Barrier(len(roles))
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=worker, args=(env, role, token, args.seconds, barrier, results))
+            for role, token in roles
+        ]
+        for process in processes:
+            process.start()
+        stats = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    rows = []
+    for role in ('write', 'read'):
+        mine = [item for item in stats if item['role'] == role]
+        latencies = sorted(latency for item in mine for latency in item['latencies'])
+        attempts = len(latencies)
+        locked = sum(item['locked'] for item in mine)
+        rows.append({
+            'mode': mode,
+            'role': role,
+            'ok_per_second': round(sum(item['ok'] for item in mine) / args.seconds, 1),
+            'locked': locked,
+            'locked_rate': round(locked / attempts, 4) if attempts else 0.0,
+            'errors': sum(item['errors'] for item in mine),
+            'median_ms': round(statistics.median(latencies) * 1000, 2) if latencies else None,
+            'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2) if latencies else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4, help='processes POSTing interviews')
+    parser.add_argument('--readers', type=int, default=4, help='processes reading the public feeds')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--rows', type=int, default=2000, help='interviews and tasks to start with')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    print(f"{'mode':8}{'role':6}{'ok/s':>10}{'locked':>8}{'rate':>8}{'errors':>8}{'median':>10}{'p95':>10}")
+    for mode in args.modes:
+        for row in run(mode, args):
+            print(
+                f"{row['mode']:8}{row['role']:6}{row['ok_per_second']:>10}{row['locked']:>8}"
+                f"{row['locked_rate']:>8.2%}{row['errors']:>8}{row['median_ms']:>8}ms{row['p95_ms']:>8}ms"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,13 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+Serve it with uvicorn workers under gunicorn:
+
+    gunicorn recursion_backend.asgi:application -k uvicorn.workers.UvicornWorker
+
+The read endpoints then run as async views (``ASYNC_VIEWS``, see
+authentication/async_views.py) and the activity stream is available.
 """
 
 import os
@@ -12,5 +19,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'recursion_backend.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 load_dotenv()
 
@@ -50,7 +51,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'authentication.staticfiles.StaticFilesMiddleware',
+    'authentication.compression.ThresholdGZipMiddleware',
+    'authentication.query_budget.QueryBudgetMiddleware',
+    'authentication.routers.ReadYourWritesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,6 +83,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'recursion_backend.wsgi.application'
 
+# Serve the read endpoints from authentication/async_views.py; asgi.py turns
+# this on, as the async views only pay off under an ASGI server
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -86,10 +94,55 @@ WSGI_APPLICATION = 'recursion_backend.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Optional read replica for the public feeds and dashboards (see
+# authentication/routers.py). Locally, point REPLICA_SQLITE_PATH at a second
+# file kept current by `python manage.py sync_replica`. Tests mirror the
+# replica onto the default database.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.getenv('REPLICA_SQLITE_PATH', BASE_DIR / 'replica.sqlite3'),
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_ROUTERS = ['authentication.routers.PrimaryReplicaRouter']
+# Alias that safe reads go to; None reads everything from the primary
+REPLICA_DATABASE = os.getenv('REPLICA_DATABASE') or ('replica' if os.getenv('REPLICA_SQLITE_PATH') else None)
+# Seconds a client reads from the primary after a write; keep above the replica lag
+READ_YOUR_WRITES_SECONDS = int(os.getenv('READ_YOUR_WRITES_SECONDS', '10'))
+
+# PRAGMAs run on every new SQLite connection (see authentication/sqlite.py).
+# WAL lets readers and one writer work at once; busy_timeout makes a writer
+# wait for the lock (in ms) instead of failing with "database is locked".
+# A negative cache_size is in KiB. Set SQLITE_TUNING=False for SQLite's defaults.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-20000')),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024))),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'memory'),
+} if os.getenv('SQLITE_TUNING', 'True').lower() == 'true' else {}
+
+
+# Cache
+# Defaults to per-process memory. With several workers, point CACHE_BACKEND at
+# a shared cache (e.g. django.core.cache.backends.redis.RedisCache) so response
+# cache invalidations reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Public response cache (see authentication/cache.py)
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '60'))
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.getenv('RESPONSE_CACHE_LOCK_TIMEOUT', '10'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -128,8 +181,14 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Disable compression for now to avoid issues
-STATICFILES_STORAGE = 'whitenoise.storage.StaticFilesStorage'
+# collectstatic writes content-hashed names (served with far-future cache
+# headers) plus .gz copies. References missing from the manifest fall back to
+# the plain name instead of raising, so a stale manifest cannot 500 a page.
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+WHITENOISE_MANIFEST_STRICT = False
+
+# Smallest API response body worth gzipping, in bytes
+GZIP_MIN_LENGTH = int(os.getenv('GZIP_MIN_LENGTH', '1024'))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -176,10 +235,16 @@ CORS_ALLOWED_HEADERS = [
     'x-requested-with',
 ]
 
+# Conditional requests: let the SPA send validators and read them back
+# (CORS_ALLOW_HEADERS is the name django-cors-headers actually reads)
+# X-Read-Primary-Until carries the read-your-writes pin (authentication/routers.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'if-match', 'if-none-match', 'if-modified-since', 'x-read-primary-until')
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified', 'X-Export-Started', 'X-Read-Primary-Until']
+
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'authentication.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -189,6 +254,68 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Public feed pagination (keyset cursors, see authentication/pagination.py)
+FEED_PAGE_SIZE = int(os.getenv('FEED_PAGE_SIZE', '20'))
+FEED_MAX_PAGE_SIZE = int(os.getenv('FEED_MAX_PAGE_SIZE', '100'))
+# Experiences of each kind embedded in a public profile before paginating
+PROFILE_EXPERIENCES_PAGE_SIZE = int(os.getenv('PROFILE_EXPERIENCES_PAGE_SIZE', '20'))
+# Render the feeds from values() rows instead of ModelSerializer (see authentication/fastpath.py)
+FAST_LIST_SERIALIZATION = os.getenv('FAST_LIST_SERIALIZATION', 'True').lower() == 'true'
+
+# Most items accepted by one request to the interviews/bulk/ and tasks/bulk/ endpoints
+BULK_MAX_BATCH_SIZE = int(os.getenv('BULK_MAX_BATCH_SIZE', '100'))
+
+# Rows fetched per round trip by the streaming export/ endpoints
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+# ?since= also re-exports rows updated this many seconds earlier: updated_at is
+# set before commit, so a slow transaction can commit a row older than the
+# previous export's X-Export-Started. Keep it above the longest write transaction.
+EXPORT_SINCE_OVERLAP_SECONDS = int(os.getenv('EXPORT_SINCE_OVERLAP_SECONDS', '60'))
+
+# Per-endpoint query budgets (see authentication/query_budget.py). Over-budget
+# requests are logged; set QUERY_BUDGET_ENFORCE to raise instead.
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', 'True').lower() == 'true'
+QUERY_BUDGET_ENFORCE = os.getenv('QUERY_BUDGET_ENFORCE', 'False').lower() == 'true'
+
+# In-process token -> user cache used by CachedTokenAuthentication. TTL bounds
+# how long a revoked token keeps working in *other* worker processes.
+TOKEN_AUTH_CACHE = {
+    'ENABLED': os.getenv('TOKEN_AUTH_CACHE_ENABLED', 'True').lower() == 'true',
+    'TTL': int(os.getenv('TOKEN_AUTH_CACHE_TTL', '60')),
+    'MAX_SIZE': int(os.getenv('TOKEN_AUTH_CACHE_MAX_SIZE', '10000')),
+}
+
+# ActivityEvent log writes (see authentication/events.py): events are batched
+# until BUFFER_SIZE are pending or the oldest is FLUSH_INTERVAL seconds old
+ACTIVITY_LOG = {
+    'BUFFER_SIZE': int(os.getenv('ACTIVITY_LOG_BUFFER_SIZE', '100')),
+    'FLUSH_INTERVAL': float(os.getenv('ACTIVITY_LOG_FLUSH_INTERVAL', '1.0')),
+}
+
+# activity_webhook (authentication/monitoring_views.py) only accepts staff
+# sessions or callers sending SECRET in X-Webhook-Secret; empty disables the
+# secret. Bodies and their "details" are capped at these many bytes.
+ACTIVITY_WEBHOOK = {
+    'SECRET': os.getenv('ACTIVITY_WEBHOOK_SECRET', ''),
+    'MAX_BODY_BYTES': int(os.getenv('ACTIVITY_WEBHOOK_MAX_BODY_BYTES', '4096')),
+    'MAX_DETAILS_BYTES': int(os.getenv('ACTIVITY_WEBHOOK_MAX_DETAILS_BYTES', '2048')),
+}
+
+# Server-Sent Events activity stream (see authentication/streams.py).
+# QUEUE_SIZE bounds the events buffered per client before a slow one is
+# dropped; FALLBACK_POLL (seconds) catches writes made by other processes;
+# MAX_SECONDS ends each connection, which EventSource then reopens.
+ACTIVITY_STREAM = {
+    'QUEUE_SIZE': int(os.getenv('ACTIVITY_STREAM_QUEUE_SIZE', '100')),
+    'HEARTBEAT': float(os.getenv('ACTIVITY_STREAM_HEARTBEAT', '15')),
+    'FALLBACK_POLL': float(os.getenv('ACTIVITY_STREAM_FALLBACK_POLL', '30')),
+    'MAX_SECONDS': float(os.getenv('ACTIVITY_STREAM_MAX_SECONDS', '600')),
+}
+
+# Admin changelists past this many rows estimate their page count instead of
+# counting, and drop the date hierarchy (see authentication/admin.py)
+ADMIN_LARGE_TABLE_ROWS = int(os.getenv('ADMIN_LARGE_TABLE_ROWS', '50000'))
+
 # Allow hosts for production and development
 # ALLOWED_HOSTS is set earlier in the file with environment variable
 